@@ -0,0 +1,93 @@
+#!/usr/bin/python
+#
+# activation.py
+#
+# 2026/10/19
+# rg
+#
+# activation functions for the neural nets. each comes in a scalar flavour (for the Perceptron graph) and a
+# vectorized flavour (for whole layers at a time).
+#
+# - exact:  1 / (1 + e^-x), saturating to 0/1 beyond +/-100 just as Perceptron.sigmoid always has
+# - lut:    a clamped lookup table over [-LUT_LIMIT, LUT_LIMIT] with linear interpolation between entries
+#
+# Maximum absolute error of the lookup table against the exact sigmoid:
+# - inside the table, linear interpolation is off by at most step^2 / 8 * max|sigmoid''|
+#   = (1/64)^2 / 8 * 0.0962 < 3.0e-6
+# - outside the table we clamp to its end points, which is off by at most sigmoid(-LUT_LIMIT) = 6.2e-6
+# so LUT_MAX_ERROR (1e-5) bounds the error everywhere. test_activation.py checks this on a dense grid.
+
+from math import exp
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+LUT_LIMIT = 12
+LUT_RESOLUTION = 64  # table entries per unit of input
+LUT_MAX_ERROR = 1e-5
+
+
+def sigmoid(num):
+    if num < -100:
+        return 0
+    elif num > 100:
+        return 1
+    else:
+        return 1 / (1 + exp(-num))
+
+
+# build the table once at import time. _lut_slope[i] is the rise between entry i and i+1.
+_lut_x = [float(i) / LUT_RESOLUTION - LUT_LIMIT for i in range(2 * LUT_LIMIT * LUT_RESOLUTION + 1)]
+_lut = [sigmoid(x) for x in _lut_x]
+_lut_slope = [_lut[i + 1] - _lut[i] for i in range(len(_lut) - 1)]
+_lut_last = len(_lut) - 1
+if numpy is not None:
+    _lut_x_array = numpy.array(_lut_x)
+    _lut_array = numpy.array(_lut)
+
+
+def sigmoid_lut(num):
+    position = (num + LUT_LIMIT) * LUT_RESOLUTION
+    if position <= 0:
+        return _lut[0]
+    elif position >= _lut_last:
+        return _lut[_lut_last]
+    else:
+        i = int(position)
+        return _lut[i] + (position - i) * _lut_slope[i]
+
+
+# apply the exact sigmoid to a whole sequence of values. returns a numpy array when numpy is available, else a list.
+def sigmoid_vector(values):
+    if numpy is None:
+        return [sigmoid(value) for value in values]
+    else:
+        return 1.0 / (1.0 + numpy.exp(-numpy.clip(numpy.asarray(values, dtype=float), -100, 100)))
+
+
+# apply the lookup-table sigmoid to a whole sequence of values. numpy.interp clamps to the end points for us.
+def sigmoid_lut_vector(values):
+    if numpy is None:
+        return [sigmoid_lut(value) for value in values]
+    else:
+        return numpy.interp(values, _lut_x_array, _lut_array)
+
+
+# name -> (scalar function, vectorized function, maximum absolute error against the exact sigmoid)
+ACTIVATIONS = {'exact': (sigmoid,     sigmoid_vector,     0.0),
+               'lut':   (sigmoid_lut, sigmoid_lut_vector, LUT_MAX_ERROR)}
+
+DEFAULT_ACTIVATION = 'exact'
+
+
+def get_activation(name=None, vectorized=False):
+    if name is None:
+        name = DEFAULT_ACTIVATION
+    assert name in ACTIVATIONS, "unknown activation: " + str(name)
+    if vectorized:
+        return ACTIVATIONS[name][1]
+    else:
+        return ACTIVATIONS[name][0]
@@ -0,0 +1,149 @@
+#!/usr/bin/python
+#
+# autotune.py
+#
+# 2026/10/19
+# rg
+#
+# pick the fastest inference backend (see GinNeuralNet.backends) for each call site and batch size on this machine.
+# for single decisions on a small network numpy's per-call overhead can cost more than the math itself, while the
+# batched kernel wins once there are enough inputs to amortise it, and where the crossover sits depends on the
+# machine. so we time every available backend the first time a (call site, batch size, network shape) comes up,
+# remember the winner, and keep the results on disk keyed by a fingerprint of the machine and python/numpy versions.
+#
+# the process shares one tuner, default_autotuner(), built on first use. it keeps its results in memory only unless
+# an entry point first calls configure_autotuner() with a cache file, so importing us (or anything that uses us)
+# touches no files.
+
+import json
+import os
+import platform
+import random
+from neuralnet import *
+from utility import *
+
+
+# the fingerprint of the machine we're running on. results tuned elsewhere don't apply here.
+def machine_fingerprint():
+    numpy_version = numpy.__version__ if numpy is not None else 'none'
+    return '|'.join([platform.node(), platform.machine(), platform.python_version(), 'numpy ' + numpy_version])
+
+
+# round batch sizes up to the next power of two so nearby sizes share one measurement
+def batch_bucket(batch_size):
+    bucket = 1
+    while bucket < batch_size:
+        bucket *= 2
+    return bucket
+
+
+class BackendAutotuner(object):
+    def __init__(self, cache_path=None, number=200, repeat=3, seed=0):
+        self.cache_path = cache_path
+        self.number = number
+        self.repeat = repeat
+        self.fingerprint = machine_fingerprint()
+
+        # our own random numbers for the timing inputs, so tuning mid-round doesn't change how the cards fall
+        self.rng = random.Random(seed)
+
+        # key -> {'backend': name, 'timings': {name: us per input set}}
+        self.choices = {}
+        self.load()
+
+    @staticmethod
+    def shape(compiled):
+        return "%dx%dx%dx%d" % (len(compiled.input_weights), len(compiled.hidden_weights),
+                                len(compiled.jidden_weights), len(compiled.output_weights))
+
+    def key(self, call_site, batch_size, compiled):
+        return "%s|%d|%s" % (call_site, batch_bucket(batch_size), self.shape(compiled))
+
+    # the backend to use for batches of batch_size at call_site, tuning on first use
+    def choose(self, call_site, batch_size, compiled):
+        key = self.key(call_site, batch_size, compiled)
+        if key not in self.choices:
+            self.tune(call_site, batch_size, compiled)
+        return self.choices[key]['backend']
+
+    # time every available backend on random inputs and remember the fastest
+    def tune(self, call_site, batch_size, compiled):
+        key = self.key(call_site, batch_size, compiled)
+        size = batch_bucket(batch_size)
+        batch = [[self.rng.randint(0, 52) for _ in compiled.input_weights] for _ in range(size)]
+
+        # fewer repetitions for bigger batches, so tuning a large batch doesn't take much longer than a small one
+        number = max(1, self.number // size)
+
+        timings = {}
+        for backend in available_backends():
+            kernel = compiled.kernel(backend)
+            if size == 1:
+                inputs = batch[0]
+                timings[backend] = time_call(lambda: kernel.forward(inputs), number, self.repeat)
+            else:
+                timings[backend] = time_call(lambda: kernel.forward_batch(batch), number, self.repeat) / size
+
+        best = min(timings, key=timings.get)
+        self.choices[key] = {'backend': best, 'timings': timings}
+        log_info("autotune: " + key + " -> " + best + " " + str(timings))
+        self.save()
+        return best
+
+    def load(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r') as f:
+                self.choices = json.load(f).get(self.fingerprint, {})
+        except (IOError, ValueError):
+            log_warn("autotune: ignoring unreadable cache " + self.cache_path)
+            self.choices = {}
+
+    # the cache file may hold results for several machines, so keep theirs and replace ours
+    def save(self):
+        if self.cache_path is None:
+            return
+        stored = {}
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, 'r') as f:
+                    stored = json.load(f)
+            except (IOError, ValueError):
+                stored = {}
+        stored[self.fingerprint] = self.choices
+        with open(self.cache_path, 'w') as f:
+            json.dump(stored, f, indent=1, sort_keys=True)
+
+    # order table rows by call site, then numerically by batch size
+    @staticmethod
+    def sort_key(item):
+        call_site, batch, shape = item[0].split('|')
+        return call_site, int(batch), shape
+
+    def describe(self):
+        backends = list(GinNeuralNet.backends)
+        table = Texttable(max_width=115)
+        table.set_deco(Texttable.HEADER | Texttable.BORDER)
+        table.add_rows([["call site", "batch", "shape", "backend"] + [name + " us" for name in backends]] +
+                       [key.split('|') + [choice['backend']] +
+                        [choice['timings'].get(name, '-') for name in backends]
+                        for key, choice in sorted(self.choices.items(), key=self.sort_key)])
+        return "\n" + "-- BACKEND AUTOTUNE, " + self.fingerprint + " --\n" + table.draw()
+
+
+_default_autotuner = None
+
+
+# replace the shared tuner with one keeping its results in cache_path (None: in memory only)
+def configure_autotuner(cache_path=None, **kwargs):
+    global _default_autotuner
+    _default_autotuner = BackendAutotuner(cache_path, **kwargs)
+    return _default_autotuner
+
+
+# the shared tuner, built in memory only if no entry point has configured one
+def default_autotuner():
+    if _default_autotuner is None:
+        configure_autotuner()
+    return _default_autotuner
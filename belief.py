@@ -0,0 +1,133 @@
+#!/usr/bin/python
+#
+# belief.py
+#
+# 2026/10/19
+# rg
+#
+# a running estimate of the opponent's hand, as the probability that each of the 52 cards is in it.
+#
+# certain knowledge comes from the table's card masks (see GinTable.known_masks()): cards the opponent is known to
+# hold are 1, and cards they can't hold (ours, the discard pile) are 0. the rest share what's left of the opponent's
+# hand size in proportion to a weight per card, which the opponent's choices nudge:
+# - declining a discard makes the cards that would meld with it less likely
+# - picking a discard up makes the cards that meld with it more likely
+# - discarding a card makes the cards that meld with it less likely
+# every rule is a single row of per-card factors, multiplied into the weights.
+
+from gintable import *
+from activation import numpy
+
+# how much each of the opponent's choices scales the weights of the cards that meld with the card in question
+BELIEF_FACTORS = {'decline': 0.6, 'pickup': 2.0, 'discard': 0.5}
+
+
+# 52 x 52 matrix of the cards that make a meld with each card: the other suits of its rank, and its neighbours one
+# and two ranks away in its suit
+def meld_neighbours():
+    neighbours = numpy.zeros((52, 52), dtype=bool)
+    for index in range(52):
+        suit, rank = divmod(index, 13)
+        for other_suit in range(4):
+            if other_suit != suit:
+                neighbours[index, other_suit * 13 + rank] = True
+        for step in (-2, -1, 1, 2):
+            if 0 <= rank + step < 13:
+                neighbours[index, suit * 13 + rank + step] = True
+    return neighbours
+
+
+class OpponentBelief(object):
+    # the (event -> 52 x 52 factor rows) tables, built on first use and shared by every belief
+    _factor_rows = None
+
+    # our view of opponent's hand, as player. we listen to table for the opponent's choices.
+    def __init__(self, table, player, opponent, factors=None):
+        assert numpy is not None, "belief tracking requires numpy"
+        self.table = table
+        self.player = player
+        self.opponent = opponent
+
+        if factors is None:
+            if OpponentBelief._factor_rows is None:
+                OpponentBelief._factor_rows = self.build_factor_rows(BELIEF_FACTORS)
+            self.factor_rows = OpponentBelief._factor_rows
+        else:
+            self.factor_rows = self.build_factor_rows(factors)
+
+        self.weights = numpy.ones(52)
+        self._bits = numpy.arange(52, dtype=numpy.uint64)
+        table.register_card_listener(self)
+
+    @staticmethod
+    def build_factor_rows(factors):
+        neighbours = meld_neighbours()
+        return dict((event, numpy.where(neighbours, factor, 1.0)) for event, factor in factors.items())
+
+    def close(self):
+        self.table.unregister_card_listener(self)
+
+    # see GinTable.register_card_listener()
+    def notify_of_card(self, event, player, index):
+        if event == 'shuffle':
+            self.weights.fill(1.0)
+        elif player is self.opponent and event in self.factor_rows:
+            self.weights *= self.factor_rows[event][index]
+
+    # a 52 bit card mask as a boolean vector
+    def mask_vector(self, mask):
+        return ((numpy.uint64(mask) >> self._bits) & numpy.uint64(1)).astype(bool)
+
+    # (cards the opponent certainly holds, cards they might hold, how many of their cards we don't know)
+    def unknowns(self):
+        masks = self.table.known_masks(self.player)
+        held = self.mask_vector(masks['opponent'])
+        open_cards = ~self.mask_vector(masks['unavailable'])
+        return held, open_cards, max(0, self.opponent.hand.size() - int(held.sum()))
+
+    # probability that each card (by Card.index()) is in the opponent's hand. sums to their hand size.
+    def probabilities(self):
+        held, open_cards, count = self.unknowns()
+        probabilities = held.astype(float)
+        weights = self.weights * open_cards
+        total = weights.sum()
+        if count and total > 0:
+            # a heavily weighted card can't be more than certain. cap it, and share the excess among the rest.
+            scaled = numpy.zeros(52)
+            remaining = count
+            free = weights > 0
+            for _ in range(52):
+                scaled[free] = weights[free] * remaining / weights[free].sum()
+                over = free & (scaled >= 1.0)
+                if not over.any():
+                    break
+                scaled[over] = 1.0
+                free &= ~over
+                remaining = count - int((scaled == 1.0).sum())
+                if not free.any() or remaining <= 0:
+                    break
+            probabilities += scaled
+        return probabilities
+
+    # probabilities() as a list, for network inputs
+    def vector(self):
+        return self.probabilities().tolist()
+
+    # one whole opponent hand consistent with what we know, as a sorted list of card indexes: every card they're
+    # known to hold, plus the rest drawn in proportion to the belief's weights. random_state is a
+    # numpy.random.RandomState, or None for numpy's global one.
+    def sample_hand(self, random_state=None):
+        if random_state is None:
+            random_state = numpy.random
+        held, open_cards, count = self.unknowns()
+        hand = numpy.flatnonzero(held).tolist()
+        candidates = numpy.flatnonzero(open_cards)
+        count = min(count, len(candidates))
+        if count:
+            weights = self.weights[candidates]
+            hand.extend(random_state.choice(candidates, size=count, replace=False,
+                                            p=weights / weights.sum()).tolist())
+        return sorted(hand)
+
+    def sample_hands(self, samples, random_state=None):
+        return [self.sample_hand(random_state) for _ in range(samples)]
@@ -0,0 +1,141 @@
+#!/usr/bin/python
+#
+# benchmark.py
+#
+# 2026/10/19
+# rg
+#
+# micro-benchmarks for the inference hot paths. run with:
+#
+#   python benchmark.py
+
+import random
+from math import exp
+from activation import *
+from neuralnet import Perceptron
+from utility import indent_print, time_call
+from texttable import *
+
+
+# Perceptron as it was before the activation module, kept verbatim as the baseline the new code is timed against:
+# its sigmoid, and a generate_output() that squashes the running sum after every connection
+class BaselinePerceptron(object):
+    def __init__(self, myid=None):
+        self.inputs = {}
+        if None == myid:
+            self.id = self.__repr__()
+        else:
+            self.id = myid
+
+        # memoization caching
+        self.memo = False
+
+    # uplink to an upstream perceptron, storing the connection's weight in a dict
+    def add_input(self, target, weight):
+        self.inputs[target] = weight
+
+    @staticmethod
+    def sigmoid(num):
+        if -num > 100:
+            return 0
+        elif -num < -100:
+            return 1
+        else:
+            return 1 / (1 + exp(-num))
+
+    # return the sigmoid of: the sum of our inputs multiplied by their respective weights
+    def generate_output(self, indent_level=0, getlast=True):
+        # use our cache, if available
+        if getlast is True and self.memo is not False:
+            return self.memo
+        else:
+            func_debug = 0
+            weighted = 0
+            sigmoided = 0
+
+            if func_debug:
+                indent_print(indent_level, "running generate_output() for: " + self.id)
+
+            for each_input in self.inputs.keys():
+                output = each_input.generate_output(indent_level=indent_level+1, getlast=getlast)
+                weighted += self.inputs[each_input] * output
+                sigmoided = BaselinePerceptron.sigmoid(weighted)
+                # debug output
+                if func_debug:
+                    indent_print(indent_level+1, "looking at connection from " + each_input.id + " to " + self.id)
+                    indent_print(indent_level+2, "input weight: " + str(self.inputs[each_input]))
+                    indent_print(indent_level+2, "output: " + str(output))
+                    indent_print(indent_level+2, "weighted: " + str(weighted))
+                    indent_print(indent_level+2, "sigmoided: " + str(round(sigmoided, 4)))
+
+            self.memo = sigmoided
+
+            return sigmoided
+
+
+# an upstream neuron with a fixed output, so a timed generate_output() covers one neuron only
+class FixedInput(object):
+    def __init__(self, value):
+        self.value = value
+        self.id = 'fixed'
+
+    def generate_output(self, indent_level=0, getlast=True):
+        return self.value
+
+
+# compare the baseline Perceptron against the current one and the activation module, both one value at a time and a
+# layer at a time. the 'neuron' rows time one hidden neuron with 45 connections, recomputed each call.
+def benchmark_activation(layer_width=31, connections=45, number=1000, repeat=3):
+    values = [random.uniform(-20, 20) for _ in range(layer_width)]
+    weights = [random.gauss(0, 1) for _ in range(connections)]
+    inputs = [random.random() for _ in range(connections)]
+
+    def neuron(perceptron_class, activation=None):
+        perceptron = perceptron_class()
+        if activation is not None:
+            perceptron.activation = activation
+        for weight, value in zip(weights, inputs):
+            perceptron.add_input(FixedInput(value), weight)
+        return lambda: perceptron.generate_output(getlast=False)
+
+    def once_per_neuron(activation):
+        def neuron():
+            weighted = 0
+            for i in range(connections):
+                weighted += weights[i] * inputs[i]
+            activation(weighted)
+        return neuron
+
+    def scalar_layer(activation):
+        return lambda: [activation(v) for v in values]
+
+    def vector_layer(activation):
+        return lambda: activation(values)
+
+    rows = [["benchmark", "us/call"],
+            ["baseline generate_output(), neuron", time_call(neuron(BaselinePerceptron), number, repeat)],
+            ["generate_output() exact, neuron", time_call(neuron(Perceptron, get_activation('exact')), number, repeat)],
+            ["generate_output() lut, neuron", time_call(neuron(Perceptron, get_activation('lut')), number, repeat)],
+            ["exact, once per neuron", time_call(once_per_neuron(get_activation('exact')), number, repeat)],
+            ["lut, once per neuron", time_call(once_per_neuron(get_activation('lut')), number, repeat)],
+            ["baseline sigmoid, layer of %d" % layer_width,
+             time_call(scalar_layer(BaselinePerceptron.sigmoid), number, repeat)],
+            ["exact, layer of %d" % layer_width, time_call(scalar_layer(get_activation('exact')), number, repeat)],
+            ["lut, layer of %d" % layer_width, time_call(scalar_layer(get_activation('lut')), number, repeat)],
+            ["exact vectorized, layer of %d" % layer_width,
+             time_call(vector_layer(get_activation('exact', vectorized=True)), number, repeat)],
+            ["lut vectorized, layer of %d" % layer_width,
+             time_call(vector_layer(get_activation('lut', vectorized=True)), number, repeat)]]
+
+    return rows
+
+
+def draw_rows(title, rows):
+    table = Texttable(max_width=115)
+    table.set_deco(Texttable.HEADER | Texttable.BORDER)
+    table.add_rows(rows)
+    return "\n" + "-- " + title + " --\n" + table.draw()
+
+
+if __name__ == '__main__':
+    print(draw_rows("ACTIVATION", benchmark_activation()))
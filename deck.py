@@ -46,6 +46,11 @@ class Card(object):
     def ranking(self):
         return self.rank + self.suit_value[self.suit]
 
+    # return a 0-51 position, used for one-hot encodings and bitmasks
+    # - Ac=0, 2c=1, ..., Ks=51
+    def index(self):
+        return self.ranking() - 1
+
 
 class Deck(object):
     def __init__(self):
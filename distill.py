@@ -0,0 +1,249 @@
+#!/usr/bin/python
+#
+# distill.py
+#
+# 2026/10/19
+# rg
+#
+# distill an evolved network into a DistilledPolicy: quantized lookup tables over a handful of engineered hand
+# features, played by DistilledGinStrategy with no matrix math at all.
+#
+# we record every decision the network makes over a corpus of games, then tabulate:
+# - start: pickup vs draw, by (deadwood, how much the top discard would cut it, whether it's an out, deck height)
+# - end:   knock / discard / gin, by (deadwood after our best discard, deck height)
+# - which card: for each hand slot and how much worse than our best discard it would leave us, how often the
+#   network chose it when it was on offer. we throw the candidate that the network preferred most often.
+# agreement is measured on decisions held out of the fit, and strength by playing the policy against the network.
+
+from genetic_algorithm import *
+from ginbits import *
+from texttable import *
+import json
+
+
+def deadwood_bucket(points):
+    if points == 0:
+        return 0
+    elif points <= 10:
+        return 1
+    elif points <= 20:
+        return 2
+    elif points <= 40:
+        return 3
+    return 4
+
+
+def gain_bucket(points):
+    if points <= 0:
+        return 0
+    elif points <= 5:
+        return 1
+    elif points <= 15:
+        return 2
+    return 3
+
+
+def height_bucket(height):
+    return min(height // 8, 3)
+
+
+# the position a decision was made in: our hand (card indexes, in hand order), the top discard's index (or None)
+# and the deck height
+def decision_state(player):
+    table = player.table
+    top = table.discards[table.discard_height - 1] if table.discard_height else None
+    return [card.index() for card in player.hand.cards], top, table.deck_height
+
+
+class DistilledPolicy(object):
+    def __init__(self):
+        self.start_table = {}
+        self.end_table = {}
+        self.discard_table = {}
+        self.default_start = 'DRAW'
+        self.default_end = 'DISCARD'
+
+    @staticmethod
+    def start_key(hand, top, height):
+        mask = index_mask(hand)
+        current = deadwood(mask)
+        if top is None:
+            return deadwood_bucket(current), 0, 0, height_bucket(height)
+        best, _ = discard_deadwoods(mask | (1 << top))
+        is_out = int(bool(outs(mask) & (1 << top)))
+        return deadwood_bucket(current), gain_bucket(current - best), is_out, height_bucket(height)
+
+    # (key for the end action, key per discard candidate in hand order)
+    @staticmethod
+    def end_keys(hand, height):
+        best, after = discard_deadwoods(index_mask(hand))
+        # after is in card index order, which is also hand order
+        return ((deadwood_bucket(best), height_bucket(height)),
+                [(slot, gain_bucket(points - best)) for slot, points in enumerate(after)])
+
+    # tabulate a list of (phase, (hand, top, height), [action, index]) decisions
+    def fit(self, decisions):
+        start_counts = {}
+        end_counts = {}
+        discard_counts = {}
+        for phase, (hand, top, height), (action, index) in decisions:
+            if phase == 'start':
+                counts = start_counts.setdefault(self.start_key(hand, top, height), {})
+                counts[action] = counts.get(action, 0) + 1
+            else:
+                end_key, candidate_keys = self.end_keys(hand, height)
+                counts = end_counts.setdefault(end_key, {})
+                counts[action] = counts.get(action, 0) + 1
+                for slot, key in enumerate(candidate_keys):
+                    chosen, offered = discard_counts.get(key, (0, 0))
+                    discard_counts[key] = (chosen + int(slot == index), offered + 1)
+
+        self.start_table = dict((key, max(counts, key=counts.get)) for key, counts in start_counts.items())
+        self.end_table = dict((key, max(counts, key=counts.get)) for key, counts in end_counts.items())
+        self.discard_table = dict((key, float(chosen) / offered) for key, (chosen, offered) in discard_counts.items())
+        self.default_start = self.most_common(start_counts, self.default_start)
+        self.default_end = self.most_common(end_counts, self.default_end)
+        return self
+
+    @staticmethod
+    def most_common(tables, default):
+        totals = {}
+        for counts in tables.values():
+            for action, count in counts.items():
+                totals[action] = totals.get(action, 0) + count
+        if not totals:
+            return default
+        return max(totals, key=totals.get)
+
+    # [action, index] for a position, like GinStrategy.determine_best_action
+    def decide(self, phase, hand, top, height):
+        if phase == 'start':
+            return [self.start_table.get(self.start_key(hand, top, height), self.default_start), 0]
+
+        end_key, candidate_keys = self.end_keys(hand, height)
+        action = self.end_table.get(end_key, self.default_end)
+        # unseen candidates rank below every seen one, and among themselves by how little deadwood they leave
+        scores = [(self.discard_table.get(key, -1.0), -key[1]) for key in candidate_keys]
+        return [action, scores.index(max(scores))]
+
+    def size(self):
+        return len(self.start_table) + len(self.end_table) + len(self.discard_table)
+
+    def to_json(self):
+        return json.dumps({'start': [[list(key), action] for key, action in self.start_table.items()],
+                           'end': [[list(key), action] for key, action in self.end_table.items()],
+                           'discard': [[list(key), rate] for key, rate in self.discard_table.items()],
+                           'default_start': self.default_start, 'default_end': self.default_end})
+
+    @staticmethod
+    def from_json(text):
+        data = json.loads(text)
+        policy = DistilledPolicy()
+        policy.start_table = dict((tuple(key), str(action)) for key, action in data['start'])
+        policy.end_table = dict((tuple(key), str(action)) for key, action in data['end'])
+        policy.discard_table = dict((tuple(key), rate) for key, rate in data['discard'])
+        policy.default_start = str(data['default_start'])
+        policy.default_end = str(data['default_end'])
+        return policy
+
+
+# wraps a strategy, recording every decision it makes along with the position it made it in
+class RecordingGinStrategy(GinStrategy):
+    def __init__(self, strategy, decisions):
+        super(RecordingGinStrategy, self).__init__(strategy.us, strategy.opponent, strategy.ginmatch)
+        self.strategy = strategy
+        self.decisions = decisions
+
+    def determine_best_action(self, phase=None):
+        state = decision_state(self.us)
+        decision = self.strategy.determine_best_action(phase)
+        self.decisions.append((phase, state, list(decision)))
+        return decision
+
+
+# play geneset against the rest of the population, recording every decision its network makes
+def record_decisions(population, geneset, games=200):
+    opponents = [member for member in population.member_genes if member is not geneset]
+    if not opponents:
+        opponents = [GeneSet(population.gene_size)]
+
+    decisions = []
+    for i in range(games):
+        match = population.create_match(geneset, opponents[i % len(opponents)])
+        match.p1.strategy = RecordingGinStrategy(match.p1.strategy, decisions)
+        match.run()
+        match.close()
+    return decisions
+
+
+# fraction of decisions the policy makes exactly as recorded, per phase: {'start': .., 'end': .., 'all': ..}
+def policy_agreement(policy, decisions):
+    agreed = {'start': 0, 'end': 0}
+    totals = {'start': 0, 'end': 0}
+    for phase, (hand, top, height), decision in decisions:
+        ours = policy.decide(phase, hand, top, height)
+        totals[phase] += 1
+        if phase == 'start':
+            agreed[phase] += int(ours[0] == decision[0])
+        else:
+            agreed[phase] += int(ours == decision)
+
+    agreement = {}
+    for phase in totals:
+        agreement[phase] = float(agreed[phase]) / totals[phase] if totals[phase] else 1.0
+    agreement['all'] = float(sum(agreed.values())) / max(1, sum(totals.values()))
+    return agreement
+
+
+# how the policy fares against the network it was distilled from, alternating seats: the fraction of games it
+# wins, draws and loses
+def policy_results(population, geneset, policy, games=50):
+    results = {'win': 0, 'draw': 0, 'loss': 0}
+    for i in range(games):
+        match = population.create_match(geneset, geneset)
+        if i % 2 == 0:
+            match.p1.strategy = DistilledGinStrategy(match.p1, match.p2, match, policy)
+        else:
+            match.p2.strategy = DistilledGinStrategy(match.p2, match.p1, match, policy)
+        match.run()
+
+        if i % 2 == 0:
+            wins, draws, losses = match.p1_wins, match.p1_draws, match.p1_losses
+        else:
+            wins, draws, losses = match.p2_wins, match.p2_draws, match.p2_losses
+        match.close()
+        results['win'] += wins
+        results['draw'] += draws
+        results['loss'] += losses
+
+    played = max(1, sum(results.values()))
+    return dict((key, float(count) / played) for key, count in results.items())
+
+
+# distill a genome's network, fitting on most of its recorded decisions and measuring agreement on the rest
+def distill_geneset(population, geneset, games=200, holdout=0.2, match_games=50):
+    decisions = record_decisions(population, geneset, games)
+    split = int(len(decisions) * (1 - holdout))
+    policy = DistilledPolicy().fit(decisions[:split])
+
+    return {'policy': policy,
+            'decisions': len(decisions),
+            'agreement': policy_agreement(policy, decisions[split:]),
+            'results': policy_results(population, geneset, policy, match_games)}
+
+
+# a table summarising distill_geneset(), for the exhibit output
+def distillation_report(population, geneset, games=200):
+    result = distill_geneset(population, geneset, games)
+    agreement = result['agreement']
+    results = result['results']
+
+    table = Texttable(max_width=115)
+    table.set_deco(Texttable.HEADER | Texttable.BORDER)
+    table.add_rows([["decisions", "table entries", "start agree", "end agree", "overall agree",
+                     "won vs net", "drawn", "lost"],
+                    [result['decisions'], result['policy'].size(), agreement['start'], agreement['end'],
+                     agreement['all'], results['win'], results['draw'], results['loss']]])
+
+    return "\n" + "                     DISTILLED CHAMPION POLICY, GENERATION #{0}".format(
+        population.current_generation) + "\n" + table.draw()
@@ -0,0 +1,195 @@
+#!/usr/bin/python
+#
+# endgame.py
+#
+# 2026/10/19
+# rg
+#
+# search for the last few cards of the deck. once a round starts with two cards or fewer left, GinMatch draws the
+# game, so with a handful of cards above that line only a few draws remain and the game tree can be walked: our
+# choices take the best value, the opponent's the worst (for us), and a draw from the deck averages over every card
+# that could come off the top.
+#
+# we can't see the opponent's hand, so the caller gives a small set of hands they might hold (a belief set, say from
+# belief.OpponentBelief.sample_hands()). each hand fixes the deck as the unseen cards left over, in no particular
+# order, and we choose the move with the best value averaged across the set. values are points from our seat's
+# point of view, as GinMatch scores them: what we'd win, less what we'd lose, and 0 for a drawn game.
+#
+# picking up a discard doesn't shorten the deck, though, so a game can go on until the turn limit whatever the deck
+# height. we deepen a turn at a time instead: a search to a given horizon (in turns) scores the positions it reaches
+# there by their deadwood margin, and a search that never reaches its horizon has solved the game exactly. each
+# horizon's search is memoized on what decides a position's value: both hands, the cards left in the deck, the whole
+# discard pile in order (each pickup exposes the card below), whose turn and phase it is, any pending knock, and the
+# turn count. we keep the deepest search to finish within the node and time budgets.
+
+from ginstrategy import *
+from ginstate import *
+from activation import numpy
+import random
+import time
+
+
+class EndgameBudgetExceeded(Exception):
+    pass
+
+
+class EndgameSolver(object):
+    # check the clock once every this many nodes
+    clock_interval = 256
+
+    # seat is ours, in the GinState sense (0 for GinMatch's p1)
+    def __init__(self, seat, node_budget=200000, budget_ms=None):
+        self.seat = seat
+        self.node_budget = node_budget
+        self.budget_ms = budget_ms
+        self.memo = {}
+        self.nodes = 0
+        self.deadline = None
+
+        # the search in progress: its last turn, and whether it has had to stop short of the end of the game
+        self.last_turn = None
+        self.cut_off = False
+
+        # the horizon of the last search to finish, and whether it played every line to the end
+        self.horizon = 0
+        self.exact = False
+
+    # (best move, its expected value) over the given opponent hands, or None if we ran out of budget before a search
+    # one turn deep could finish. state is the position as we see it (see GinState.from_match()), with us to move;
+    # only its opponent's hand and deck are replaced, hand by hand.
+    def solve(self, state, opponent_hands):
+        assert state.to_move == self.seat and not state.gameover, "the solver plays for the seat to move"
+        self.nodes = 0
+        self.deadline = time.time() + self.budget_ms / 1000.0 if self.budget_ms is not None else None
+        self.horizon = 0
+        self.exact = False
+
+        known = state.hands[self.seat] | index_mask(state.pile[:state.pile_height])
+        positions = [state.determinize(self.seat, hand, mask_indexes(FULL_MASK & ~(known | hand)))
+                     for hand in opponent_hands]
+
+        best = None
+        for horizon in range(1, state.maximum_turns - state.turns_taken + 2):
+            self.memo = {}
+            self.last_turn = state.turns_taken + horizon
+            self.cut_off = False
+            totals = {}
+            try:
+                for position in positions:
+                    for move, value in self.move_values(position):
+                        totals[move] = totals.get(move, 0.0) + value
+            except EndgameBudgetExceeded:
+                break
+
+            move = max(sorted(totals), key=lambda m: totals[m])
+            best = move, totals[move] / len(positions)
+            self.horizon = horizon
+            if not self.cut_off:
+                self.exact = True
+                break
+        return best
+
+    # [(move, value)] for every move of the seat to move
+    def move_values(self, state):
+        values = []
+        for move in state.legal_moves():
+            if move_kind(move) == DRAW:
+                values.append((move, self.expected_draw(state)))
+            else:
+                state.apply(move)
+                values.append((move, self.value(state)))
+                state.undo()
+        return values
+
+    def value(self, state):
+        if state.gameover:
+            winner, points = state.result()
+            if winner == NOBODY:
+                return 0
+            return points if winner == self.seat else -points
+        if state.turns_taken >= self.last_turn:
+            self.cut_off = True
+            return deadwood(state.hands[1 - self.seat]) - deadwood(state.hands[self.seat])
+
+        key = self.position_key(state)
+        try:
+            return self.memo[key]
+        except KeyError:
+            pass
+
+        self.nodes += 1
+        if self.nodes > self.node_budget:
+            raise EndgameBudgetExceeded()
+        if self.deadline is not None and not self.nodes % self.clock_interval and time.time() > self.deadline:
+            raise EndgameBudgetExceeded()
+
+        values = [value for move, value in self.move_values(state)]
+        best = max(values) if state.to_move == self.seat else min(values)
+        self.memo[key] = best
+        return best
+
+    # what a position's value is memoized on. the deck is a set, as every order of it is averaged over, but the pile
+    # is kept in order: positions that differ only below the top discard differ once it's picked up.
+    @staticmethod
+    def position_key(state):
+        return (state.hands[0], state.hands[1], index_mask(state.deck[:state.deck_height]),
+                state.pile[:state.pile_height].tostring(), state.to_move, state.phase, state.knocker,
+                state.gin_knocker, state.turns_taken)
+
+    # the value of drawing, averaged over each card left in the deck coming up next
+    def expected_draw(self, state):
+        top = state.deck_height - 1
+        deck = state.deck
+        total = 0.0
+        for i in range(state.deck_height):
+            deck[i], deck[top] = deck[top], deck[i]
+            state.apply(DRAW << 6)
+            total += self.value(state)
+            state.undo()
+            deck[i], deck[top] = deck[top], deck[i]
+        return total / state.deck_height
+
+
+# Plays the endgame exactly, and everything before it with another strategy. once the deck is down to threshold
+# cards, each decision is solved over samples hands the opponent might hold: drawn from belief (an
+# belief.OpponentBelief) if we have one, else uniformly from the cards we haven't seen. a search that runs over its
+# budget leaves the decision to the other strategy.
+class EndgameGinStrategy(GinStrategy):
+    def __init__(self, us, opponent, ginmatch, strategy, threshold=6, samples=8, node_budget=20000,
+                 budget_ms=250, belief=None, seed=None):
+        super(EndgameGinStrategy, self).__init__(us, opponent, ginmatch)
+        self.strategy = strategy
+        self.threshold = threshold
+        self.samples = samples
+        self.node_budget = node_budget
+        self.budget_ms = budget_ms
+        self.belief = belief
+
+        # our own random numbers, so sampling doesn't change how the match's cards fall
+        self.rng = random.Random(seed)
+
+        # the last solver's result, or None if we left the last decision to strategy
+        self.solved = None
+
+    # hands the opponent might hold, as card masks
+    def sample_opponent_hands(self, state):
+        if self.belief is not None:
+            random_state = numpy.random.RandomState(self.rng.randint(0, 2 ** 31 - 1))
+            return [index_mask(hand) for hand in self.belief.sample_hands(self.samples, random_state)]
+
+        table = self.us.table
+        held = table.known_masks(self.us)['opponent']
+        seat = 0 if table.player1 is self.us else 1
+        unseen = mask_indexes(FULL_MASK & ~(state.hands[seat] | held | index_mask(state.pile[:state.pile_height])))
+        count = self.opponent.hand.size() - popcount(held)
+        return [held | index_mask(self.rng.sample(unseen, count)) for _ in range(self.samples)]
+
+    def determine_best_action(self, phase=None):
+        self.solved = None
+        if self.us.table.deck_height <= self.threshold:
+            state = GinState.from_match(self.ginmatch)
+            self.solved = EndgameSolver(state.to_move, self.node_budget, self.budget_ms).solve(
+                state, self.sample_opponent_hands(state))
+            if self.solved is not None:
+                return state.action(self.solved[0])
+        return self.strategy.determine_best_action(phase)
@@ -12,7 +12,13 @@ from texttable import *
 from utility import *
 from ginmatch import *
 from neuralnet import *
+from autotune import default_autotuner
+import netfile
 from ginstrategy import *
+from ginkernel import play_match, new_observation, KernelNeuralStrategy
+from ginlockstep import play_games, shuffled_orders, LockstepNeuralStrategy
+from array import array
+import hashlib
 import pickle
 
 
@@ -37,6 +43,11 @@ class GeneSet(object):
     def make_geneset(*args, **kwargs):
         return GeneSet(*args, **kwargs)
 
+    # a digest of our genes' values. identical genomes hash identically, whichever GeneSet object holds them.
+    # genes are mutable (see cross() and mutate()), so this is recomputed on every call.
+    def content_hash(self):
+        return hashlib.sha1(array('d', self.genes).tostring()).hexdigest()
+
     # cross the genes of two GeneSets (sexy times)
     def cross(self, partner):
         # return a new GeneSet with length of longest genome
@@ -75,11 +86,48 @@ class GinGeneSet(GeneSet):
 
 
 class Population(object):
-    def __init__(self, population_size, retain_best=None, local_storage=None):
+    # encoding picks what the networks see:
+    # - 'ranking' (default): our hand and the table as card rankings (1-52), 44 inputs
+    # - 'onehot': 52-card planes for our hand, the cards our opponent is known to hold and the discard pile, plus a
+    #   32-slot deck height plane. 188 inputs, of which only about 10-20 are active at a time.
+    #
+    # strategy picks how networks turn outputs into decisions (see Population.strategies):
+    # - 'signal' (default): NeuralGinStrategy reads the action and card slot off the output neurons
+    # - 'action-value': ActionValueGinStrategy scores every alternative in one batched pass. 'ranking' only.
+    #
+    # engine picks what plays fitness_test()'s matches:
+    # - 'objects' (default): GinMatch, with players, a table and observers
+    # - 'kernel': ginkernel.play_match(), on plain ints and arrays. same results, 'ranking' and 'signal' only.
+    # - 'lockstep': ginlockstep.play_games(), every match of a round at once, each network deciding for all of its
+    #   games in one batched call per step. the same cards as the others, for large populations. needs numpy.
+    strategies = {'signal': NeuralGinStrategy, 'action-value': ActionValueGinStrategy}
+    engines = ('objects', 'kernel', 'lockstep')
+
+    def __init__(self, population_size, retain_best=None, local_storage=None, encoding=None, strategy=None,
+                 engine=None):
         self.member_genes = {}
         self.current_generation = 0
         self.population_size = population_size
-        self.num_inputs = 11 + 33
+        if encoding is None:
+            encoding = 'ranking'
+        assert encoding in ('ranking', 'onehot'), "unknown encoding: " + str(encoding)
+        self.encoding = encoding
+        if strategy is None:
+            strategy = 'signal'
+        assert strategy in Population.strategies, "unknown strategy: " + str(strategy)
+        assert not (strategy == 'action-value' and encoding == 'onehot'), "action-value needs the ranking encoding"
+        self.strategy = strategy
+        if engine is None:
+            engine = 'objects'
+        assert engine in Population.engines, "unknown engine: " + str(engine)
+        assert engine == 'objects' or (encoding == 'ranking' and strategy == 'signal'), \
+            "the kernel and lockstep engines play 'ranking' networks with the 'signal' strategy only"
+        assert engine != 'lockstep' or numpy is not None, "the lockstep engine needs numpy"
+        self.engine = engine
+        if self.encoding == 'onehot':
+            self.num_inputs = 52 + 52 + 52 + 32
+        else:
+            self.num_inputs = 11 + 33
         self.num_outputs = 3
         self.num_hidden = int((self.num_inputs + self.num_outputs) * (2.0 / 3.0))
         self.gene_size = self.num_inputs + (self.num_hidden * self.num_inputs) + (self.num_hidden * self.num_hidden) + (self.num_outputs * self.num_hidden)
@@ -90,6 +138,9 @@ class Population(object):
         else:
             self.retain_best = retain_best
 
+        # compiled networks, reused across every match and generation a genome takes part in
+        self.net_cache = CompiledNetCache()
+
         # persistent storage location
         if local_storage is None:
             self.local_storage = False
@@ -114,6 +165,9 @@ class Population(object):
 
         self.current_generation += 1
 
+        log_info(self.net_cache.stats())
+        log_info(self.decision_cache_stats(reset=True))
+
         # auto-save every so often
         if self.local_storage and self.current_generation % 100 == 0:
             self.persist(action='store')
@@ -154,72 +208,190 @@ class Population(object):
         return (points_per_generation + points_per_win) * winrate_factor
         # return winrate_factor
 
-    # engage each member in competition with each other member, recording the results
-    def fitness_test(self):
+    # return the compiled network for a geneset, compiling and caching it on first use
+    def get_compiled_net(self, geneset, key=None):
+        if key is None:
+            key = geneset.content_hash()
 
-        # keep track of matches
-        matches = []
-        player_geneset_dict = {}
+        def compile_geneset():
+            return self.compile_weightset(self.create_weightset(geneset))
+
+        return self.net_cache.get_or_compile(key, compile_geneset)
+
+    def create_weightset(self, geneset):
+        return WeightSet(geneset, self.num_inputs, self.num_hidden, self.num_outputs)
+
+    # compile a weightset for the way this population feeds its networks
+    def compile_weightset(self, weightset, compiled_class=CompiledNeuralNet):
+        if self.encoding == 'onehot':
+            # every one-hot input gets a weight of its own
+            return compiled_class(weightset, GinNeuralNet.output_keys, sparse_inputs=True)
+        else:
+            return compiled_class(weightset, GinNeuralNet.output_keys, GinNeuralNet.input_widths)
 
-        already_tested = []
+    # the observers feeding one player's network, in input order
+    def create_observers(self, player, opponent, table):
+        if self.encoding == 'onehot':
+            return [SparseObserver(player, 'hand'), SparseObserver(opponent, 'known'),
+                    SparseObserver(table, 'discard'), SparseObserver(table, 'height')]
+        else:
+            return [Observer(player), Observer(table)]
+
+    # the backend for one pulse at a time, as tuned on this machine. one-hot networks pulse through
+    # forward_active(), which only the pure-Python kernel has.
+    def choose_backend(self, compiled):
+        if self.encoding == 'onehot':
+            return 'python'
+        return default_autotuner().choose('pulse', 1, compiled)
+
+    # the backend for scoring a decision's afterstates (12 at most) in one pass, for the action-value strategy
+    def choose_batch_backend(self, compiled):
+        if self.strategy != 'action-value':
+            return None
+        return default_autotuner().choose('afterstates', 12, compiled)
+
+    # the backend for deciding batch_size lockstep games in one pass (see lockstep_fitness_test())
+    def choose_lockstep_backend(self, compiled, batch_size):
+        return default_autotuner().choose('batch', batch_size, compiled)
+
+    # create a match between two genesets, each player driven by its (cached) compiled network
+    def create_match(self, challenger_geneset, defender_geneset, challenger_key=None, defender_key=None,
+                     tracer=None):
+        # create physical representations for these gene_sets
+        challenger_player = GinPlayer()
+        defender_player = GinPlayer()
+
+        match = GinMatch(challenger_player, defender_player)
+
+        challenger_compiled = self.get_compiled_net(challenger_geneset, challenger_key)
+        defender_compiled   = self.get_compiled_net(defender_geneset,   defender_key)
+
+        challenger_observers = self.create_observers(challenger_player, defender_player, match.table)
+        defender_observers   = self.create_observers(defender_player, challenger_player, match.table)
+
+        challenger_neuralnet = BoundNeuralNet(challenger_observers, challenger_compiled,
+                                              self.choose_backend(challenger_compiled),
+                                              self.choose_batch_backend(challenger_compiled))
+        defender_neuralnet   = BoundNeuralNet(defender_observers,   defender_compiled,
+                                              self.choose_backend(defender_compiled),
+                                              self.choose_batch_backend(defender_compiled))
+
+        # ranking networks read a window of the match's input buffer: our hand, then the table. attaching freezes the
+        # buffer, so both windows are laid out first.
+        if self.encoding == 'ranking':
+            challenger_offset = match.inputs.add_window([challenger_player, match.table])[0]
+            defender_offset = match.inputs.add_window([defender_player, match.table])[0]
+            challenger_neuralnet.attach_inputs(match.inputs, challenger_offset)
+            defender_neuralnet.attach_inputs(match.inputs, defender_offset)
+
+        strategy_class = Population.strategies[self.strategy]
+        challenger_strategy = strategy_class(challenger_player, defender_player, match, challenger_neuralnet)
+        defender_strategy = strategy_class(defender_player, challenger_player, match, defender_neuralnet)
+
+        challenger_player.strategy = challenger_strategy
+        defender_player.strategy = defender_strategy
+
+        if tracer is not None:
+            match.attach_tracer(tracer)
+
+        return match
+
+    # engage each member in competition with each other member, recording the results. tracer, if given, traces
+    # every match (see GinMatch.attach_tracer()).
+    def fitness_test(self, tracer=None):
+
+        # hash each genome once per generation
+        geneset_keys = {}
+        for geneset in self.member_genes:
+            geneset_keys[geneset] = geneset.content_hash()
+
+        # do not test both A vs B AND B vs A. Just test them once.
+        pairings = []
+        paired = set()
         for challenger_geneset in self.member_genes:
             for defender_geneset in self.member_genes:
                 if challenger_geneset is not defender_geneset:
-                    # do not test both A vs B AND B vs A. Just test them once.
-                    if (challenger_geneset, defender_geneset) in already_tested or (
-                        defender_geneset, challenger_geneset) in already_tested:
+                    if (defender_geneset, challenger_geneset) in paired:
                         continue
-                    already_tested.append((challenger_geneset, defender_geneset))
-
-                    # create physical representations for these gene_sets
-                    challenger_player = GinPlayer()
-                    defender_player = GinPlayer()
-
-                    # store these in a lookup table
-                    player_geneset_dict[str(challenger_player.id)] = challenger_geneset
-                    player_geneset_dict[str(defender_player.id)]   = defender_geneset
-
-                    log_debug("Testing: {0} vs {1}".format(challenger_geneset, defender_geneset))
-
-                    match = GinMatch(challenger_player, defender_player)
-
-                    challenger_weightset = WeightSet(challenger_geneset, self.num_inputs, self.num_hidden, self.num_outputs)
-                    defender_weightset = WeightSet(defender_geneset, self.num_inputs, self.num_hidden,self.num_outputs)
-
-                    challenger_observers = [Observer(challenger_player), Observer(match.table)]
-                    defender_observers   = [Observer(defender_player), Observer(match.table)]
-
-                    challenger_neuralnet = GinNeuralNet(challenger_observers, challenger_weightset)
-                    defender_neuralnet   = GinNeuralNet(defender_observers,   defender_weightset)
-
-                    challenger_strategy = NeuralGinStrategy(challenger_player, defender_player, match,
-                                                            challenger_neuralnet)
-                    defender_strategy = NeuralGinStrategy(defender_player, challenger_player, match,
-                                                          defender_neuralnet)
-
-                    challenger_player.strategy = challenger_strategy
-                    defender_player.strategy = defender_strategy
-
-                    # send the match to a worker and store a handle for later use
-                    matches.append(match)
-
-        # run matches and record output
-        for match in matches:
-            # run the match
+                    paired.add((challenger_geneset, defender_geneset))
+                    pairings.append((challenger_geneset, defender_geneset))
+
+        # the kernel and lockstep engines have nothing to trace, so a traced round plays on the objects
+        engine = getattr(self, 'engine', 'objects')
+        if engine == 'kernel' and tracer is None:
+            self.kernel_fitness_test(pairings, geneset_keys)
+            return
+        if engine == 'lockstep' and tracer is None:
+            self.lockstep_fitness_test(pairings, geneset_keys)
+            return
+
+        # build, run and tear down one match at a time, so only the match in flight holds observers and networks
+        for p1_gene, p2_gene in pairings:
+            log_debug("Testing: {0} vs {1}", p1_gene, p2_gene)
+
+            match = self.create_match(p1_gene, p2_gene, geneset_keys[p1_gene], geneset_keys[p2_gene], tracer)
             match.run()
 
-            p1_gene = player_geneset_dict[str(match.p1.id)]
-            p2_gene = player_geneset_dict[str(match.p2.id)]
-
             # update our records
-            self.member_genes[p1_gene]['game_wins']    += match.p1_wins
-            self.member_genes[p2_gene]['game_wins']    += match.p2_wins
-            self.member_genes[p1_gene]['game_losses']  += match.p1_losses
-            self.member_genes[p2_gene]['game_losses']  += match.p2_losses
-            self.member_genes[p1_gene]['game_draws']   += match.p1_draws
-            self.member_genes[p2_gene]['game_draws']   += match.p2_draws
-            self.member_genes[p1_gene]['game_points']  += max(match.p1_score - match.p2_score, 0)
-            self.member_genes[p2_gene]['game_points']  += max(match.p2_score - match.p1_score, 0)
+            self.record_match(p1_gene, p2_gene, match.p1_score, match.p2_score, match.p1_wins, match.p2_wins,
+                              match.p1_draws)
+
+            match.close()
+
+    # fitness_test() on ginkernel: the same matches, dealt the same cards, without building a GinMatch for each
+    def kernel_fitness_test(self, pairings, geneset_keys):
+        observation = new_observation()
+        strategies = {}
+        for p1_gene, p2_gene in pairings:
+            log_debug("Testing: {0} vs {1}", p1_gene, p2_gene)
+            for geneset in (p1_gene, p2_gene):
+                if geneset not in strategies:
+                    compiled = self.get_compiled_net(geneset, geneset_keys[geneset])
+                    strategies[geneset] = KernelNeuralStrategy(compiled, self.choose_backend(compiled), observation)
+
+            result = play_match([strategies[p1_gene], strategies[p2_gene]], observation)
+            p1_score, p2_score, p1_wins, p2_wins, draws = result.tally()
+            self.record_match(p1_gene, p2_gene, p1_score, p2_score, p1_wins, p2_wins, draws)
+
+    # fitness_test() on ginlockstep: every match of the round played at once, dealt the cards the round would be
+    # dealt a match at a time
+    def lockstep_fitness_test(self, pairings, geneset_keys):
+        orders = shuffled_orders(len(pairings))
+        genesets = []
+        indexes = {}
+        for pairing in pairings:
+            for geneset in pairing:
+                if geneset not in indexes:
+                    indexes[geneset] = len(genesets)
+                    genesets.append(geneset)
+        # a network holds one seat or the other in each of its games, so it's to move in about half of them a step
+        games = dict((geneset, 0) for geneset in genesets)
+        for pairing in pairings:
+            for geneset in pairing:
+                games[geneset] += 1
+        strategies = []
+        for geneset in genesets:
+            compiled = self.get_compiled_net(geneset, geneset_keys[geneset])
+            backend = self.choose_lockstep_backend(compiled, (games[geneset] + 1) // 2)
+            strategies.append(LockstepNeuralStrategy(compiled, backend))
+        seats = [(indexes[p1_gene], indexes[p2_gene]) for p1_gene, p2_gene in pairings]
+
+        results = play_games(orders, seats, strategies)
+        for (p1_gene, p2_gene), result in zip(pairings, results):
+            log_debug("Tested: {0} vs {1}: {2}", p1_gene, p2_gene, result)
+            p1_score, p2_score, p1_wins, p2_wins, draws = result.tally()
+            self.record_match(p1_gene, p2_gene, p1_score, p2_score, p1_wins, p2_wins, draws)
+
+    # add one match's results to both members' records
+    def record_match(self, p1_gene, p2_gene, p1_score, p2_score, p1_wins, p2_wins, draws):
+        self.member_genes[p1_gene]['game_wins']    += p1_wins
+        self.member_genes[p2_gene]['game_wins']    += p2_wins
+        self.member_genes[p1_gene]['game_losses']  += p2_wins
+        self.member_genes[p2_gene]['game_losses']  += p1_wins
+        self.member_genes[p1_gene]['game_draws']   += draws
+        self.member_genes[p2_gene]['game_draws']   += draws
+        self.member_genes[p1_gene]['game_points']  += max(p1_score - p2_score, 0)
+        self.member_genes[p2_gene]['game_points']  += max(p2_score - p1_score, 0)
 
     # remove members from prior generations, sparing the top N specimens
     def cull(self):
@@ -327,6 +499,56 @@ class Population(object):
 
         return output_text
 
+    # decision cache hit rate across every cached network, since the last reset
+    def decision_cache_stats(self, reset=False):
+        hits = misses = 0
+        for compiled in self.net_cache.values():
+            hits += compiled.decision_cache.hits
+            misses += compiled.decision_cache.misses
+            if reset:
+                compiled.decision_cache.reset_stats()
+        lookups = hits + misses
+        hit_rate = float(hits) / lookups if lookups else 0.0
+        return "decisions: {0} cached, {1} computed ({2:.1%} hit rate)".format(hits, misses, hit_rate)
+
+    # how geneset's network fares against HeuristicGinStrategy, alternating seats: the fraction of games it wins,
+    # draws and loses. unlike the rest of the population, the heuristic doesn't evolve, so this is a fixed yardstick.
+    def heuristic_results(self, geneset, games=20):
+        results = {'win': 0, 'draw': 0, 'loss': 0}
+        for i in range(games):
+            match = self.create_match(geneset, geneset)
+            if i % 2 == 0:
+                match.p2.strategy = HeuristicGinStrategy(match.p2, match.p1, match)
+            else:
+                match.p1.strategy = HeuristicGinStrategy(match.p1, match.p2, match)
+            match.run()
+
+            if i % 2 == 0:
+                wins, draws, losses = match.p1_wins, match.p1_draws, match.p1_losses
+            else:
+                wins, draws, losses = match.p2_wins, match.p2_draws, match.p2_losses
+            match.close()
+            results['win'] += wins
+            results['draw'] += draws
+            results['loss'] += losses
+
+        total = max(1, sum(results.values()))
+        return dict((key, float(value) / total) for key, value in results.items())
+
+    # write one member's network to path in the binary format of netfile.py, for netfile.load_network() to map
+    def export_network(self, geneset, path, float_size=8):
+        netfile.export_network(self.get_compiled_net(geneset), path, float_size)
+
+    # the compiled network cache is rebuilt on demand, so we leave it out of persistence
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('net_cache', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.net_cache = CompiledNetCache()
+
     def persist(self, action=None):
         assert action is not None, "must specify an action when calling persist()"
         # by default, do not persist
@@ -344,7 +566,8 @@ class Population(object):
                 # we make a new copy of the object, then we copy its __dict__ into our own __dict__
                 restored = pickle.load(open(self.local_storage, 'r'))
                 for key in self.__dict__:
-                    self.__dict__[key] = restored.__dict__[key]
+                    if key in restored.__dict__:
+                        self.__dict__[key] = restored.__dict__[key]
                 return True
             except:
                 return False
\ No newline at end of file
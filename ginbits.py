@@ -0,0 +1,175 @@
+#!/usr/bin/python
+#
+# ginbits.py
+#
+# 2026/10/19
+# rg
+#
+# gin rummy hand arithmetic on 52-bit card masks. bit i is the card with Card.index() i, so each suit is a 13 bit
+# segment (clubs lowest, then diamonds, hearts, spades) with aces in the segment's lowest bit. runs are shifts
+# within a segment, and sets are ands across segments.
+#
+# deadwood() reproduces GinHand.deadwood_count() exactly, including its quirks: leftover groups of one or two cards
+# count their ranks rather than their point values, and melds are explored by setting aside a whole suit (for a
+# run) or a whole rank (for a set) at a time.
+
+SUIT_BITS = 13
+SUIT_MASK = (1 << SUIT_BITS) - 1
+FULL_MASK = (1 << 52) - 1
+
+_rank = [i % SUIT_BITS + 1 for i in range(52)]
+_points = [min(rank, 10) for rank in _rank]
+
+
+def card_mask(cards):
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.index()
+    return mask
+
+
+def index_mask(indexes):
+    mask = 0
+    for index in indexes:
+        mask |= 1 << index
+    return mask
+
+
+def mask_indexes(mask):
+    indexes = []
+    while mask:
+        low = mask & -mask
+        indexes.append(low.bit_length() - 1)
+        mask ^= low
+    return indexes
+
+
+def popcount(mask):
+    return bin(mask).count('1')
+
+
+# per-segment lookup tables: the points and rank sum of every 13 bit suit segment, and the cards of it in runs
+def _segment_table(value):
+    table = [0] * (1 << SUIT_BITS)
+    for segment in range(1, 1 << SUIT_BITS):
+        low = segment & -segment
+        table[segment] = table[segment ^ low] + value(low.bit_length())
+    return table
+
+_segment_points = _segment_table(lambda rank: min(rank, 10))
+_segment_ranks = _segment_table(lambda rank: rank)
+
+
+def points(mask):
+    return (_segment_points[mask & SUIT_MASK] + _segment_points[(mask >> 13) & SUIT_MASK] +
+            _segment_points[(mask >> 26) & SUIT_MASK] + _segment_points[mask >> 39])
+
+
+def rank_sum(mask):
+    return (_segment_ranks[mask & SUIT_MASK] + _segment_ranks[(mask >> 13) & SUIT_MASK] +
+            _segment_ranks[(mask >> 26) & SUIT_MASK] + _segment_ranks[mask >> 39])
+
+
+def suit_segments(mask):
+    return [(mask >> (SUIT_BITS * suit)) & SUIT_MASK for suit in range(4)]
+
+
+# the cards of one 13 bit suit segment that sit in a run of three or more
+def run_cards(segment):
+    starts = segment & (segment >> 1) & (segment >> 2)
+    return (starts | (starts << 1) | (starts << 2)) & SUIT_MASK
+
+_segment_runs = [run_cards(segment) for segment in range(1 << SUIT_BITS)]
+
+
+# 13 bit mask of the ranks held in at least three suits
+def set_ranks(mask):
+    c, d, h, s = suit_segments(mask)
+    return (c & d & h) | (c & d & s) | (c & h & s) | (d & h & s)
+
+
+# 13 bit mask of the ranks held in at least two suits
+def pair_ranks(mask):
+    c, d, h, s = suit_segments(mask)
+    return (c & d) | (c & h) | (c & s) | (d & h) | (d & s) | (h & s)
+
+
+def spread_ranks(ranks):
+    return ranks | (ranks << SUIT_BITS) | (ranks << 2 * SUIT_BITS) | (ranks << 3 * SUIT_BITS)
+
+
+# every card of mask that is part of some run or set
+def meld_cards(mask):
+    return (spread_ranks(set_ranks(mask)) & mask | _segment_runs[mask & SUIT_MASK] |
+            _segment_runs[(mask >> 13) & SUIT_MASK] << 13 | _segment_runs[(mask >> 26) & SUIT_MASK] << 26 |
+            _segment_runs[mask >> 39] << 39)
+
+
+# memo of _examine() results, dropped wholesale once it grows past _EXAMINED_LIMIT entries
+_examined = {}
+_EXAMINED_LIMIT = 200000
+
+
+def _examine(mask):
+    try:
+        return _examined[mask]
+    except KeyError:
+        pass
+
+    count = popcount(mask)
+    if count == 0:
+        best = 0
+    elif count < 3:
+        best = rank_sum(mask)
+    else:
+        best = points(mask)
+        for suit, segment in enumerate(suit_segments(mask)):
+            if run_cards(segment):
+                best = min(best, _examine(mask & ~(SUIT_MASK << (SUIT_BITS * suit))))
+        ranks = set_ranks(mask)
+        while ranks:
+            low = ranks & -ranks
+            best = min(best, _examine(mask & ~spread_ranks(low)))
+            ranks ^= low
+
+    if len(_examined) >= _EXAMINED_LIMIT:
+        _examined.clear()
+    _examined[mask] = best
+    return best
+
+
+# lowest deadwood count of a hand, as GinHand.deadwood_count() scores it
+def deadwood(mask):
+    melded = meld_cards(mask)
+    return min(points(mask), _examine(melded) + points(mask & ~melded))
+
+
+# the cards that would complete a run of three with two cards of a 13 bit suit segment
+def run_outs(segment):
+    return (((segment >> 1) & (segment >> 2)) | ((segment << 1) & (segment >> 1)) |
+            ((segment << 1) & (segment << 2))) & SUIT_MASK
+
+_segment_outs = [run_outs(segment) for segment in range(1 << SUIT_BITS)]
+
+
+# unseen cards that would make a new run or set with the cards in mask
+def outs(mask, unseen=FULL_MASK):
+    found = (spread_ranks(pair_ranks(mask)) | _segment_outs[mask & SUIT_MASK] |
+             _segment_outs[(mask >> 13) & SUIT_MASK] << 13 | _segment_outs[(mask >> 26) & SUIT_MASK] << 26 |
+             _segment_outs[mask >> 39] << 39)
+    return found & ~mask & unseen
+
+
+# (lowest deadwood after discarding, list of deadwood after discarding each card in index order). a card in no run
+# or set can't break one up, so dropping it only takes its points off; we only score the melded cards' discards.
+def discard_deadwoods(mask):
+    melded = meld_cards(mask)
+    base = deadwood(mask)
+    after = []
+    for index in mask_indexes(mask):
+        bit = 1 << index
+        if melded & bit:
+            after.append(deadwood(mask & ~bit))
+        else:
+            after.append(base - _points[index])
+    return min(after), after
@@ -25,4 +25,9 @@ class GinDeck(Deck):
     # deal out GinCards, rather than base Cards
     def deal_a_card(self):
         card = super(GinDeck, self).deal_a_card()
-        return GinCard(card.rank, card.suit)
\ No newline at end of file
+        return GinCard(card.rank, card.suit)
+
+
+# one shared GinCard per card index (Ac=0, ..., Ks=51). cards are never modified, so tables hand these out rather
+# than building a new card on every deal
+GIN_CARDS = [GinCard(rank, suit) for suit in ('c', 'd', 'h', 's') for rank in range(1, 14)]
@@ -12,6 +12,7 @@ from operator import attrgetter, itemgetter
 from gindeck import *
 from utility import *
 import bisect
+import ginbits
 
 
 # card organization and management. takes as input an array of card tuples. maintains objects internally as GinCards
@@ -19,6 +20,8 @@ import bisect
 class GinCardGroup:
     def __init__(self, card_list=None):
         self.cards = []
+        # our cards as a card mask (see ginbits), kept up to date by add_card() and discard()
+        self.card_bits = 0
         if card_list is not None:
             for card in card_list:
                 self.add_card(card)
@@ -49,6 +52,7 @@ class GinCardGroup:
     # add a card
     def add_card(self, card):
         assert isinstance(card, Card), "trying to add something that isn't a card"
+        self.card_bits |= 1 << card.index()
         # first card goes in by itself
         if len(self.cards) == 0:
             self.cards.append(card)
@@ -61,6 +65,7 @@ class GinCardGroup:
         for c in self.cards:
             if c.rank == requested.rank and c.suit == requested.suit:
                 self.cards.remove(c)
+                self.card_bits &= ~(1 << c.index())
 
     # sort by rank, suit.  option to reverse sort order.
     def sort(self, by_suit=False):
@@ -413,6 +418,35 @@ class GinHand(GinCardGroup):
     def __init__(self):
         GinCardGroup.__init__(self)
 
+    # the what-if API: deadwood of the hands one card away from ours, worked out on card masks (see ginbits) rather
+    # than by enumerating melds. scores agree with deadwood_count(). "hand order" is the order of self.cards, which
+    # (sorted by ranking) is also card index order.
+    def mask(self):
+        return self.card_bits
+
+    def quick_deadwood(self):
+        return ginbits.deadwood(self.mask())
+
+    # deadwood left after discarding each of our cards, in hand order
+    def deadwood_after_discards(self):
+        return ginbits.discard_deadwoods(self.mask())[1]
+
+    # lowest deadwood we could hold after taking card and discarding one of our others
+    def deadwood_after_pickup(self, card):
+        index = card.index()
+        mask = self.card_bits | (1 << index)
+        after = ginbits.discard_deadwoods(mask)[1]
+        del after[ginbits.popcount(mask & ((1 << index) - 1))]
+        return min(after)
+
+    # how many of the unseen cards would make a new run or set after discarding the card in slot
+    def outs_after_discard(self, slot, unseen=ginbits.FULL_MASK):
+        return ginbits.popcount(ginbits.outs(self.card_bits & ~(1 << self.cards[slot].index()), unseen))
+
+    # outs_after_discard() for each of our cards, in hand order
+    def outs_after_discards(self, unseen=ginbits.FULL_MASK):
+        return [self.outs_after_discard(slot, unseen) for slot in range(len(self.cards))]
+
     # compare our hand against another hand and modify our hand in place, removing all cards that have been layed off
     def process_layoff(self, knocking_hand):
         """@type knocking_hand: GinHand"""
@@ -0,0 +1,227 @@
+#!/usr/bin/python
+#
+# ginkernel.py
+#
+# 2026/10/19
+# rg
+#
+# one game of gin played on plain integers and arrays: the deck as an order of card indexes, hands as card masks
+# (see ginbits) and the discard pile as a stack of card indexes. there are no players, tables or observers; each
+# decision goes to a strategy callback, strategy(phase, observation), which answers as
+# GinStrategy.determine_best_action() does, with [action name, slot in hand].
+#
+# the observation is one preallocated array('d'), rewritten in place before each decision. it holds what a 'ranking'
+# network sees through the match's InputBuffer (see Population.create_match()): the hand to move as 11 rankings in
+# hand order, then the table as the deck height followed by 32 discard pile rankings.
+#
+# given the same deck order and the same decisions, play_game() plays out exactly as GinMatch.play_game() does: the
+# same deal, the same draws-by-turn-limit, improper knocks left pending for the next player (see GinMatch.take_turns())
+# and the same scoring. play_match() also draws on the random module exactly as a GinMatch does, so a run of kernel
+# matches deals the same cards as a run of GinMatches would.
+
+from ginbits import *
+from ginstrategy import NeuralGinStrategy
+from activation import numpy
+from array import array
+import random
+
+HAND_WIDTH = 11
+TABLE_WIDTH = 33
+OBSERVATION_WIDTH = HAND_WIDTH + TABLE_WIDTH
+
+NOBODY = -1
+
+
+def new_observation():
+    return array('d', [0.0] * OBSERVATION_WIDTH)
+
+
+# the end of a game: winner is 0 (GinMatch's p1), 1, or None for a drawn game, and points what the winner scored
+class GameResult(object):
+    __slots__ = ('winner', 'points', 'turns_taken')
+
+    def __init__(self, winner, points, turns_taken):
+        self.winner = winner
+        self.points = points
+        self.turns_taken = turns_taken
+
+    def __repr__(self):
+        return "<ginkernel.GameResult winner:" + str(self.winner) + " points:" + str(self.points) + \
+               " turns_taken:" + str(self.turns_taken) + ">"
+
+    # (p1 score, p2 score, p1 wins, p2 wins, draws), as GinMatch's score board would count this game
+    def tally(self):
+        if self.winner is None:
+            return 0, 0, 0, 0, 1
+        elif self.winner == 0:
+            return self.points, 0, 1, 0, 0
+        return 0, self.points, 0, 1, 0
+
+
+# write the hand's slots of observation: rankings (card index + 1) in hand order, padded with 0s
+def write_hand(observation, hand):
+    slot = 0
+    while hand:
+        low = hand & -hand
+        observation[slot] = low.bit_length()
+        hand ^= low
+        slot += 1
+    while slot < HAND_WIDTH:
+        observation[slot] = 0
+        slot += 1
+
+
+# play one game. order is the deck, dealt from the end (as GinTable deals deck_cards), and strategies one callback
+# per seat.
+def play_game(order, strategies, observation=None, knocking_point=10, maximum_turns=60):
+    if observation is None:
+        observation = new_observation()
+    deck = order
+    height = len(order)
+
+    # GinMatch.deal_cards(): ten each, then an eleventh to p1
+    hands = [0, 0]
+    for _ in range(10):
+        height -= 1
+        hands[0] |= 1 << deck[height]
+        height -= 1
+        hands[1] |= 1 << deck[height]
+    height -= 1
+    hands[0] |= 1 << deck[height]
+    sizes = [11, 10]
+
+    pile = array('b', [0] * 52)
+    pile_height = 0
+    for slot in range(HAND_WIDTH, OBSERVATION_WIDTH):
+        observation[slot] = 0
+    observation[HAND_WIDTH] = height
+
+    # GinMatch's player_who_knocked and player_who_knocked_gin, as seats
+    knocker = NOBODY
+    gin_knocker = NOBODY
+    gameover = False
+    turns_taken = 0
+
+    while not gameover:
+        if height <= 2 or turns_taken >= maximum_turns:
+            return GameResult(None, 0, turns_taken)
+
+        for seat in (0, 1):
+            strategy = strategies[seat]
+            if sizes[seat] == 10:
+                write_hand(observation, hands[seat])
+                name = strategy('start', observation)[0]
+                if name == 'DRAW':
+                    height -= 1
+                    hands[seat] |= 1 << deck[height]
+                    observation[HAND_WIDTH] = height
+                elif name == 'PICKUP-FROM-DISCARD':
+                    assert pile_height, "tried to pickup on the first move (with 11 cards)"
+                    if pile_height < TABLE_WIDTH:
+                        observation[HAND_WIDTH + pile_height] = 0
+                    pile_height -= 1
+                    hands[seat] |= 1 << pile[pile_height]
+                else:
+                    raise ValueError("not an action to start a turn with: " + str(name))
+                sizes[seat] = 11
+
+            write_hand(observation, hands[seat])
+            name, slot = strategy('end', observation)
+            if slot > 10 or slot < 0:
+                raise Exception("no card in slot " + str(slot))
+            card = mask_indexes(hands[seat])[slot]
+            hands[seat] &= ~(1 << card)
+            sizes[seat] = 10
+            pile[pile_height] = card
+            pile_height += 1
+            if pile_height < TABLE_WIDTH:
+                observation[HAND_WIDTH + pile_height] = card + 1
+
+            if name == 'KNOCK':
+                knocker = seat
+            elif name == 'KNOCK-GIN':
+                gin_knocker = seat
+            elif name != 'DISCARD':
+                raise ValueError("not an action to end a turn with: " + str(name))
+
+            # GinMatch.process_knock() and process_knock_gin(), for whoever just played
+            if knocker != NOBODY:
+                deadwood_count = deadwood(hands[seat])
+                if deadwood_count == 0:
+                    knocker = NOBODY
+                    gin_knocker = seat
+                    gameover = True
+                elif deadwood_count <= knocking_point:
+                    knocker = seat
+                    gameover = True
+            elif gin_knocker != NOBODY:
+                if deadwood(hands[seat]) == 0:
+                    gin_knocker = seat
+                    gameover = True
+
+            turns_taken += 1
+            if gameover:
+                break
+
+    # GinMatch.update_score(). a pending gin outranks a knock.
+    first = 0 if 0 in (knocker, gin_knocker) else 1
+    defender_deadwood = deadwood(hands[1 - first])
+    if gin_knocker != NOBODY:
+        return GameResult(first, defender_deadwood + 25, turns_taken)
+    knocker_deadwood = deadwood(hands[first])
+    points = abs(knocker_deadwood - defender_deadwood)
+    if defender_deadwood <= knocker_deadwood:
+        return GameResult(1 - first, points + 25, turns_taken)
+    return GameResult(first, points, turns_taken)
+
+
+# one game between strategies, shuffling as a GinMatch does: once when its table is set up (the deck we play) and
+# once more when the game is cleared away
+def play_match(strategies, observation=None, knocking_point=10, maximum_turns=60):
+    order = range(52)
+    random.shuffle(order)
+    result = play_game(order, strategies, observation, knocking_point, maximum_turns)
+    random.shuffle(range(52))
+    return result
+
+
+# NeuralGinStrategy as a kernel callback: decisions decoded from a compiled ranking network's outputs, run on the same
+# backend a BoundNeuralNet reading an InputBuffer would use, and shared with it through the network's decision cache
+class KernelNeuralStrategy(object):
+    def __init__(self, compiled, backend='python', observation=None):
+        self.compiled = compiled
+        self.observation = observation if observation is not None else new_observation()
+        self.keys = compiled.output_keys
+        self.cache = getattr(compiled, 'decision_cache', None)
+
+        # see BoundNeuralNet.attach_inputs() and pulse()
+        self.kernel = compiled.kernel(backend)
+        self.view = None
+        if backend != 'python' and numpy is not None:
+            self.view = numpy.frombuffer(self.observation, dtype=float, count=len(compiled.input_weights))
+
+    def decide(self, phase):
+        if self.view is not None:
+            values = self.kernel.forward(self.view)
+        else:
+            values = self.compiled.forward(self.observation)
+        outputs = dict(zip(self.keys, values))
+        if phase == 'start':
+            actions = NeuralGinStrategy.start_actions
+            action = actions[NeuralGinStrategy.decode_signal(outputs['action_start'], len(actions))]
+        else:
+            actions = NeuralGinStrategy.end_actions
+            action = actions[NeuralGinStrategy.decode_signal(outputs['action_end'], len(actions))]
+        return [action, NeuralGinStrategy.decode_signal(outputs['index'], 11)]
+
+    def __call__(self, phase, observation):
+        if observation is not self.observation:
+            self.observation[:] = observation
+        if self.cache is None:
+            return self.decide(phase)
+        key = (phase, tuple(observation))
+        decision = self.cache.get(key)
+        if decision is None:
+            decision = self.decide(phase)
+            self.cache.put(key, decision)
+        return list(decision)
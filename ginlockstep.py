@@ -0,0 +1,275 @@
+#!/usr/bin/python
+#
+# ginlockstep.py
+#
+# 2026/10/19
+# rg
+#
+# many games of gin played side by side, a decision at a time. the games are stored as numpy arrays, a row per game:
+# deck orders and heights, both hands as card masks (see ginbits), discard stacks and heights, and whose turn, which
+# phase of it, any pending knock and the turn count. each step() advances every game still in play by one decision
+# (a draw or pickup, or a discard, knock or gin) and rules on knocks, draws and scores as ginkernel.play_game() does;
+# a game that ends drops out of the steps that follow.
+#
+# the decisions for a step are made a strategy at a time, each strategy handed every game it is to move in at once:
+# strategy(phases, observations), where observations has a row per game holding what that game's player to move
+# sees (as ginkernel lays it out) and phases says which phase of its turn each row is in. it answers with the move
+# kind (see ginstate) and hand slot for each row. a network strategy makes one batched call per step, whatever the
+# number of games.
+#
+# knocks are ruled on a game at a time, through ginbits.deadwood(). a knock left pending is ruled on again after
+# every turn, though, so we first bound each hand's deadwood from below for every knocking game at once (see
+# deadwood_floor()), and only take hands that might stand to ginbits.
+
+from ginkernel import HAND_WIDTH, TABLE_WIDTH, OBSERVATION_WIDTH, GameResult
+from ginstate import DRAW, PICKUP, DISCARD, KNOCK, KNOCK_GIN, MOVE_NAMES, START, END, NOBODY
+from ginstrategy import NeuralGinStrategy
+from activation import numpy
+import ginbits
+import random
+
+if numpy is not None:
+    ONE = numpy.uint64(1)
+    SHIFTS = numpy.arange(52, dtype=numpy.uint64)
+
+    # per 13 bit suit segment: the cards in runs, and the points
+    SEGMENT_RUNS = numpy.array([ginbits.run_cards(segment) for segment in range(1 << ginbits.SUIT_BITS)])
+    SEGMENT_POINTS = numpy.array([ginbits.points(segment) for segment in range(1 << ginbits.SUIT_BITS)])
+
+
+# the bits of each card mask, as a row of 52 0s and 1s
+def mask_bits(masks):
+    return ((masks[:, None] >> SHIFTS) & ONE).astype(numpy.int8)
+
+
+def card_bits(cards):
+    return ONE << cards.astype(numpy.uint64)
+
+
+# for each card mask, the points of its cards in no run or set. no way of melding the hand scores less than these
+# cards, so a floor above the knocking point can't knock and a floor above 0 can't go gin.
+def deadwood_floor(masks):
+    suit_mask = numpy.uint64(ginbits.SUIT_MASK)
+    segments = [((masks >> numpy.uint64(ginbits.SUIT_BITS * suit)) & suit_mask).astype(numpy.int64)
+                for suit in range(4)]
+    c, d, h, s = segments
+    sets = (c & d & h) | (c & d & s) | (c & h & s) | (d & h & s)
+    floor = numpy.zeros(len(masks), dtype=numpy.int64)
+    for segment in segments:
+        floor += SEGMENT_POINTS[segment & ~(SEGMENT_RUNS[segment] | sets)]
+    return floor
+
+
+class LockstepGames(object):
+    # orders holds one deck per game, dealt from the end (as play_game() takes order)
+    def __init__(self, orders, knocking_point=10, maximum_turns=60):
+        assert numpy is not None, "lockstep games need numpy"
+        self.deck = numpy.array(orders, dtype=numpy.int64)
+        count = len(self.deck)
+        self.count = count
+        self.knocking_point = knocking_point
+        self.maximum_turns = maximum_turns
+
+        # GinMatch.deal_cards(): ten each, then an eleventh to p1
+        self.hands = numpy.zeros((count, 2), dtype=numpy.uint64)
+        for position in range(51, 31, -2):
+            self.hands[:, 0] |= card_bits(self.deck[:, position])
+            self.hands[:, 1] |= card_bits(self.deck[:, position - 1])
+        self.hands[:, 0] |= card_bits(self.deck[:, 31])
+        self.height = numpy.full(count, 31, dtype=numpy.int64)
+
+        self.pile = numpy.zeros((count, 52), dtype=numpy.int64)
+        self.pile_height = numpy.zeros(count, dtype=numpy.int64)
+
+        # the table's part of each observation: the deck height, then the discard pile's first 32 rankings
+        self.table = numpy.zeros((count, TABLE_WIDTH))
+        self.table[:, 0] = self.height
+
+        self.to_move = numpy.zeros(count, dtype=numpy.int64)
+        self.phase = numpy.full(count, END, dtype=numpy.int64)
+        self.turns_taken = numpy.zeros(count, dtype=numpy.int64)
+        self.knocker = numpy.full(count, NOBODY, dtype=numpy.int64)
+        self.gin_knocker = numpy.full(count, NOBODY, dtype=numpy.int64)
+
+        self.active = numpy.ones(count, dtype=bool)
+        self.winner = numpy.full(count, NOBODY, dtype=numpy.int64)
+        self.points = numpy.zeros(count, dtype=numpy.int64)
+
+        self.steps = 0
+        self.check_draws(numpy.arange(count))
+
+    # games drawn when a round starts with two cards or fewer in the deck, or the turn limit reached
+    def check_draws(self, rows):
+        drawn = rows[(self.height[rows] <= 2) | (self.turns_taken[rows] >= self.maximum_turns)]
+        self.active[drawn] = False
+
+    # what the player to move sees in each of rows, and the bits of their hand
+    def observe(self, rows):
+        bits = mask_bits(self.hands[rows, self.to_move[rows]])
+        slots = numpy.cumsum(bits, axis=1)
+        observations = numpy.zeros((len(rows), OBSERVATION_WIDTH))
+        held, cards = numpy.nonzero(bits)
+        observations[held, slots[held, cards] - 1] = cards + 1
+        observations[:, HAND_WIDTH:] = self.table[rows]
+        return observations, slots
+
+    # one decision in every game still in play. strategies holds the strategies, and seats the strategy playing each
+    # game's seats (as a row per game of two indexes into strategies). returns how many games are still in play.
+    def step(self, strategies, seats):
+        rows = numpy.flatnonzero(self.active)
+        if not len(rows):
+            return 0
+        observations, slots = self.observe(rows)
+        phases = self.phase[rows]
+
+        # the games each strategy is to move in, in one call apiece
+        movers = seats[rows, self.to_move[rows]]
+        order = numpy.argsort(movers, kind='mergesort')
+        bounds = numpy.flatnonzero(numpy.diff(movers[order])) + 1
+        kinds = numpy.zeros(len(rows), dtype=numpy.int64)
+        hand_slots = numpy.zeros(len(rows), dtype=numpy.int64)
+        for group in numpy.split(order, bounds):
+            kinds[group], hand_slots[group] = strategies[movers[group[0]]](phases[group], observations[group])
+
+        starting = phases == START
+        self.start_turns(rows[starting], kinds[starting])
+        ending = ~starting
+        self.end_turns(rows[ending], kinds[ending], hand_slots[ending], slots[ending])
+        self.steps += 1
+        return int(self.active.sum())
+
+    # draw or pick up, in each of rows
+    def start_turns(self, rows, kinds):
+        if not numpy.all((kinds == DRAW) | (kinds == PICKUP)):
+            raise ValueError("not a move to start a turn with: " + str(kinds[(kinds != DRAW) & (kinds != PICKUP)][0]))
+
+        drawing = rows[kinds == DRAW]
+        self.height[drawing] -= 1
+        cards = self.deck[drawing, self.height[drawing]]
+        self.hands[drawing, self.to_move[drawing]] |= card_bits(cards)
+        self.table[drawing, 0] = self.height[drawing]
+
+        picking = rows[kinds == PICKUP]
+        assert numpy.all(self.pile_height[picking]), "tried to pickup on the first move (with 11 cards)"
+        heights = self.pile_height[picking]
+        seen = heights < TABLE_WIDTH
+        self.table[picking[seen], heights[seen]] = 0
+        self.pile_height[picking] -= 1
+        cards = self.pile[picking, self.pile_height[picking]]
+        self.hands[picking, self.to_move[picking]] |= card_bits(cards)
+
+        self.phase[rows] = END
+
+    # discard, knock or knock gin from each of rows, then rule on any knocks. slots is observe()'s running count of
+    # the cards in each mover's hand, to find the card in each hand slot.
+    def end_turns(self, rows, kinds, hand_slots, slots):
+        if numpy.any((hand_slots > 10) | (hand_slots < 0)):
+            raise Exception("no card in slot " + str(hand_slots[(hand_slots > 10) | (hand_slots < 0)][0]))
+        if not numpy.all((kinds == DISCARD) | (kinds == KNOCK) | (kinds == KNOCK_GIN)):
+            raise ValueError("not a move to end a turn with: " + str(kinds[(kinds < DISCARD) | (kinds > KNOCK_GIN)][0]))
+        seats = self.to_move[rows]
+
+        cards = numpy.argmax(slots > hand_slots[:, None], axis=1)
+        self.hands[rows, seats] &= ~card_bits(cards)
+        self.pile[rows, self.pile_height[rows]] = cards
+        self.pile_height[rows] += 1
+        heights = self.pile_height[rows]
+        seen = heights < TABLE_WIDTH
+        self.table[rows[seen], heights[seen]] = cards[seen] + 1
+
+        self.knocker[rows[kinds == KNOCK]] = seats[kinds == KNOCK]
+        self.gin_knocker[rows[kinds == KNOCK_GIN]] = seats[kinds == KNOCK_GIN]
+        self.turns_taken[rows] += 1
+
+        # GinMatch.process_knock() and process_knock_gin(), for whoever just played, where the hand might stand
+        knocked = (self.knocker[rows] != NOBODY) | (self.gin_knocker[rows] != NOBODY)
+        limits = numpy.where(self.knocker[rows] != NOBODY, self.knocking_point, 0)
+        knocked[knocked] &= deadwood_floor(self.hands[rows[knocked], seats[knocked]]) <= limits[knocked]
+        for row in rows[knocked]:
+            seat = self.to_move[row]
+            deadwood_count = ginbits.deadwood(int(self.hands[row, seat]))
+            if self.knocker[row] != NOBODY:
+                if deadwood_count == 0:
+                    self.knocker[row] = NOBODY
+                    self.gin_knocker[row] = seat
+                    self.score(row)
+                elif deadwood_count <= self.knocking_point:
+                    self.knocker[row] = seat
+                    self.score(row)
+            elif deadwood_count == 0:
+                self.gin_knocker[row] = seat
+                self.score(row)
+
+        playing = rows[self.active[rows]]
+        self.to_move[playing] = 1 - self.to_move[playing]
+        self.phase[playing] = START
+        self.check_draws(playing[self.to_move[playing] == 0])
+
+    # GinMatch.update_score() for a game that's just ended. a pending gin outranks a knock.
+    def score(self, row):
+        self.active[row] = False
+        knocker = self.knocker[row]
+        gin_knocker = self.gin_knocker[row]
+        first = 0 if 0 in (knocker, gin_knocker) else 1
+        defender_deadwood = ginbits.deadwood(int(self.hands[row, 1 - first]))
+        if gin_knocker != NOBODY:
+            self.winner[row], self.points[row] = first, defender_deadwood + 25
+            return
+        knocker_deadwood = ginbits.deadwood(int(self.hands[row, first]))
+        if defender_deadwood <= knocker_deadwood:
+            self.winner[row] = 1 - first
+            self.points[row] = knocker_deadwood - defender_deadwood + 25
+        else:
+            self.winner[row], self.points[row] = first, defender_deadwood - knocker_deadwood
+
+    # each game's GameResult, once every game is over
+    def results(self):
+        assert not self.active.any(), "games still in play"
+        return [GameResult(int(winner) if winner != NOBODY else None, int(points), int(turns))
+                for winner, points, turns in zip(self.winner, self.points, self.turns_taken)]
+
+
+# play every game to the end. orders, seats and strategies as for LockstepGames and step().
+def play_games(orders, seats, strategies, knocking_point=10, maximum_turns=60):
+    games = LockstepGames(orders, knocking_point, maximum_turns)
+    seats = numpy.asarray(seats, dtype=numpy.int64)
+    while games.step(strategies, seats):
+        pass
+    return games.results()
+
+
+# decks for count matches, shuffled as play_match() shuffles them: each match's deck, then one more shuffle for
+# clearing its game away. a round of lockstep games deals what the same round played match by match would.
+def shuffled_orders(count):
+    orders = []
+    for _ in range(count):
+        order = range(52)
+        random.shuffle(order)
+        orders.append(order)
+        random.shuffle(range(52))
+    return orders
+
+
+# NeuralGinStrategy for lockstep games: a compiled ranking network's outputs for every row at once, decoded as
+# decode_signal() decodes them
+class LockstepNeuralStrategy(object):
+    # backend is one of GinNeuralNet.backends; Population tunes it for the 'batch' call site
+    def __init__(self, compiled, backend='batched'):
+        self.kernel = compiled.kernel(backend)
+        keys = list(compiled.output_keys)
+        self.columns = [keys.index('action_start'), keys.index('action_end'), keys.index('index')]
+
+        # NeuralGinStrategy's actions, as move kinds
+        self.starts = numpy.array([MOVE_NAMES.index(action) for action in NeuralGinStrategy.start_actions])
+        self.ends = numpy.array([MOVE_NAMES.index(action) for action in NeuralGinStrategy.end_actions])
+
+    @staticmethod
+    def decode(signals, buckets):
+        return numpy.minimum((signals * buckets).astype(numpy.int64), buckets - 1)
+
+    def __call__(self, phases, observations):
+        outputs = numpy.asarray(self.kernel.forward_batch(observations))
+        start, end, index = [outputs[:, column] for column in self.columns]
+        kinds = numpy.where(phases == START, self.starts[self.decode(start, len(self.starts))],
+                            self.ends[self.decode(end, len(self.ends))])
+        return kinds, self.decode(index, HAND_WIDTH)
@@ -53,6 +53,12 @@ class GinMatch(Observable):
         self.p1_draws = 0
         self.p2_draws = 0
 
+        # the networks' inputs, laid out by whoever sets up the players' strategies. see InputBuffer
+        self.inputs = InputBuffer()
+
+        # told of each event of the match, if set. see attach_tracer()
+        self.tracer = None
+
         # seat players (not randomly)
         self.table = GinTable()
         self.p1 = player1
@@ -100,18 +106,32 @@ class GinMatch(Observable):
         #self.p1_score += 20 * self.p1_wins
         #self.p2_score += 20 * self.p2_wins
 
-        log_debug("\t--MATCH COMPLETE--")
-        log_debug("\tFinal scores: ")
-        log_debug("\tPlayer 1: {0}".format(self.p1_score))
-        log_debug("\tPlayer 2: {0}".format(self.p2_score))
-
-        # determine winner/loser
-        if self.p1_score == self.p2_score:
-            log_debug("We have a draw!")
-        elif self.p1_score > self.p2_score:
-            log_debug("Player 1 Wins!")
-        elif self.p2_score > self.p1_score:
-            log_debug("Player 2 Wins!")
+        if self.tracer is not None:
+            self.tracer.emit(('match-over', self.p1_score, self.p2_score))
+
+    # have tracer (see tracing.GameTracer) told of everything that happens in this match, or stop tracing with None.
+    # untraced matches skip building events altogether.
+    def attach_tracer(self, tracer):
+        self.tracer = tracer
+        self.p1.tracer = tracer
+        self.p2.tracer = tracer
+
+    # detach everything the match wired together (observers, strategies, input buffer, knock listeners) so it can
+    # be freed as soon as it's dropped. the score board, and the players' ids, stay readable.
+    def close(self):
+        for player in (self.p1, self.p2):
+            player.detach()
+            player.strategy = False
+            player.action = False
+            player.table = False
+            player._knock_listeners = []
+            player._knock_gin_listeners = []
+        self.table.detach()
+        self.table._card_listeners = []
+        self.table.player1 = self.table.player2 = False
+        self.detach()
+        self.inputs = None
+        self.attach_tracer(None)
 
     def notify_of_knock(self, knocker):
         self.player_who_knocked = knocker
@@ -121,14 +141,8 @@ class GinMatch(Observable):
 
     # play one game of gin
     def play_game(self):
-
-        log_debug("")
-        log_debug("========================================================================================")
-        log_debug("========================================================================================")
-        log_debug("========================================================================================")
-        log_debug("========================================================================================")
-        log_debug("========================================================================================")
-        log_info("\tbeginning new game between {0} and {1}".format(self.p1, self.p2))
+        if self.tracer is not None:
+            self.tracer.emit(('game', self.p1.id, self.p2.id))
 
         # clear game states
         self.gameover = False
@@ -149,23 +163,23 @@ class GinMatch(Observable):
         self.p1.empty_hand()
         self.p2.empty_hand()
 
-        log_debug("")
-        log_debug("\tGame over")
+        if self.tracer is not None:
+            self.tracer.emit(('game-over',))
 
     # deal out 11 cards to p1 and 10 cards to p2
     def deal_cards(self):
-        # deal 10 cards to each player
-        for i in range(10):
+        # nobody looks until the deal is done, so it reaches observers as one update per hand and one to the table
+        with self.p1.batch(), self.p2.batch(), self.table.batch():
+            # deal 10 cards to each player
+            for i in range(10):
+                self.p1.draw()
+                self.p2.draw()
+
+            # deal an 11th card to first player
             self.p1.draw()
-            self.p2.draw()
 
-        # deal an 11th card to first player
-        self.p1.draw()
-
-        log_debug("")
-        log_debug("\tplayer 1 is dealt: {0}".format(self.p1.hand))
-        log_debug("\tplayer 2 is dealt: {0}".format(self.p2.hand))
-        log_debug("")
+        if self.tracer is not None:
+            self.tracer.emit(('deal', self.p1.hand.mask(), self.p2.hand.mask()))
 
     # alternate play between each player
     def take_turns(self):
@@ -173,15 +187,15 @@ class GinMatch(Observable):
         #  OR we have taken too many turns
         while not self.gameover:
             # if we only have two cards remaining or have reached our turn limit, we draw the game
-            if not len(self.table.deck.cards) > 2 or not self.turns_taken < self.maximum_turns:
+            if not self.table.deck_height > 2 or not self.turns_taken < self.maximum_turns:
                 self.end_game_with_draw()
             else:
                 # both players get a chance to play, respecting knocks and end-of-game notifications
                 for p in (self.p1, self.p2):
                     # exit condition
                     if not self.gameover:
-                        log_debug(
-                            "\tTurn {0}. It is {1}'s turn:".format(self.turns_taken + 1, self.get_player_string(p)))
+                        if self.tracer is not None:
+                            self.tracer.emit(('turn', self.turns_taken + 1, self.get_seat(p)))
                         p.take_turn()
 
                         # validate the knock or reset the knock state and penalize the knocker
@@ -191,7 +205,8 @@ class GinMatch(Observable):
                         elif self.player_who_knocked_gin:
                             self.process_knock_gin(p)
 
-                        self.log_gamestate()
+                        if self.tracer is not None:
+                            self.trace_gamestate()
 
                         # count turns
                         self.turns_taken += 1
@@ -262,27 +277,26 @@ class GinMatch(Observable):
                         self.p2_wins += 1
                         self.p1_losses += 1
 
-        log_debug("\t\tEnd-of-game scores:")
-        log_debug("\t\t  player 1 score: {0}".format(self.p1_score))
-        log_debug("\t\t  player 1 matches: {0} (win), {1} (lose), {2} (draw)".format(self.p1_wins, self.p1_losses, self.p1_draws))
-        log_debug("\t\t  player 2 score: {0}".format(self.p2_score))
-        log_debug("\t\t  player 2 matches: {0} (win), {1} (lose), {2} (draw)".format(self.p2_wins, self.p2_losses, self.p2_draws))
+        if self.tracer is not None:
+            self.tracer.emit(('score', self.p1_score, self.p1_wins, self.p1_losses, self.p1_draws,
+                              self.p2_score, self.p2_wins, self.p2_losses, self.p2_draws))
 
     def process_knock(self, knocker):
         """@type knocker: GinPlayer"""
-        log_debug("\tValidating knock...".format(self.get_player_string(knocker)))
-
         # first, handle invalid knocks with a penalty of the hand now being played face-up
         if knocker.hand.deadwood_count() > self.knocking_point:
-            log_debug("\t\tthe knock was improper.")
+            if self.tracer is not None:
+                self.tracer.emit(('knock', self.get_seat(knocker), 'improper'))
             if knocker == self.p1:
                 self.p1_knocked_improperly = True
             elif knocker == self.p2:
                 self.p2_knocked_improperly = True
+            self.table.expose_hand(knocker)
         else:
             # next, handle a knock that is actually a gin (the AI will be dumb about this)
             if knocker.hand.deadwood_count() == 0:
-                log_debug("\t\tthe knock was actually a gin.")
+                if self.tracer is not None:
+                    self.tracer.emit(('knock', self.get_seat(knocker), 'gin'))
                 self.player_who_knocked = False
                 self.player_who_knocked_gin = True
                 self.process_knock_gin(knocker)
@@ -290,40 +304,42 @@ class GinMatch(Observable):
             else:
                 self.gameover = True
                 self.player_who_knocked = knocker
-                log_info("\t\tGame won by knock by {0}".format(self.get_player_string(knocker)))
+                if self.tracer is not None:
+                    self.tracer.emit(('knock', self.get_seat(knocker), 'valid'))
 
     def process_knock_gin(self, knocker):
         # first, handle invalid knocks with a penalty of the hand now being played face-up
         if knocker.hand.deadwood_count() != 0:
-            log_debug("\t\tthe knock_gin was rejected.")
+            if self.tracer is not None:
+                self.tracer.emit(('knock-gin', self.get_seat(knocker), 'rejected'))
             if knocker == self.p1:
                 self.p1_knocked_improperly = True
             elif knocker == self.p2:
                 self.p2_knocked_improperly = True
+            self.table.expose_hand(knocker)
         # handle valid knock_gins
         else:
             self.gameover = True
             self.player_who_knocked_gin = knocker
-            log_info("\t\tGame won by knock_gin by {0}".format(self.get_player_string(knocker)))
+            if self.tracer is not None:
+                self.tracer.emit(('knock-gin', self.get_seat(knocker), 'valid'))
 
     # return a string representation for a given player
     def get_player_string(self, player):
+        return "player " + str(self.get_seat(player))
+
+    # 1 for p1, 2 for p2
+    def get_seat(self, player):
         if player == self.p1:
-            return "player 1"
+            return 1
         elif player == self.p2:
-            return "player 2"
+            return 2
         else:
-            raise Exception("player string requested for a player not in this match")
-
-    def log_gamestate(self):
-        if enable_logging_debug is False:
-            log_debug("")
-            log_debug("\t+---next turn---------------------------------------------")
-            log_debug("\t| player 1 holds: {0} \tdeadwood: {1}".format(self.p1.hand, self.p1.hand.deadwood_count()))
-            log_debug("\t| player 2 holds: {0} \tdeadwood: {1}".format(self.p2.hand, self.p2.hand.deadwood_count()))
-            log_debug("\t| deck height: {0}  next_card: {1}  discard pile: {2}".format(len(self.table.deck.cards),
-                                                                                       self.table.deck.cards[-1],
-                                                                           self.table.discard_pile))
-            log_debug("\t|")
-            log_debug("\t+----------------------------------------------------------")
-            log_debug("")
\ No newline at end of file
+            raise Exception("seat requested for a player not in this match")
+
+    # the table and both hands, as one event. the tracer works out deadwood if it wants it.
+    def trace_gamestate(self):
+        table = self.table
+        next_card = table.deck_cards[table.deck_height - 1] if table.deck_height else None
+        self.tracer.emit(('state', self.p1.hand.mask(), self.p2.hand.mask(), table.deck_height, next_card,
+                          tuple(table.discards[:table.discard_height])))
\ No newline at end of file
@@ -42,9 +42,18 @@ class GinPlayer(Observable):
         self._knock_listeners = []
         self._knock_gin_listeners = []
 
+        # cards we picked up from the discard pile and still hold. our opponent saw us take them.
+        self.known_cards = []
+
         # at most, we have 11 interesting things to offer our observer
         self.observable_width = 11
 
+        # one-hot views of our hand and of the cards our opponent knows we hold
+        self.onehot_planes = {'hand': 52, 'known': 52}
+
+        # our match's tracer, if it has one. see GinMatch.attach_tracer()
+        self.tracer = None
+
     # listen for knocks
     def register_knock_listener(self, listener):
         if not listener in self._knock_listeners:
@@ -82,6 +91,7 @@ class GinPlayer(Observable):
     @notify_observers_after  # here mostly to satisfy unit tests
     def _add_card(self, card):
         self.hand.add_card(card)
+        self.write_inputs()
 
     # implement the Observable criteria. return a dict of ints representing our hand. key corresponds to hand.cards idx
     # note that we have 11 "slots". One may be empty at times. We use 0 as the empty encoding.
@@ -96,11 +106,23 @@ class GinPlayer(Observable):
 
         return dict(zip(indexes, rankings))
 
+    # our hand's rankings in hand order, padded with 0s to 11 slots. see Observable.write_inputs()
+    def encode_inputs(self):
+        rankings = [c.ranking() for c in self.hand.cards]
+        return rankings + [0] * (self.observable_width - len(rankings))
+
+    # the active card positions of one of our one-hot planes
+    def organize_active(self, plane):
+        if plane == 'hand':
+            return [c.index() for c in self.hand.cards]
+        elif plane == 'known':
+            return [c.index() for c in self.known_cards]
+
     def draw(self):
         if self.hand.size() == 11:
             raise DrawException(self)
         else:
-            card = self.table.deal_a_card()
+            card = self.table.deal_a_card(self)
             self._add_card(card)
             return card
 
@@ -131,23 +153,27 @@ class GinPlayer(Observable):
                 card = self.hand.get_card_at_index(index)
                 self.knock_gin(card)
 
-        log_debug("\t\tAction taken: {0}  \t{1}".format(self.action[0], card))
+        if self.tracer is not None:
+            self.tracer.emit(('action', self.action[0], card.index() if card is not None else None))
 
     # consult the strategy and perform the action suggested
     def take_turn(self):
         # ensure we have enough cards to take a turn
         assert self.hand.size() >= 10, "Not enough cards in hand"
 
-        # if we have 10 cards, we do this twice. otherwise (we have 11 cards), we do it once.
-        if self.hand.size() == 10:
-            self.consult_strategy(phase='start')
-            self.execute_strategy()
+        # coalesce the turn's changes to us and the table. our strategy's reads bring observers up to date as needed.
+        with self.batch(), self.table.batch():
+            # if we have 10 cards, we do this twice. otherwise (we have 11 cards), we do it once.
+            if self.hand.size() == 10:
+                self.consult_strategy(phase='start')
+                self.execute_strategy()
 
-        self.consult_strategy(phase='end')
-        self.execute_strategy()
+            self.consult_strategy(phase='end')
+            self.execute_strategy()
 
     def pickup_discard(self):
-        card = self.table.pickup_from_discard_pile()
+        card = self.table.pickup_from_discard_pile(self)
+        self.known_cards.append(card)
         self._add_card(card)
         return card
 
@@ -155,7 +181,9 @@ class GinPlayer(Observable):
     def discard_card(self, card):
         try:
             self.hand.discard(card)
-            self.table.add_card_to_discard_pile(card)
+            self.write_inputs()
+            self.known_cards = [c for c in self.known_cards if c.index() != card.index()]
+            self.table.add_card_to_discard_pile(card, self)
         except ValueError:
             raise Exception("card not in our hand")
         except AttributeError:
@@ -164,4 +192,6 @@ class GinPlayer(Observable):
 
     # empty the player's hand
     def empty_hand(self):
-        self.hand = GinHand()
\ No newline at end of file
+        self.hand = GinHand()
+        self.known_cards = []
+        self.write_inputs()
\ No newline at end of file
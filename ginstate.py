@@ -0,0 +1,272 @@
+#!/usr/bin/python
+#
+# ginstate.py
+#
+# 2026/10/19
+# rg
+#
+# one game of gin as a handful of ints and two fixed arrays, for searches that play moves forward and take them back
+# thousands of times a decision. apply() plays a move and undo() restores the state exactly as it was; neither copies
+# anything, and the history they share is allocated once, up front.
+#
+# the rules are GinMatch's, quirks included: a knock or gin that doesn't stand exposes the knocker's hand and leaves
+# the knock pending, so the next player to finish a turn is checked against it in turn (see GinMatch.take_turns()),
+# and the game is drawn when a round starts with two cards or fewer in the deck, or the turn limit reached.
+#
+# seat 0 is GinMatch's p1, who plays first. cards are Card.index() values, and hands are ginbits card masks. a move
+# is one int: its kind in the high bits and its card (for the end of a turn) in the low six.
+
+from ginbits import *
+from array import array
+
+# move kinds
+DRAW = 0
+PICKUP = 1
+DISCARD = 2
+KNOCK = 3
+KNOCK_GIN = 4
+
+MOVE_NAMES = ['DRAW', 'PICKUP-FROM-DISCARD', 'DISCARD', 'KNOCK', 'KNOCK-GIN']
+
+# phases of a turn
+START = 0    # 10 cards: draw or pick up
+END = 1      # 11 cards: discard, knock or knock gin
+
+NOBODY = -1
+
+
+def make_move(kind, card=0):
+    return kind << 6 | card
+
+
+def move_kind(move):
+    return move >> 6
+
+
+def move_card(move):
+    return move & 63
+
+
+class GinState(object):
+    __slots__ = ('hands', 'deck', 'deck_height', 'pile', 'pile_height', 'to_move', 'phase', 'turns_taken',
+                 'knocker', 'gin_knocker', 'exposed', 'gameover', 'draw', 'knocking_point', 'maximum_turns',
+                 'moves', 'saved', 'depth')
+
+    # deck is the undealt cards, the next to be dealt last, and pile the discard pile, bottom first (as GinTable
+    # keeps them). history is how many moves we can apply before undoing any.
+    def __init__(self, hands, deck, pile, to_move=0, phase=END, turns_taken=0, knocking_point=10, maximum_turns=60,
+                 history=None):
+        self.hands = [hands[0], hands[1]]
+        self.deck = array('b', deck)
+        self.deck_height = len(deck)
+        self.pile = array('b', list(pile) + [0] * (52 - len(pile)))
+        self.pile_height = len(pile)
+        self.to_move = to_move
+        self.phase = phase
+        self.turns_taken = turns_taken
+
+        # GinMatch's player_who_knocked and player_who_knocked_gin, as seats
+        self.knocker = NOBODY
+        self.gin_knocker = NOBODY
+
+        # bit per seat, set when that seat's hand is face up after an improper knock
+        self.exposed = 0
+        self.gameover = False
+        self.draw = False
+
+        self.knocking_point = knocking_point
+        self.maximum_turns = maximum_turns
+
+        # the undo stack: each move applied, and the packed state from before it (see pack())
+        if history is None:
+            history = 2 * (maximum_turns - turns_taken) + 8
+        self.moves = array('i', [0] * history)
+        self.saved = array('i', [0] * history)
+        self.depth = 0
+
+    def __repr__(self):
+        return ("<ginstate.GinState hands:" + str([mask_indexes(hand) for hand in self.hands]) +
+                " deck_height:" + str(self.deck_height) + " pile:" + str(self.pile[:self.pile_height].tolist()) +
+                " to_move:" + str(self.to_move) + " phase:" + str(self.phase) +
+                " turns_taken:" + str(self.turns_taken) + ">")
+
+    # the state of a live match, between turns or in the middle of one (as a strategy sees it). the deck is the
+    # table's real deck, so a search that mustn't peek should deal its own (see determinize()).
+    @staticmethod
+    def from_match(ginmatch, history=None):
+        table = ginmatch.table
+        players = (ginmatch.p1, ginmatch.p2)
+
+        # p1 starts and every turn counts, so the turn count says whose turn it is. a player with 11 cards has drawn.
+        to_move = ginmatch.turns_taken % 2
+        phase = END if players[to_move].hand.size() == 11 else START
+
+        state = GinState([players[0].hand.mask(), players[1].hand.mask()],
+                         table.deck_cards[:table.deck_height], table.discards[:table.discard_height], to_move, phase,
+                         ginmatch.turns_taken, ginmatch.knocking_point, ginmatch.maximum_turns, history)
+        for seat, player in enumerate(players):
+            if ginmatch.player_who_knocked is player:
+                state.knocker = seat
+            if ginmatch.player_who_knocked_gin is player:
+                state.gin_knocker = seat
+            if table.exposed[seat]:
+                state.exposed |= 1 << seat
+        state.gameover = bool(ginmatch.gameover)
+        state.draw = bool(ginmatch.draw)
+        return state
+
+    # the same position with the unseen cards dealt as given: the deck becomes deck, and the seat's opponent holds
+    # opponent_hand in place of their real cards
+    def determinize(self, seat, opponent_hand, deck):
+        state = GinState(self.hands, deck, self.pile[:self.pile_height], self.to_move, self.phase, self.turns_taken,
+                         self.knocking_point, self.maximum_turns, len(self.moves))
+        state.hands[1 - seat] = opponent_hand
+        state.knocker = self.knocker
+        state.gin_knocker = self.gin_knocker
+        state.exposed = self.exposed
+        state.gameover = self.gameover
+        state.draw = self.draw
+        return state
+
+    def pack(self):
+        return (self.turns_taken | self.to_move << 8 | self.phase << 9 | (self.knocker + 1) << 10 |
+                (self.gin_knocker + 1) << 12 | self.exposed << 14 | self.gameover << 16 | self.draw << 17)
+
+    def unpack(self, packed):
+        self.turns_taken = packed & 255
+        self.to_move = packed >> 8 & 1
+        self.phase = packed >> 9 & 1
+        self.knocker = (packed >> 10 & 3) - 1
+        self.gin_knocker = (packed >> 12 & 3) - 1
+        self.exposed = packed >> 14 & 3
+        self.gameover = bool(packed >> 16 & 1)
+        self.draw = bool(packed >> 17 & 1)
+
+    # every move GinMatch would accept here. knocks are only offered where they'd stand: apply() will take an
+    # improper one, but nothing gains by playing it.
+    def legal_moves(self):
+        if self.gameover:
+            return []
+        if self.phase == START:
+            if self.pile_height:
+                return [DRAW << 6, PICKUP << 6]
+            return [DRAW << 6]
+
+        hand = self.hands[self.to_move]
+        moves = []
+        for card, deadwood in zip(mask_indexes(hand), discard_deadwoods(hand)[1]):
+            moves.append(DISCARD << 6 | card)
+            if deadwood == 0:
+                moves.append(KNOCK_GIN << 6 | card)
+            elif deadwood <= self.knocking_point:
+                moves.append(KNOCK << 6 | card)
+        return moves
+
+    def apply(self, move):
+        self.moves[self.depth] = move
+        self.saved[self.depth] = self.pack()
+        self.depth += 1
+
+        kind = move >> 6
+        seat = self.to_move
+        if kind == DRAW:
+            self.deck_height -= 1
+            self.hands[seat] |= 1 << self.deck[self.deck_height]
+            self.phase = END
+            return
+        elif kind == PICKUP:
+            # a discard will write over the slot, so the history keeps the card for undo()
+            self.pile_height -= 1
+            card = self.pile[self.pile_height]
+            self.moves[self.depth - 1] = PICKUP << 6 | card
+            self.hands[seat] |= 1 << card
+            self.phase = END
+            return
+
+        card = move & 63
+        self.hands[seat] &= ~(1 << card)
+        self.pile[self.pile_height] = card
+        self.pile_height += 1
+        if kind == KNOCK:
+            self.knocker = seat
+        elif kind == KNOCK_GIN:
+            self.gin_knocker = seat
+
+        # GinMatch.take_turns(): whoever just played answers for any knock still pending
+        if self.knocker != NOBODY:
+            self.process_knock(seat)
+        elif self.gin_knocker != NOBODY:
+            self.process_knock_gin(seat)
+
+        self.turns_taken += 1
+        self.to_move = 1 - seat
+        self.phase = START
+        if not self.gameover:
+            if self.to_move == 0 and (self.deck_height <= 2 or self.turns_taken >= self.maximum_turns):
+                self.gameover = True
+                self.draw = True
+
+    def undo(self):
+        self.depth -= 1
+        move = self.moves[self.depth]
+        self.unpack(self.saved[self.depth])
+
+        kind = move >> 6
+        seat = self.to_move
+        if kind == DRAW:
+            self.hands[seat] &= ~(1 << self.deck[self.deck_height])
+            self.deck_height += 1
+        elif kind == PICKUP:
+            card = move & 63
+            self.hands[seat] &= ~(1 << card)
+            self.pile[self.pile_height] = card
+            self.pile_height += 1
+        else:
+            self.pile_height -= 1
+            self.hands[seat] |= 1 << (move & 63)
+
+    # GinMatch.process_knock()
+    def process_knock(self, seat):
+        deadwood_count = deadwood(self.hands[seat])
+        if deadwood_count > self.knocking_point:
+            self.exposed |= 1 << seat
+        elif deadwood_count == 0:
+            self.knocker = NOBODY
+            self.gin_knocker = seat
+            self.gameover = True
+        else:
+            self.knocker = seat
+            self.gameover = True
+
+    # GinMatch.process_knock_gin()
+    def process_knock_gin(self, seat):
+        if deadwood(self.hands[seat]) != 0:
+            self.exposed |= 1 << seat
+        else:
+            self.gin_knocker = seat
+            self.gameover = True
+
+    # (winning seat, points) once the game is over, as GinMatch.update_score() scores it: (NOBODY, 0) for a drawn
+    # game. a pending gin outranks a knock when scoring, as it does there.
+    def result(self):
+        assert self.gameover, "the game isn't over"
+        if self.draw:
+            return NOBODY, 0
+
+        knocker = 0 if 0 in (self.knocker, self.gin_knocker) else 1
+        defender_deadwood = deadwood(self.hands[1 - knocker])
+        if self.gin_knocker != NOBODY:
+            return knocker, defender_deadwood + 25
+
+        knocker_deadwood = deadwood(self.hands[knocker])
+        points = abs(knocker_deadwood - defender_deadwood)
+        if defender_deadwood <= knocker_deadwood:
+            return 1 - knocker, points + 25
+        return knocker, points
+
+    # the GinPlayer action for move, for the seat to move: [name, slot in their hand]
+    def action(self, move):
+        kind = move >> 6
+        if kind in (DRAW, PICKUP):
+            return [MOVE_NAMES[kind], 0]
+        return [MOVE_NAMES[kind], popcount(self.hands[self.to_move] & ((1 << (move & 63)) - 1))]
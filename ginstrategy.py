@@ -13,6 +13,7 @@
 # - list of actions taken thus far in the current game
 
 import math
+import ginbits
 
 
 class GinStrategy(object):
@@ -27,6 +28,9 @@ class GinStrategy(object):
 
 
 class NeuralGinStrategy(GinStrategy):
+    start_actions = ['PICKUP-FROM-DISCARD', 'DRAW']
+    end_actions = ['KNOCK', 'DISCARD', 'KNOCK-GIN']
+
     def __init__(self, us, opponent, ginmatch, neural_net):
         super(NeuralGinStrategy, self).__init__(us, opponent, ginmatch)
 
@@ -48,10 +52,10 @@ class NeuralGinStrategy(GinStrategy):
     def decode_action(self, phase=None):
         assert phase is not None, "a phase of 'start' or 'end' is required"
         if phase == 'start':
-            actions = ['PICKUP-FROM-DISCARD', 'DRAW']
+            actions = NeuralGinStrategy.start_actions
             idx = NeuralGinStrategy.decode_signal(self.nn.outputs['action_start'], len(actions))
         else:
-            actions = ['KNOCK', 'DISCARD', 'KNOCK-GIN']
+            actions = NeuralGinStrategy.end_actions
             idx = NeuralGinStrategy.decode_signal(self.nn.outputs['action_end'], len(actions))
 
         return actions[idx]
@@ -60,10 +64,160 @@ class NeuralGinStrategy(GinStrategy):
     def decode_index(self):
         return NeuralGinStrategy.decode_signal(self.nn.outputs['index'], 11)
 
-    # return our best action to an external caller
+    # every decision a set of outputs encodes, whichever the phase: (start action, end action, card index)
+    @staticmethod
+    def decode_outputs(outputs):
+        return (NeuralGinStrategy.start_actions[NeuralGinStrategy.decode_signal(outputs['action_start'], 2)],
+                NeuralGinStrategy.end_actions[NeuralGinStrategy.decode_signal(outputs['action_end'], 3)],
+                NeuralGinStrategy.decode_signal(outputs['index'], 11))
+
+    # return our best action to an external caller. networks with a decision cache skip the pulse for any
+    # (phase, state) they have decided before.
     def determine_best_action(self, phase=None):
         assert phase is not None, "a phase of 'start' or 'end' is required"
-        self.nn.pulse()
+        cache = getattr(self.nn, 'decision_cache', None)
+        if cache is None:
+            return self.decide(phase, None)
+
+        state = self.nn.observe_state()
+        key = (phase, state)
+        decision = cache.get(key)
+        if decision is None:
+            decision = self.decide(phase, state)
+            cache.put(key, decision)
+        return list(decision)
+
+    # pulse the network on state (sensing afresh if None) and decode its outputs
+    def decide(self, phase, state):
+        if state is None:
+            self.nn.pulse()
+        else:
+            self.nn.pulse(state)
         action = self.decode_action(phase)
         index  = self.decode_index()
-        return [action, index]
\ No newline at end of file
+        return [action, index]
+
+
+# Rather than reading a card slot off the 'index' output, score every alternative and take the best. For each
+# decision we derive the observation vector each choice would leave us in (an afterstate) straight from the
+# network's current inputs, run them all in one batched pass and pick the one whose value_key output is highest:
+# - start: picking up the top discard vs drawing (2 vectors)
+# - end:   discarding each of our 11 cards (11 vectors), plus our current state, from which we still decode
+#          whether to knock
+# Works on the dense 'ranking' inputs of GinNeuralNet: our hand as 11 rankings, then the table as the deck height
+# followed by 32 discard pile rankings.
+class ActionValueGinStrategy(NeuralGinStrategy):
+    value_key = 'index'
+
+    def __init__(self, us, opponent, ginmatch, neural_net):
+        super(ActionValueGinStrategy, self).__init__(us, opponent, ginmatch, neural_net)
+        assert not getattr(self.nn, 'sparse', False), "action-value scoring needs dense (ranking) inputs"
+        self.hand_offset = None
+        self.table_offset = None
+
+    # where our hand's and the table's slots sit in the input vector
+    def locate_inputs(self):
+        offset = 0
+        for observer in self.nn.observers:
+            if observer._observed is self.us:
+                self.hand_offset = offset
+            elif observer._observed is self.us.table:
+                self.table_offset = offset
+            offset += observer.width
+        assert self.hand_offset is not None and self.table_offset is not None, \
+            "the network must observe both our hand and the table"
+
+    # the inputs after we pick up the top of the discard pile, and after we draw an (unseen) card
+    def start_afterstates(self, inputs):
+        h, t = self.hand_offset, self.table_offset
+        discards = [value for value in inputs[t + 1:t + 33] if value]
+
+        pickup = list(inputs)
+        pickup[h:h + 11] = (sorted([value for value in inputs[h:h + 11] if value] + discards[-1:]) + [0] * 11)[:11]
+        pickup[t + len(discards)] = 0
+
+        draw = list(inputs)
+        draw[t] = max(0, inputs[t] - 1)
+        return [pickup, draw]
+
+    # the inputs after discarding each card in our hand, in hand order
+    def end_afterstates(self, inputs):
+        h, t = self.hand_offset, self.table_offset
+        hand = inputs[h:h + 11]
+        pile_height = len([value for value in inputs[t + 1:t + 33] if value])
+
+        afterstates = []
+        for i in range(len(self.us.hand.cards)):
+            after = list(inputs)
+            after[h:h + 11] = hand[:i] + hand[i + 1:] + [0]
+            if pile_height < 32:
+                after[t + 1 + pile_height] = hand[i]
+            afterstates.append(after)
+        return afterstates
+
+    def best_of(self, scored):
+        values = [outputs[self.value_key] for outputs in scored]
+        return values.index(max(values))
+
+    def decide(self, phase, state):
+        if self.hand_offset is None:
+            self.locate_inputs()
+        if state is None:
+            inputs = self.nn.sense()
+        else:
+            inputs = list(state)
+
+        if phase == 'start':
+            if not self.us.table.discard_height:
+                return ['DRAW', 0]
+            scored = self.nn.pulse_batch(self.start_afterstates(inputs))
+            return [NeuralGinStrategy.start_actions[self.best_of(scored)], 0]
+        else:
+            scored = self.nn.pulse_batch([inputs] + self.end_afterstates(inputs))
+            self.nn.outputs.update(scored[0])
+            return [self.decode_action('end'), self.best_of(scored[1:])]
+
+
+# Plays a DistilledPolicy (see distill.py): a few table lookups over hand features, with no network to pulse.
+class DistilledGinStrategy(GinStrategy):
+    def __init__(self, us, opponent, ginmatch, policy):
+        super(DistilledGinStrategy, self).__init__(us, opponent, ginmatch)
+        self.policy = policy
+
+    def determine_best_action(self, phase=None):
+        assert phase is not None, "a phase of 'start' or 'end' is required"
+        table = self.us.table
+        top = table.discards[table.discard_height - 1] if table.discard_height else None
+        return self.policy.decide(phase, [card.index() for card in self.us.hand.cards], top, table.deck_height)
+
+
+# A fixed, greedy player, for a cheap opponent and a yardstick that doesn't evolve. Works off GinHand's what-if API:
+# - start: pick up the top discard if that lowers our deadwood, otherwise draw
+# - end:   discard whichever card leaves the least deadwood, breaking ties by the outs left among unseen cards, and
+#          knock (or go gin) as soon as that deadwood allows
+class HeuristicGinStrategy(GinStrategy):
+    def determine_best_action(self, phase=None):
+        assert phase is not None, "a phase of 'start' or 'end' is required"
+        hand = self.us.hand
+        if phase == 'start':
+            top = self.us.table.top_discard()
+            if top is not None and hand.deadwood_after_pickup(top) < hand.quick_deadwood():
+                return ['PICKUP-FROM-DISCARD', 0]
+            return ['DRAW', 0]
+
+        after = hand.deadwood_after_discards()
+        best = min(after)
+        candidates = [index for index, deadwood in enumerate(after) if deadwood == best]
+        index = candidates[0]
+        if len(candidates) > 1:
+            unseen = ginbits.FULL_MASK & ~self.us.table.known_masks(self.us)['unavailable']
+            index = max(candidates, key=lambda candidate: hand.outs_after_discard(candidate, unseen))
+
+        if best == 0:
+            action = 'KNOCK-GIN'
+        elif best <= self.ginmatch.knocking_point:
+            action = 'KNOCK'
+        else:
+            action = 'DISCARD'
+        return [action, index]
+
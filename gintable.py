@@ -12,29 +12,81 @@ from gindeck import *
 from observer import *
 from utility import *
 from pylru import lrudecorator
+from array import array
+from random import shuffle
+import ginbits
 
 
+# the deck and the discard pile are fixed-capacity arrays of card indexes (see Card.index()), each with a cursor:
+# deck_height cards are left to deal from the top of deck_cards, and discard_height cards are in discard_pile. our
+# encoding lives in another array and is kept up to date as cards move, so every change writes a single slot.
+#
+# we also keep the game's public information as 52 bit card masks (see ginbits): the cards that have been through the
+# discard pile, and the cards each seat is known to hold -- picked up from the discard pile, or everything in a hand
+# exposed by an improper knock. see known_masks().
 class GinTable(Observable):
+    # the planes of known_vector()
+    known_planes = ('seen', 'opponent', 'unavailable')
+
     def __init__(self):
         super(GinTable, self).__init__()
         self.player1 = False
         self.player2 = False
 
-        # on instantiation, create a new, shuffled deck
-        self.deck = GinDeck()
-
-        # also create a discard pile
-        self.discard_pile = []
-
         # we have 33 interesting points to export: 32 discards + size of deck
         self.observable_width = 33
 
+        # one-hot views: which cards are in the discard pile, and the deck height (31 or more share the top slot)
+        self.onehot_planes = {'discard': 52, 'height': 32}
+
+        self.deck_cards = array('b', range(52))
+        self.deck_height = 0
+        self.discards = array('b', [0] * 52)
+        self.discard_height = 0
+
+        # public information, reset every deal: cards ever discarded this game, cards in the discard pile now, and
+        # per seat, the cards that player is known to hold and whether their hand is face up
+        self.seen_mask = 0
+        self.discard_mask = 0
+        self.held_masks = [0, 0]
+        self.exposed = [False, False]
+
+        # told of every card that moves: see register_card_listener()
+        self._card_listeners = []
+
+        # our organize_data(), as a row: deck height, then the ranking of each discard (0 where there's none)
+        self.encoding = array('i', [0] * self.observable_width)
+
+        # on instantiation, create a new, shuffled deck
+        self.shuffle_deck()
+
     def __repr__(self):
         its_repr = "<gintable.GinTable object at " + hex(id(self)) + ">"
-        its_repr += " height:" + str(len(self.deck.cards))
+        its_repr += " height:" + str(self.deck_height)
         its_repr += " discard_pile:" + str(self.discard_pile)
         return its_repr
 
+    # the discard pile as GinCards, bottom first. built on demand, for logging and inspection.
+    @property
+    def discard_pile(self):
+        return [GIN_CARDS[index] for index in self.discards[:self.discard_height]]
+
+    # the cards left in the deck as GinCards, the next card to be dealt last
+    def remaining_cards(self):
+        return [GIN_CARDS[index] for index in self.deck_cards[:self.deck_height]]
+
+    # the next card to be dealt, or None
+    def next_card(self):
+        if self.deck_height:
+            return GIN_CARDS[self.deck_cards[self.deck_height - 1]]
+        return None
+
+    # the top card of the discard pile, or None
+    def top_discard(self):
+        if self.discard_height:
+            return GIN_CARDS[self.discards[self.discard_height - 1]]
+        return None
+
     # seat a player at the table. take special care to not let the same player sit at the table twice.
     def seat_player(self, player):
         # if player is already sitting at this table, throw an error
@@ -54,45 +106,156 @@ class GinTable(Observable):
         else:
             raise TableSeatingError("gintable is full")
 
-    @memoized(1)
+    # listeners hear notify_of_card(event, player, index) as cards move, where event is one of
+    # - 'shuffle':  a fresh deck (player and index are None)
+    # - 'draw':     player drew an unseen card from the deck (index is None)
+    # - 'decline':  player drew from the deck rather than take the top discard, whose index is given
+    # - 'pickup':   player took the top discard
+    # - 'discard':  player discarded a card
+    # player is None when a card moves with nobody named as taking or giving it.
+    def register_card_listener(self, listener):
+        if listener not in self._card_listeners:
+            self._card_listeners.append(listener)
+
+    def unregister_card_listener(self, listener):
+        if listener in self._card_listeners:
+            self._card_listeners.remove(listener)
+
+    def notify_card_listeners(self, event, player, index):
+        for listener in self._card_listeners:
+            listener.notify_of_card(event, player, index)
+
+    # 0 for player1's seat, 1 for player2's, None for anyone else
+    def seat_of(self, player):
+        if player is None:
+            return None
+        elif player is self.player1:
+            return 0
+        elif player is self.player2:
+            return 1
+        return None
+
+    # show a player's hand to the table for the rest of the game, as after an improper knock
+    def expose_hand(self, player):
+        seat = self.seat_of(player)
+        if seat is not None:
+            self.exposed[seat] = True
+            self.held_masks[seat] |= ginbits.card_mask(player.hand.cards)
+
+    # what player knows, as card masks: 'seen' (every card discarded this game), 'opponent' (cards the opponent is
+    # known to hold) and 'unavailable' (cards player can never draw: their own hand, the discard pile and the
+    # opponent's known cards)
+    def known_masks(self, player):
+        seat = self.seat_of(player)
+        opponent = self.held_masks[1 - seat] if seat is not None else 0
+        return {'seen': self.seen_mask,
+                'opponent': opponent,
+                'unavailable': ginbits.card_mask(player.hand.cards) | self.discard_mask | opponent}
+
+    # known_masks() as a dense 0/1 vector of 3 x 52 inputs, in the order of known_planes
+    def known_vector(self, player):
+        masks = self.known_masks(player)
+        vector = []
+        for plane in GinTable.known_planes:
+            mask = masks[plane]
+            vector.extend((mask >> index) & 1 for index in range(52))
+        return vector
+
+    # the deck height, then the discard pile, then 0's up to 32 possible discards -- 32 = 52 - 10(cards per hand) X
+    # 2(hands)
     def organize_data(self):
-        # we start with the current height of the drawing deck
-        data = {0: len(self.deck.cards)}
+        return dict(enumerate(self.encoding))
+
+    def encode_inputs(self):
+        return self.encoding.tolist()
 
-        # we now add on the discard pile
-        for i in range(len(self.discard_pile)):
-            data[i+1] = self.discard_pile[i].ranking()
+    # the active positions of one of our one-hot planes
+    def organize_active(self, plane):
+        if plane == 'discard':
+            return self.discards[:self.discard_height].tolist()
+        elif plane == 'height':
+            return [min(self.deck_height, self.onehot_planes['height'] - 1)]
 
-        # we then add 0's up to 32 possible discards -- 32 = 52 - 10(cards per hand) X 2(hands)
-        for i in range(1+len(self.discard_pile), 1+32):
-            data[i] = 0
+    # write one slot of our encoding, and of every input buffer slice we fill
+    def encode(self, index, value):
+        if index < self.observable_width:
+            self.encoding[index] = value
+            self.write_input(index, value)
 
-        return data
+    # a full, freshly shuffled deck and an empty discard pile. shuffling the indexes 0-51 consumes the same random
+    # numbers, and gives the same order, as shuffling a new Deck.
+    def shuffle_deck(self):
+        order = range(52)
+        shuffle(order)
+        self.deck_cards = array('b', order)
+        self.deck_height = 52
+        self.discard_height = 0
+        self.seen_mask = self.discard_mask = 0
+        self.held_masks = [0, 0]
+        self.exposed = [False, False]
+        self.encoding = array('i', [0] * self.observable_width)
+        self.encoding[0] = self.deck_height
+        self.write_inputs()
+        if self._card_listeners:
+            self.notify_card_listeners('shuffle', None, None)
 
     @notify_observers_after
     def refresh_deck(self):
-        self.deck = GinDeck()
-        self.discard_pile = []
+        self.shuffle_deck()
 
-    # pop a card from the deck and return it
+    # pop a card from the deck and return it. player, if given, is who takes it.
     @notify_observers_after
-    def deal_a_card(self):
-        card = self.deck.deal_a_card()
-        return card
+    def deal_a_card(self, player=None):
+        if not self.deck_height:
+            raise IndexError("deal from an empty deck")
+        self.deck_height -= 1
+        self.encode(0, self.deck_height)
+        index = self.deck_cards[self.deck_height]
 
+        seat = self.seat_of(player)
+        if seat is not None and self.exposed[seat]:
+            self.held_masks[seat] |= 1 << index
+        if self._card_listeners:
+            if self.discard_height:
+                self.notify_card_listeners('decline', player, self.discards[self.discard_height - 1])
+            self.notify_card_listeners('draw', player, None)
+        return GIN_CARDS[index]
+
+    # player, if given, is who discarded the card
     @notify_observers_after
-    def add_card_to_discard_pile(self, card):
+    def add_card_to_discard_pile(self, card, player=None):
         """ @type card: Card """
-        self.discard_pile.append(card)
+        index = card.index()
+        self.discards[self.discard_height] = index
+        self.discard_height += 1
+        self.encode(self.discard_height, card.ranking())
+
+        bit = 1 << index
+        self.seen_mask |= bit
+        self.discard_mask |= bit
+        seat = self.seat_of(player)
+        if seat is not None:
+            self.held_masks[seat] &= ~bit
+        if self._card_listeners:
+            self.notify_card_listeners('discard', player, index)
 
-    # pop a card from the discard pile and return it
+    # pop a card from the discard pile and return it. player, if given, is who takes it.
     @notify_observers_after
-    def pickup_from_discard_pile(self):
-        try:
-            card = self.discard_pile.pop()
-        except IndexError:
+    def pickup_from_discard_pile(self, player=None):
+        if not self.discard_height:
             raise InvalidPlayError("tried to pickup on the first move (with 11 cards)")
-        return card
+        self.encode(self.discard_height, 0)
+        self.discard_height -= 1
+        index = self.discards[self.discard_height]
+
+        bit = 1 << index
+        self.discard_mask &= ~bit
+        seat = self.seat_of(player)
+        if seat is not None:
+            self.held_masks[seat] |= bit
+        if self._card_listeners:
+            self.notify_card_listeners('pickup', player, index)
+        return GIN_CARDS[index]
 
 
 class TableSeatingError(Exception):
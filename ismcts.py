@@ -0,0 +1,325 @@
+#!/usr/bin/python
+#
+# ismcts.py
+#
+# 2026/10/19
+# rg
+#
+# information set Monte Carlo tree search (single observer ISMCTS, after Cowling, Powley & Whitehouse).
+#
+# we can't see the opponent's hand or the deck, so every iteration deals them out afresh (a determinization)
+# consistent with what we do know: our hand, the discard pile, and the cards the table knows the opponent holds (see
+# GinTable.known_masks()). the iteration then walks one shared tree of actions, picking among the actions legal in
+# that deal by UCB1, adds a node, and plays on with a fast greedy policy. a playout runs to the end of the game, or
+# for horizon turns, after which the difference in deadwood stands in for the result: greedy playouts to the end are
+# noisy enough to drown out the difference between one discard and the next.
+#
+# games are played on card masks (see ginbits) by PlayoutState rather than on GinMatch, to the same rules as
+# GinMatch: knocks at 10 or less, gin bonuses and undercuts, and a drawn game once the deck is down to two cards or
+# the turn limit is reached. a search is bounded by iterations, by milliseconds, or both, and can be spread across a
+# process pool (root parallelism): each process searches its own tree, and we add up their root statistics.
+
+from ginstrategy import *
+from activation import numpy
+from multiprocessing import Pool
+from utility import setup_worker_logging, log_queue
+import math
+import random
+import time
+import ginbits
+
+
+# the state of one determinized game, from the point of view of seat 0 (us) and seat 1 (the opponent). actions are
+# tuples: ('DRAW',), ('PICKUP',), ('DISCARD', card), ('KNOCK', card) and ('KNOCK-GIN', card), card by index.
+class PlayoutState(object):
+    __slots__ = ('hands', 'pile', 'deck', 'to_move', 'phase', 'turns_taken', 'first', 'knocking_point',
+                 'maximum_turns', 'winner', 'finished')
+
+    def __init__(self, hands, pile, deck, to_move, phase, turns_taken, first, knocking_point=10, maximum_turns=60):
+        self.hands = hands
+        self.pile = pile
+        self.deck = deck
+        self.to_move = to_move
+        self.phase = phase
+        self.turns_taken = turns_taken
+        self.first = first                 # the seat that plays first each round, as GinMatch's p1
+        self.knocking_point = knocking_point
+        self.maximum_turns = maximum_turns
+        self.winner = None                 # None for a drawn game
+        self.finished = False
+
+    def copy(self):
+        return PlayoutState(list(self.hands), list(self.pile), list(self.deck), self.to_move, self.phase,
+                            self.turns_taken, self.first, self.knocking_point, self.maximum_turns)
+
+    def legal_actions(self):
+        if self.phase == 'start':
+            if self.pile:
+                return [('DRAW',), ('PICKUP',)]
+            return [('DRAW',)]
+
+        mask = self.hands[self.to_move]
+        actions = []
+        for index, deadwood in zip(ginbits.mask_indexes(mask), ginbits.discard_deadwoods(mask)[1]):
+            actions.append(('DISCARD', index))
+            if deadwood == 0:
+                actions.append(('KNOCK-GIN', index))
+            elif deadwood <= self.knocking_point:
+                actions.append(('KNOCK', index))
+        return actions
+
+    # the greedy choice of HeuristicGinStrategy, on masks
+    def playout_action(self):
+        mask = self.hands[self.to_move]
+        if self.phase == 'start':
+            if self.pile:
+                top = self.pile[-1]
+                taken = mask | (1 << top)
+                after = ginbits.discard_deadwoods(taken)[1]
+                del after[ginbits.popcount(taken & ((1 << top) - 1))]
+                if min(after) < ginbits.deadwood(mask):
+                    return ('PICKUP',)
+            return ('DRAW',)
+
+        best, after = ginbits.discard_deadwoods(mask)
+        index = ginbits.mask_indexes(mask)[after.index(best)]
+        if best == 0:
+            return ('KNOCK-GIN', index)
+        elif best <= self.knocking_point:
+            return ('KNOCK', index)
+        return ('DISCARD', index)
+
+    def apply(self, action):
+        kind = action[0]
+        seat = self.to_move
+        if kind == 'DRAW':
+            self.hands[seat] |= 1 << self.deck.pop()
+            self.phase = 'end'
+            return
+        elif kind == 'PICKUP':
+            self.hands[seat] |= 1 << self.pile.pop()
+            self.phase = 'end'
+            return
+
+        card = action[1]
+        self.hands[seat] &= ~(1 << card)
+        self.pile.append(card)
+        if kind != 'DISCARD':
+            self.score_knock(seat)
+            return
+
+        # next player. GinMatch checks for a drawn game before each round, which starts with the first seat.
+        self.turns_taken += 1
+        self.to_move = 1 - seat
+        self.phase = 'start'
+        if self.to_move == self.first and (len(self.deck) <= 2 or self.turns_taken >= self.maximum_turns):
+            self.finished = True
+
+    # GinMatch.update_score(), without the points: a knock at 0 is gin, and a defender at or under the knocker's
+    # deadwood undercuts
+    def score_knock(self, knocker):
+        self.finished = True
+        knocker_deadwood = ginbits.deadwood(self.hands[knocker])
+        if knocker_deadwood == 0:
+            self.winner = knocker
+        elif ginbits.deadwood(self.hands[1 - knocker]) <= knocker_deadwood:
+            self.winner = 1 - knocker
+        else:
+            self.winner = knocker
+
+    # +1 for a win, -1 for a loss and 0 for a draw, for seat. a game cut short (see play_out()) scores the
+    # difference in deadwood instead, squashed into (-1, 1).
+    def reward(self, seat):
+        if not self.finished:
+            margin = ginbits.deadwood(self.hands[1 - seat]) - ginbits.deadwood(self.hands[seat])
+            return math.tanh(margin / 20.0)
+        if self.winner is None:
+            return 0
+        return 1 if self.winner == seat else -1
+
+    # play on with the greedy policy until the game ends, or for at most horizon more turns
+    def play_out(self, horizon=None):
+        stop = self.turns_taken + horizon if horizon is not None else None
+        while not self.finished and (stop is None or self.turns_taken < stop):
+            self.apply(self.playout_action())
+
+
+class SearchNode(object):
+    __slots__ = ('action', 'parent', 'player', 'children', 'visits', 'reward', 'availability')
+
+    # player is the seat that took action to reach us
+    def __init__(self, action=None, parent=None, player=None):
+        self.action = action
+        self.parent = parent
+        self.player = player
+        self.children = {}
+        self.visits = 0
+        self.reward = 0.0
+        self.availability = 0
+
+    # UCB1, counting how often we were available rather than how often our parent was visited
+    def score(self, exploration):
+        return (self.reward / self.visits +
+                exploration * math.sqrt(math.log(self.availability) / self.visits))
+
+
+# everything a search needs to know about the position, as plain picklable data. see determinize().
+def describe_position(strategy, phase):
+    us, opponent, table, match = strategy.us, strategy.opponent, strategy.us.table, strategy.ginmatch
+    masks = table.known_masks(us)
+    return {'ours': us.hand.mask(),
+            'opponent_known': masks['opponent'],
+            'opponent_size': opponent.hand.size(),
+            'pile': table.discards[:table.discard_height].tolist(),
+            'deck_height': table.deck_height,
+            'phase': phase,
+            'turns_taken': match.turns_taken,
+            'first': 0 if table.player1 is us else 1,
+            'knocking_point': match.knocking_point,
+            'maximum_turns': match.maximum_turns,
+            'weights': strategy.belief.weights.copy() if strategy.belief is not None else None}
+
+
+# deal the cards we can't see: the rest of the opponent's hand, then the deck. with belief weights (see
+# belief.OpponentBelief), the opponent's cards are drawn in proportion to them.
+def determinize(position, rng):
+    unseen = ginbits.FULL_MASK & ~(position['ours'] | ginbits.index_mask(position['pile']) |
+                                   position['opponent_known'])
+    pool = ginbits.mask_indexes(unseen)
+    rng.shuffle(pool)
+    count = max(0, min(len(pool), position['opponent_size'] - ginbits.popcount(position['opponent_known'])))
+
+    weights = position['weights']
+    if weights is not None and numpy is not None and count:
+        chances = numpy.asarray(weights)[pool]
+        state = numpy.random.RandomState(rng.randint(0, 2 ** 31 - 1))
+        chosen = set(state.choice(len(pool), size=count, replace=False, p=chances / chances.sum()).tolist())
+        theirs = [pool[i] for i in chosen]
+        deck = [pool[i] for i in range(len(pool)) if i not in chosen]
+    else:
+        theirs, deck = pool[:count], pool[count:]
+
+    deck = deck[:position['deck_height']]
+    return PlayoutState([position['ours'], position['opponent_known'] | ginbits.index_mask(theirs)],
+                        list(position['pile']), deck, 0, position['phase'], position['turns_taken'],
+                        position['first'], position['knocking_point'], position['maximum_turns'])
+
+
+# search from position, returning {root action: [visits, total reward]}. stops after iterations, or after
+# budget_ms milliseconds, whichever comes first (at least one of them must be given). horizon limits each playout
+# (see PlayoutState.play_out()).
+def search(position, iterations=None, budget_ms=None, seed=None, exploration=0.7, horizon=None):
+    assert iterations is not None or budget_ms is not None, "a search needs an iteration or time budget"
+    rng = random.Random(seed)
+    root = SearchNode()
+    deadline = time.time() + budget_ms / 1000.0 if budget_ms is not None else None
+
+    done = 0
+    while (iterations is None or done < iterations) and (deadline is None or time.time() < deadline):
+        state = determinize(position, rng)
+        node = root
+
+        # selection: descend while every action legal in this deal has been tried
+        while not state.finished:
+            legal = state.legal_actions()
+            for action in legal:
+                child = node.children.get(action)
+                if child is not None:
+                    child.availability += 1
+            untried = [action for action in legal if action not in node.children]
+            if untried:
+                # expansion
+                action = rng.choice(untried)
+                child = SearchNode(action, node, state.to_move)
+                child.availability = 1
+                node.children[action] = child
+                state.apply(action)
+                node = child
+                break
+            node = max((node.children[action] for action in legal), key=lambda c: c.score(exploration))
+            state.apply(node.action)
+
+        # simulation
+        state.play_out(horizon)
+
+        # backpropagation, each node scored for the seat that chose it
+        while node is not root:
+            node.visits += 1
+            node.reward += state.reward(node.player)
+            node = node.parent
+        root.visits += 1
+        done += 1
+
+    return dict((action, [child.visits, child.reward]) for action, child in root.children.items())
+
+
+# search() taking its arguments as one tuple, for Pool.map()
+def search_worker(arguments):
+    return search(*arguments)
+
+
+# add up root statistics from several searches
+def merge_statistics(results):
+    merged = {}
+    for statistics in results:
+        for action, (visits, reward) in statistics.items():
+            totals = merged.setdefault(action, [0, 0.0])
+            totals[0] += visits
+            totals[1] += reward
+    return merged
+
+
+# Plays by ISMCTS over the true game rules, with a greedy playout policy. iterations and budget_ms bound each
+# decision (see search()); processes, if more than one, splits the work across that many processes, each with its
+# own tree. belief, an OpponentBelief, shapes the deals of the opponent's hand.
+class ISMCTSGinStrategy(GinStrategy):
+    def __init__(self, us, opponent, ginmatch, iterations=200, budget_ms=None, processes=None, belief=None,
+                 seed=None, exploration=0.7, horizon=2):
+        super(ISMCTSGinStrategy, self).__init__(us, opponent, ginmatch)
+        self.iterations = iterations
+        self.budget_ms = budget_ms
+        self.processes = processes
+        self.belief = belief
+        self.exploration = exploration
+        self.horizon = horizon
+
+        # our own random numbers, so searching doesn't change how the match's cards fall
+        self.rng = random.Random(seed)
+        self.pool = None
+
+        # the merged root statistics of our last decision
+        self.statistics = {}
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+    def run_search(self, position):
+        if not self.processes or self.processes <= 1:
+            return search(position, self.iterations, self.budget_ms, self.rng.random(), self.exploration,
+                          self.horizon)
+
+        if self.pool is None:
+            self.pool = Pool(self.processes, setup_worker_logging, (log_queue(),))
+        iterations = None
+        if self.iterations is not None:
+            iterations = max(1, self.iterations // self.processes)
+        arguments = [(position, iterations, self.budget_ms, self.rng.random(), self.exploration, self.horizon)
+                     for _ in range(self.processes)]
+        return merge_statistics(self.pool.map(search_worker, arguments))
+
+    def determine_best_action(self, phase=None):
+        assert phase is not None, "a phase of 'start' or 'end' is required"
+        if phase == 'start' and not self.us.table.discard_height:
+            return ['DRAW', 0]
+
+        self.statistics = self.run_search(describe_position(self, phase))
+        action = max(self.statistics, key=lambda key: (self.statistics[key][0], self.statistics[key][1]))
+
+        if action[0] == 'DRAW':
+            return ['DRAW', 0]
+        elif action[0] == 'PICKUP':
+            return ['PICKUP-FROM-DISCARD', 0]
+        slot = ginbits.popcount(self.us.hand.mask() & ((1 << action[1]) - 1))
+        return [action[0], slot]
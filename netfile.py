@@ -0,0 +1,161 @@
+#!/usr/bin/python
+#
+# netfile.py
+#
+# 2026/10/19
+# rg
+#
+# compact binary export of a single compiled network, and a loader that maps the file instead of reading it.
+#
+# the file is a small header describing the topology, then the weights as contiguous little-endian float32 or
+# float64 blocks, in order: input (I), hidden (H x I), jidden (J x H), output (O x J). the blocks start on an
+# 8 byte boundary. with numpy the loader runs inference straight off the mapped pages, so a cold start costs one
+# mmap() call and every process that maps the same file shares a single copy of the weights. without numpy the
+# blocks are copied into lists once at load time.
+#
+# header, all little-endian:
+#   'GINNET\0\0'                                         magic
+#   H version, H float size (4|8), I flags (1 = sparse inputs), I inputs, I hidden, I jidden, I outputs
+#   I input width count, then I per width
+#   H length + activation name
+#   H output key count, then H length + name per key
+
+from neuralnet import *
+from array import array
+import mmap
+import struct
+
+NETFILE_MAGIC = 'GINNET\0\0'
+NETFILE_VERSION = 1
+NETFILE_SPARSE_INPUTS = 1
+
+_float_types = {4: ('f', '<f4'), 8: ('d', '<f8')}
+
+
+def _pack_string(value):
+    return struct.pack('<H', len(value)) + value
+
+
+def _unpack_string(data, offset):
+    length, = struct.unpack_from('<H', data, offset)
+    offset += 2
+    return data[offset:offset + length], offset + length
+
+
+# write a compiled network to path. float_size 4 halves the file at the cost of rounding every weight to float32.
+def export_network(compiled, path, float_size=8):
+    assert float_size in _float_types, "float_size must be 4 or 8"
+    typecode = _float_types[float_size][0]
+
+    flags = 0
+    if compiled.active_columns is not None:
+        flags |= NETFILE_SPARSE_INPUTS
+
+    header = NETFILE_MAGIC
+    header += struct.pack('<HHIIIII', NETFILE_VERSION, float_size, flags, len(compiled.input_weights),
+                          len(compiled.hidden_weights), len(compiled.jidden_weights), len(compiled.output_weights))
+    header += struct.pack('<I', len(compiled.input_widths))
+    header += struct.pack('<%dI' % len(compiled.input_widths), *compiled.input_widths)
+    header += _pack_string(compiled.activation)
+    header += struct.pack('<H', len(compiled.output_keys))
+    for key in compiled.output_keys:
+        header += _pack_string(key)
+    header += '\0' * (-len(header) % 8)
+
+    weights = array(typecode, compiled.input_weights)
+    for rows in (compiled.hidden_weights, compiled.jidden_weights, compiled.output_weights):
+        for row in rows:
+            weights.extend(row)
+    if sys.byteorder == 'big':
+        weights.byteswap()
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(weights.tostring())
+
+
+# a network loaded from an export_network() file. it stands in for a CompiledNeuralNet anywhere one is used
+# (BoundNeuralNet, the backend kernels), but its weights live in the mapped file rather than in lists. with numpy
+# those weights are numpy arrays, which the pure-Python arithmetic would only crawl through, so forward() runs the
+# numpy kernel whatever backend the caller picked: a mapped network bound to the 'python' backend runs on numpy.
+class MappedNeuralNet(CompiledNeuralNet):
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        data = self.map
+        assert data[:len(NETFILE_MAGIC)] == NETFILE_MAGIC, path + " is not a network file"
+        offset = len(NETFILE_MAGIC)
+        version, float_size, flags, num_inputs, num_hidden, num_jidden, num_outputs = \
+            struct.unpack_from('<HHIIIII', data, offset)
+        assert version == NETFILE_VERSION, "unsupported network file version: " + str(version)
+        offset += struct.calcsize('<HHIIIII')
+
+        count, = struct.unpack_from('<I', data, offset)
+        offset += 4
+        self.input_widths = list(struct.unpack_from('<%dI' % count, data, offset))
+        offset += 4 * count
+
+        self.activation, offset = _unpack_string(data, offset)
+        self.activation_function = get_activation(self.activation)
+
+        count, = struct.unpack_from('<H', data, offset)
+        offset += 2
+        self.output_keys = []
+        for _ in range(count):
+            key, offset = _unpack_string(data, offset)
+            self.output_keys.append(key)
+        offset += -offset % 8
+
+        self.float_size = float_size
+        shapes = [(num_inputs,), (num_hidden, num_inputs), (num_jidden, num_hidden), (num_outputs, num_jidden)]
+        blocks = []
+        for shape in shapes:
+            size = reduce(mul, shape)
+            blocks.append(self.read_block(offset, size, shape))
+            offset += size * float_size
+        self.input_weights, self.hidden_weights, self.jidden_weights, self.output_weights = blocks
+
+        self._kernels = {}
+        self.decision_cache = DecisionCache()
+        self.hidden_base = None
+        self.active_columns = None
+        if flags & NETFILE_SPARSE_INPUTS:
+            self.compile_sparse_inputs()
+
+        # mapped weights are shared with every other process mapping this file, so count only our own overhead
+        if numpy is None:
+            self.nbytes = self.calculate_nbytes()
+        else:
+            self.nbytes = sys.getsizeof(self)
+
+    # a (rows x columns) view of the mapped weights with numpy, else a copy as a list (of lists)
+    def read_block(self, offset, size, shape):
+        typecode, dtype = _float_types[self.float_size]
+        if numpy is not None:
+            return numpy.frombuffer(self.map, dtype=dtype, count=size, offset=offset).reshape(shape)
+
+        values = array(typecode)
+        values.fromstring(self.map[offset:offset + size * self.float_size])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        values = values.tolist()
+        if len(shape) == 1:
+            return values
+        return [values[i:i + shape[1]] for i in range(0, size, shape[1])]
+
+    # as CompiledNeuralNet.forward(): inputs may run on past our width, with or without an offset
+    def forward(self, inputs, offset=0):
+        if numpy is not None:
+            return self.kernel('numpy').forward(inputs[offset:offset + len(self.input_weights)])
+        return CompiledNeuralNet.forward(self, inputs, offset)
+
+    def close(self):
+        self._kernels = {}
+        self.input_weights = self.hidden_weights = self.jidden_weights = self.output_weights = None
+        self.map.close()
+
+
+def load_network(path):
+    return MappedNeuralNet(path)
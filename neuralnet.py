@@ -7,15 +7,20 @@
 #
 # base neural networking classes
 
-from math import exp
+from activation import *
 from utility import *
 from texttable import *
+from collections import OrderedDict
+import copy
+from itertools import islice
+from operator import add, itemgetter, mul
+import sys
 
 
 class NeuralNet(object):
     # take in an array of observers, a dict of lists of weights (weights[input]=[0.1,0.2,...]) and an array
-    # of output_keys
-    def __init__(self, observers, weightset, output_keys):
+    # of output_keys. activation names one of the functions in activation.ACTIVATIONS ('exact' or 'lut')
+    def __init__(self, observers, weightset, output_keys, activation=None):
         assert len(observers) > 0, 'must have at least one observer'
         assert len(weightset.weights) > 0, 'must have non-empty weights dict'
         assert len(output_keys) > 0, 'must have at least one output_key'
@@ -24,6 +29,11 @@ class NeuralNet(object):
 
         self.weightset = weightset
 
+        if activation is None:
+            activation = DEFAULT_ACTIVATION
+        self.activation = activation
+        self.activation_function = get_activation(activation)
+
         self.outputs = {}
         for key in output_keys:
             self.outputs[key] = None
@@ -64,7 +74,9 @@ class NeuralNet(object):
                 weight = self.weightset.weights['input'][key]
                 # create a uniqueish id
                 myid = observer.__class__.__name__ + '-' + str(observer.id) + '-' + str(key)
-                self.input_layer.append(InputPerceptron(observer, weight=weight, myid=myid, index=key))
+                ip = InputPerceptron(observer, weight=weight, myid=myid, index=key)
+                ip.activation = self.activation_function
+                self.input_layer.append(ip)
 
     # create hidden neurons and attach them to each of our input neurons using the weights in weights['hidden']
     def create_hidden_layer(self):
@@ -72,6 +84,7 @@ class NeuralNet(object):
         for i in range(count):
             hp = HiddenPerceptron(self.input_layer, self.weightset.weights['hidden'][i])
             hp.add_input(BiasPerceptron(1), 1)
+            hp.activation = self.activation_function
             self.hidden_layer.append(hp)
 
     def create_jidden_layer(self):
@@ -79,6 +92,7 @@ class NeuralNet(object):
         for i in range(count):
             jp = HiddenPerceptron(self.hidden_layer, self.weightset.weights['jidden'][i])
             jp.add_input(BiasPerceptron(1), 1)
+            jp.activation = self.activation_function
             self.jidden_layer.append(jp)
 
     # create output neurons and attach them to each of our hidden neurons using the weights in weights['hidden']
@@ -88,10 +102,17 @@ class NeuralNet(object):
             key = self.outputs.keys()[i]
             op = OutputPerceptron(self.jidden_layer, self.weightset.weights['output'][i], key)
             op.add_input(BiasPerceptron(1), 1)
+            op.activation = self.activation_function
             self.output_layer.append({key: op})
 
     # pulse the neural net and store the output for later use
     def pulse(self):
+        # forget the previous pulse's cached values so every neuron reflects the current observations
+        for neuron in self.hidden_layer + self.jidden_layer:
+            neuron.memo = False
+        for item in self.output_layer:
+            item.values()[0].memo = False
+
         # fire each output neuron
         for item in self.output_layer:
             output_key = item.keys()[0]
@@ -190,9 +211,481 @@ class NeuralNet(object):
 
 
 class GinNeuralNet(NeuralNet):
-    def __init__(self, observers, weightset):
-        output_keys = ['action_start', 'action_end', 'index']
-        super(GinNeuralNet, self).__init__(observers, weightset, output_keys)
+    output_keys = ['action_start', 'action_end', 'index']
+    input_widths = [11, 33]  # a GinPlayer observer, then a GinTable observer
+
+    def __init__(self, observers, weightset, activation=None):
+        super(GinNeuralNet, self).__init__(observers, weightset, GinNeuralNet.output_keys, activation=activation)
+
+
+# A NeuralNet flattened into plain per-layer weight rows. It computes exactly what the Perceptron graph computes,
+# but holds no observers, so a single CompiledNeuralNet can be shared by any number of matches (see BoundNeuralNet).
+class CompiledNeuralNet(object):
+    # input_widths lists the width of each observer the network will be bound to, in order. sparse_inputs prepares
+    # the gather-based first layer used with one-hot (SparseObserver) inputs.
+    def __init__(self, weightset, output_keys, input_widths=None, activation=None, sparse_inputs=False):
+        weights = weightset.weights
+        if input_widths is None:
+            input_widths = [len(weights['input'])]
+        self.input_widths = list(input_widths)
+
+        # NeuralNet pairs output rows with the keys of its outputs dict, in dict order. we do the same.
+        outputs = {}
+        for key in output_keys:
+            outputs[key] = None
+        self.output_keys = outputs.keys()
+
+        if activation is None:
+            activation = DEFAULT_ACTIVATION
+        self.activation = activation
+        self.activation_function = get_activation(activation)
+
+        # NeuralNet.create_input_layer restarts the input weight index at 0 for each observer
+        self.input_weights = [weights['input'][index] for width in self.input_widths for index in range(width)]
+        self.hidden_weights = [list(row) for row in weights['hidden']]
+        self.jidden_weights = [list(row) for row in weights['jidden']]
+        self.output_weights = [list(row) for row in weights['output'][:len(self.output_keys)]]
+
+        # backend kernels built from our weights on demand. see kernel() and GinNeuralNet.backends
+        self._kernels = {}
+
+        # decisions already made by this network, shared by every match it plays in
+        self.decision_cache = DecisionCache()
+
+        self.hidden_base = None
+        self.active_columns = None
+        if sparse_inputs:
+            self.compile_sparse_inputs()
+
+        self.nbytes = self.calculate_nbytes()
+
+    # With one-hot inputs every input neuron outputs either activation(0) (inactive) or activation(weight) (active).
+    # A hidden neuron's weighted sum is then a constant, plus one precomputed column per active input, so the first
+    # layer becomes a sum over a handful of columns instead of a full row-by-input product.
+    def compile_sparse_inputs(self):
+        idle = self.activation_function(0)
+        self.hidden_base = [sum(row) * idle + 1 for row in self.hidden_weights]
+        self.active_columns = []
+        for i in range(len(self.input_weights)):
+            step = self.activation_function(self.input_weights[i]) - idle
+            self.active_columns.append([row[i] * step for row in self.hidden_weights])
+
+    # rough resident size of our weights, used by CompiledNetCache to enforce its memory cap
+    def calculate_nbytes(self):
+        rows = [self.input_weights] + self.hidden_weights + self.jidden_weights + self.output_weights
+        if self.active_columns is not None:
+            rows += [self.hidden_base] + self.active_columns
+        total = sys.getsizeof(self) + sys.getsizeof(rows)
+        for row in rows:
+            total += sys.getsizeof(row) + len(row) * sys.getsizeof(0.0)
+        return total
+
+    # run one set of inputs through the network, returning the outputs in self.output_keys order. with an offset,
+    # the inputs start that far into the sequence (a window of a match's InputBuffer, say) and run on past our width.
+    # each hidden, jidden and output neuron also sees a bias neuron of 1 with weight 1.
+    def forward(self, inputs, offset=0):
+        activation = self.activation_function
+        if offset:
+            inputs = islice(inputs, offset, None)
+        squashed = [activation(value * weight) for value, weight in zip(inputs, self.input_weights)]
+        return self.forward_hidden([sum(map(mul, row, squashed)) + 1 for row in self.hidden_weights])
+
+    # return (building it on first use) the kernel for one of the backends in GinNeuralNet.backends
+    def kernel(self, backend):
+        try:
+            return self._kernels[backend]
+        except KeyError:
+            assert backend in GinNeuralNet.backends, "unknown backend: " + str(backend)
+            kernel = GinNeuralNet.backends[backend](self)
+            self._kernels[backend] = kernel
+            return kernel
+
+    # run one-hot inputs through the network, given only the positions of the inputs that are 1
+    def forward_active(self, active_indexes):
+        if self.active_columns is None:
+            self.compile_sparse_inputs()
+        hidden_sums = self.hidden_base
+        for index in active_indexes:
+            hidden_sums = map(add, hidden_sums, self.active_columns[index])
+        return self.forward_hidden(hidden_sums)
+
+    # finish a pass given the hidden layer's weighted sums (bias included)
+    def forward_hidden(self, hidden_sums):
+        activation = self.activation_function
+        hidden = [activation(value) for value in hidden_sums]
+        jidden = [activation(sum(map(mul, row, hidden)) + 1) for row in self.jidden_weights]
+        return [activation(sum(map(mul, row, jidden)) + 1) for row in self.output_weights]
+
+
+# Inference backends. Each kernel wraps a CompiledNeuralNet and offers forward(inputs) for one set of inputs and
+# forward_batch(batch) for a list of them, both returning outputs in compiled.output_keys order.
+#
+# - python:  the flat-list kernel in CompiledNeuralNet itself. no call overhead, so it wins for single decisions.
+# - numpy:   one matrix-vector product per layer and input set. each call pays numpy's fixed overhead.
+# - batched: one matrix-matrix product per layer for the whole batch. wins once batches get large.
+#
+# autotune.py times them on the current machine and picks one per call site and batch size.
+class PythonKernel(object):
+    available = True
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+
+    def forward(self, inputs):
+        return self.compiled.forward(inputs)
+
+    def forward_batch(self, batch):
+        return [self.compiled.forward(inputs) for inputs in batch]
+
+
+class NumpyKernel(object):
+    available = numpy is not None
+
+    def __init__(self, compiled):
+        assert numpy is not None, "the numpy backends require numpy"
+        self.activation = get_activation(compiled.activation, vectorized=True)
+        # weights that are already float arrays (a MappedNeuralNet's, float32 or float64) stay where they are, so a
+        # mapped network runs straight off its pages. lists become float64 arrays.
+        self.input_weights = self.weight_array(compiled.input_weights)
+        self.hidden_weights = self.weight_array(compiled.hidden_weights)
+        self.jidden_weights = self.weight_array(compiled.jidden_weights)
+        self.output_weights = self.weight_array(compiled.output_weights)
+
+        # each layer's values go into the next in the weights' own precision, so a product never copies a matrix
+        self.dtype = self.hidden_weights.dtype
+
+    @staticmethod
+    def weight_array(weights):
+        if isinstance(weights, numpy.ndarray) and weights.dtype.kind == 'f':
+            return weights
+        return numpy.asarray(weights, dtype=float)
+
+    def forward(self, inputs):
+        activation = self.activation
+        dtype = self.dtype
+        squashed = activation(numpy.asarray(inputs, dtype=float) * self.input_weights)
+        hidden = activation(self.hidden_weights.dot(squashed.astype(dtype, copy=False)) + 1)
+        jidden = activation(self.jidden_weights.dot(hidden.astype(dtype, copy=False)) + 1)
+        return activation(self.output_weights.dot(jidden.astype(dtype, copy=False)) + 1).tolist()
+
+    def forward_batch(self, batch):
+        return [self.forward(inputs) for inputs in batch]
+
+
+class BatchedKernel(NumpyKernel):
+    # one row per set of inputs, all layers at once
+    def forward_batch(self, batch):
+        activation = self.activation
+        dtype = self.dtype
+        squashed = activation(numpy.asarray(batch, dtype=float) * self.input_weights)
+        hidden = activation(squashed.astype(dtype, copy=False).dot(self.hidden_weights.T) + 1)
+        jidden = activation(hidden.astype(dtype, copy=False).dot(self.jidden_weights.T) + 1)
+        return activation(jidden.astype(dtype, copy=False).dot(self.output_weights.T) + 1).tolist()
+
+    def forward(self, inputs):
+        return self.forward_batch([inputs])[0]
+
+
+GinNeuralNet.backends = OrderedDict([('python', PythonKernel), ('numpy', NumpyKernel), ('batched', BatchedKernel)])
+
+
+# the backends that can run here
+def available_backends():
+    return [name for name in GinNeuralNet.backends if GinNeuralNet.backends[name].available]
+
+
+# compressed sparse row matrix: row r holds data[indptr[r]:indptr[r+1]] at columns indices[indptr[r]:indptr[r+1]]
+class CSRMatrix(object):
+    def __init__(self, rows):
+        self.indptr = [0]
+        self.indices = []
+        self.data = []
+        for row in rows:
+            for i in range(len(row)):
+                if row[i] != 0:
+                    self.indices.append(i)
+                    self.data.append(row[i])
+            self.indptr.append(len(self.indices))
+
+        if rows:
+            self.shape = (len(rows), len(rows[0]))
+        else:
+            self.shape = (0, 0)
+
+        # per-row (gather, values) pairs, built once so dot() doesn't have to slice
+        self._rows = []
+        for r in range(len(rows)):
+            indices = self.indices[self.indptr[r]:self.indptr[r + 1]]
+            self._rows.append((CSRMatrix.make_gather(indices), self.data[self.indptr[r]:self.indptr[r + 1]]))
+
+    # return a function pulling the given positions out of a vector as a tuple
+    @staticmethod
+    def make_gather(indices):
+        if len(indices) == 0:
+            return lambda vector: ()
+        elif len(indices) == 1:
+            index = indices[0]
+            return lambda vector: (vector[index],)
+        else:
+            return itemgetter(*indices)
+
+    def nnz(self):
+        return len(self.data)
+
+    def nbytes(self):
+        total = sys.getsizeof(self.indptr) + sys.getsizeof(self.indices) + sys.getsizeof(self.data)
+        return total + len(self.data) * sys.getsizeof(0.0)
+
+    # matrix-vector product
+    def dot(self, vector):
+        return [sum(map(mul, data, gather(vector))) for gather, data in self._rows]
+
+
+# a CompiledNeuralNet whose hidden, jidden and output layers run through CSR kernels, skipping zero weights.
+# pays off once a WeightSet has been sparsified (see WeightSet.sparsify and pruning.py).
+class SparseCompiledNeuralNet(CompiledNeuralNet):
+    def __init__(self, weightset, output_keys, input_widths=None, activation=None, sparse_inputs=False):
+        self.hidden_matrix = CSRMatrix([list(row) for row in weightset.weights['hidden']])
+        self.jidden_matrix = CSRMatrix([list(row) for row in weightset.weights['jidden']])
+        self.output_matrix = CSRMatrix([list(row) for row in weightset.weights['output'][:len(output_keys)]])
+        super(SparseCompiledNeuralNet, self).__init__(weightset, output_keys, input_widths=input_widths,
+                                                      activation=activation, sparse_inputs=sparse_inputs)
+
+    def calculate_nbytes(self):
+        total = super(SparseCompiledNeuralNet, self).calculate_nbytes()
+        for matrix in (self.hidden_matrix, self.jidden_matrix, self.output_matrix):
+            total += matrix.nbytes()
+        return total
+
+    # fraction of connection weights that are zero
+    def sparsity(self):
+        matrices = (self.hidden_matrix, self.jidden_matrix, self.output_matrix)
+        total = sum(matrix.shape[0] * matrix.shape[1] for matrix in matrices)
+        return 1 - float(sum(matrix.nnz() for matrix in matrices)) / max(1, total)
+
+    def forward(self, inputs, offset=0):
+        activation = self.activation_function
+        if offset:
+            inputs = islice(inputs, offset, None)
+        squashed = [activation(value * weight) for value, weight in zip(inputs, self.input_weights)]
+        return self.forward_hidden([value + 1 for value in self.hidden_matrix.dot(squashed)])
+
+    def forward_hidden(self, hidden_sums):
+        activation = self.activation_function
+        hidden = [activation(value) for value in hidden_sums]
+        jidden = [activation(value + 1) for value in self.jidden_matrix.dot(hidden)]
+        return [activation(value + 1) for value in self.output_matrix.dot(jidden)]
+
+
+# binds a (shared) CompiledNeuralNet to one match's observers. offers the same pulse()/outputs interface as
+# NeuralNet, so strategies can't tell the difference.
+class BoundNeuralNet(object):
+    # backend names the kernel used for dense inputs (see GinNeuralNet.backends), batch_backend the one used by
+    # pulse_batch(). batch_backend defaults to backend.
+    def __init__(self, observers, compiled, backend=None, batch_backend=None):
+        assert len(observers) > 0, 'must have at least one observer'
+        self.observers = observers
+        self.compiled = compiled
+
+        if backend is None:
+            backend = 'python'
+        if batch_backend is None:
+            batch_backend = backend
+        self.backend = backend
+        self.kernel = compiled.kernel(backend)
+        self.batch_kernel = compiled.kernel(batch_backend)
+
+        # with only SparseObservers, we feed active positions to the gather-based first layer
+        self.sparse = all(observer.sparse for observer in observers)
+
+        # when set to a list, every pulse appends the (dense) inputs it saw. see pruning.record_state_corpus()
+        self.recorder = None
+
+        # our window of the match's InputBuffer, when attached. see attach_inputs()
+        self.input_values = None
+        self.input_offset = 0
+        self.input_view = None
+
+        self.outputs = {}
+        for key in compiled.output_keys:
+            self.outputs[key] = None
+
+    # read dense inputs straight from the InputBuffer inputs, at values[offset:offset + our input width], rather than
+    # from our observers. the numpy backends get a numpy view of the window, so nothing is converted or copied per
+    # pulse. attaching freezes the buffer, whatever our backend: no window can be added after the first network.
+    def attach_inputs(self, inputs, offset):
+        assert not self.sparse, "one-hot networks gather their active positions from their observers"
+        inputs.freeze()
+        self.input_values = inputs.values
+        self.input_offset = offset
+        self.input_view = None
+        if self.backend != 'python' and numpy is not None:
+            self.input_view = inputs.view(offset, len(self.compiled.input_weights))
+
+    # everything the network currently sees, as a hashable tuple: the active positions for sparse networks, the
+    # dense inputs otherwise. pulse() accepts it in place of sensing again.
+    def observe_state(self):
+        if self.sparse:
+            return tuple(self.sense_active())
+        return tuple(self.sense())
+
+    # read the current value of every input from our observers (or our InputBuffer window)
+    def sense(self):
+        if self.input_values is not None:
+            return self.input_values[self.input_offset:self.input_offset + len(self.compiled.input_weights)].tolist()
+        inputs = []
+        for observer in self.observers:
+            for index in range(observer.width):
+                inputs.append(observer.get_value_by_index(index))
+        return inputs
+
+    # gather the active input positions of our (sparse) observers, offset into one input vector
+    def sense_active(self):
+        active_indexes = []
+        offset = 0
+        for observer in self.observers:
+            for index in observer.get_active_indexes():
+                active_indexes.append(offset + index)
+            offset += observer.width
+        return active_indexes
+
+    # state, if given, is what observe_state() returned for the current position
+    def pulse(self, state=None):
+        if self.sparse:
+            if state is None:
+                state = self.sense_active()
+            values = self.compiled.forward_active(state)
+            if self.recorder is not None:
+                self.recorder.append(self.sense())
+        elif self.input_values is not None:
+            # the window always holds the current state, so any state we were handed is the same numbers
+            if self.input_view is not None:
+                values = self.kernel.forward(self.input_view)
+            else:
+                values = self.compiled.forward(self.input_values, self.input_offset)
+            if self.recorder is not None:
+                self.recorder.append(self.sense())
+        else:
+            if state is None:
+                inputs = self.sense()
+            else:
+                inputs = list(state)
+            values = self.kernel.forward(inputs)
+            if self.recorder is not None:
+                self.recorder.append(inputs)
+        for i in range(len(values)):
+            self.outputs[self.compiled.output_keys[i]] = values[i]
+
+    # run a batch of (dense) input vectors, typically variations on sense(), in one pass. returns a dict of outputs
+    # per vector and leaves self.outputs alone.
+    def pulse_batch(self, batch):
+        keys = self.compiled.output_keys
+        return [dict(zip(keys, values)) for values in self.batch_kernel.forward_batch(batch)]
+
+    @property
+    def decision_cache(self):
+        return getattr(self.compiled, 'decision_cache', None)
+
+
+# LRU cache of CompiledNeuralNets keyed by genome content hash. evicts least recently used networks once we hold
+# more than maxsize of them or once their combined size exceeds max_bytes.
+class CompiledNetCache(object):
+    def __init__(self, maxsize=None, max_bytes=32 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+
+        # bookkeeping
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    # return the cached network for key (refreshing its recency), or None
+    def get(self, key):
+        try:
+            compiled = self._entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries[key] = compiled
+        self.hits += 1
+        return compiled
+
+    def put(self, key, compiled):
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key).nbytes
+        self._entries[key] = compiled
+        self.nbytes += compiled.nbytes
+
+        # evict from the least recently used end, always keeping the newest entry
+        while len(self._entries) > 1 and (self.nbytes > self.max_bytes or
+                                          (self.maxsize is not None and len(self._entries) > self.maxsize)):
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    # fetch the network for key, building (and caching) it with builder() on a miss
+    def get_or_compile(self, key, builder):
+        compiled = self.get(key)
+        if compiled is None:
+            compiled = builder()
+            self.put(key, compiled)
+        return compiled
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    # the cached networks, least recently used first
+    def values(self):
+        return self._entries.values()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        hit_rate = float(self.hits) / lookups if lookups else 0.0
+        return "compiled nets: {0} cached ({1} KB), {2} hits, {3} misses ({4:.1%} hit rate), {5} evictions".format(
+            len(self._entries), self.nbytes / 1024, self.hits, self.misses, hit_rate, self.evictions)
+
+
+# bounded LRU cache of a network's decisions, keyed by (phase, observed state). networks are deterministic, so a
+# state seen before gets the same decision; in drawn-out games (one player picking up and discarding the same card
+# over and over, say) most decisions are repeats. the tuple keys hash quickly and, unlike a digest, can't collide.
+class DecisionCache(object):
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        try:
+            decision = self._entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries[key] = decision
+        self.hits += 1
+        return decision
+
+    def put(self, key, decision):
+        self._entries.pop(key, None)
+        self._entries[key] = decision
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
 
 
 class Perceptron(object):
@@ -206,6 +699,9 @@ class Perceptron(object):
         # memoization caching
         self.memo = False
 
+        # squashing function applied to our weighted input sum. NeuralNet swaps this out per network.
+        self.activation = sigmoid
+
     # uplink to an upstream perceptron, storing the connection's weight in a dict
     def add_input(self, target, weight):
         self.inputs[target] = weight
@@ -215,14 +711,8 @@ class Perceptron(object):
     def step_function(self):
         return sum(self.inputs.values())
 
-    @staticmethod
-    def sigmoid(num):
-        if -num > 100:
-            return 0
-        elif -num < -100:
-            return 1
-        else:
-            return 1 / (1 + exp(-num))
+    # the exact sigmoid. see activation.py for the lookup-table and vectorized variants.
+    sigmoid = staticmethod(sigmoid)
 
     # return the sigmoid of: the sum of our inputs multiplied by their respective weights
     def generate_output(self, indent_level=0, getlast=True):
@@ -240,14 +730,19 @@ class Perceptron(object):
             for each_input in self.inputs.keys():
                 output = each_input.generate_output(indent_level=indent_level+1, getlast=getlast)
                 weighted += self.inputs[each_input] * output
-                sigmoided = Perceptron.sigmoid(weighted)
                 # debug output
                 if func_debug:
                     indent_print(indent_level+1, "looking at connection from " + each_input.id + " to " + self.id)
                     indent_print(indent_level+2, "input weight: " + str(self.inputs[each_input]))
                     indent_print(indent_level+2, "output: " + str(output))
                     indent_print(indent_level+2, "weighted: " + str(weighted))
-                    indent_print(indent_level+2, "sigmoided: " + str(round(sigmoided, 4)))
+
+            # squash once, after the whole weighted sum is in
+            if self.inputs:
+                sigmoided = self.activation(weighted)
+
+            if func_debug:
+                indent_print(indent_level+1, "sigmoided: " + str(round(sigmoided, 4)))
 
             self.memo = sigmoided
 
@@ -273,7 +768,7 @@ class InputPerceptron(Perceptron):
         func_debug = 0
 
         # ask the observer for its current sense of the world, weight it, and then run it through the sigmoid function
-        sigmoided = Perceptron.sigmoid(self.sense() * self.weight)
+        sigmoided = self.activation(self.sense() * self.weight)
 
         if func_debug:
             indent_print(indent_level, "running generate_output() for: " + self.id)
@@ -371,6 +866,27 @@ class WeightSet(object):
         for i in range(len(self.weights['output'])):
             self.weights['output'][i] = self.weights['output'][i][:num_hidden]
 
+    # return a copy of this WeightSet with every connection weight (hidden, jidden, output) smaller in magnitude than
+    # threshold set to zero. input weights scale a single sensor each, so they are left alone.
+    def sparsify(self, threshold):
+        pruned = copy.deepcopy(self)
+        for layer in ('hidden', 'jidden', 'output'):
+            for row in pruned.weights[layer]:
+                for i in range(len(row)):
+                    if abs(row[i]) < threshold:
+                        row[i] = 0.0
+        return pruned
+
+    # fraction of connection weights that are zero
+    def sparsity(self):
+        total = 0
+        zeroes = 0
+        for layer in ('hidden', 'jidden', 'output'):
+            for row in self.weights[layer]:
+                total += len(row)
+                zeroes += row.count(0.0)
+        return float(zeroes) / max(1, total)
+
     def validate(self, expected_input_count, expected_hidden_count, expected_output_count):
         # ensure we have an input, hidden and output key
         assert 'input'  in self.weights, "no input  weights"
@@ -8,42 +8,144 @@
 # classes to implement observer pattern and observe changes that occur in specific classes
 
 import uuid
+import weakref
+from array import array
+from activation import numpy
 from utility import *
 
 
 # Provide an Observable base class for any class meeting this criteria:
 # - must contain a organize_data() function which prepares and returns an array of ints
+# - may contain an organize_active(plane) function, returning the active positions of a one-hot plane listed in
+#   its onehot_planes dict (plane name -> width). SparseObservers read these.
 #
-# For future improvement (garbage collection), look towards: https://github.com/DanielSank/observed
+# Observation is pull-based. State-changing methods only bump the Observable's version; each Observer re-encodes
+# the Observable (via notify()) the next time it is read with a version it hasn't seen. Changes that nobody reads
+# before the next change cost nothing.
+#
+# Observables only hold weak references to their observers, so an observer lives exactly as long as whoever reads
+# it (a network, say). See GinMatch.close() for tearing down the rest of a match's references.
 
-# decorator to be used on methods that affect the state of the game. subscribes the observer to all changes made
-#  to methods in the Observable class
+# decorator to be used on methods that affect the state of the game. marks everything observed before the call as
+#  stale once it returns
 def notify_observers_after(func):
     def func_wrapper(self, *args, **kwargs):
         ret_value = func(self, *args, **kwargs)
-        for observer in self._observers:
-            observer.observe(self.organize_data())
+        self.changed()
         return ret_value
     return func_wrapper
 
 
 def notify_observers_before(func):
     def func_wrapper(self, *args, **kwargs):
-        for observer in self._observers:
-            observer.observe(self.organize_data())
+        self.changed()
         return func(self, *args, **kwargs)
 
     return func_wrapper
 
 
+# an immutable view of an Observable's organize_data() at one version, shared by every observer reading that version
+class Snapshot(dict):
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("snapshots are shared between observers and cannot be modified")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _immutable
+
+
 class Observable(object):
     def __init__(self):
-        self._observers = []
+        self._observers = weakref.WeakSet()
         self.id = uuid.uuid4()
 
+        # bumped on every change. observers compare it with the version they last encoded.
+        self._version = 0
+
+        # open batch() blocks, and whether a change inside them is still waiting for its bump
+        self._batch_depth = 0
+        self._pending_change = False
+
+        # encodings of the current version, built on first request: None -> Snapshot, plane -> tuple of positions
+        self._snapshots = {}
+        self._snapshot_version = None
+        self.snapshots_built = 0
+
+        # (values, offset) of every InputBuffer slice we keep up to date
+        self._input_slices = []
+
+    @property
+    def version(self):
+        if self._pending_change:
+            self._pending_change = False
+            self._version += 1
+        return self._version
+
+    # record a change of state: a version bump, or one pending bump for the whole batch if one is open
+    def changed(self):
+        if self._batch_depth:
+            self._pending_change = True
+        else:
+            self._version += 1
+
+    # a context manager coalescing every change made inside it into one update
+    def batch(self):
+        return ObservableBatch(self)
+
+    # our organize_data() as a list of observable_width numbers, 0 where there's nothing
+    def encode_inputs(self):
+        row = [0] * self.observable_width
+        for index, value in self.organize_data().items():
+            if index < self.observable_width:
+                row[index] = value
+        return row
+
+    # take ownership of values[offset:offset + observable_width], filling it in now and on every change after
+    def attach_input_slice(self, values, offset):
+        self._input_slices.append((values, offset))
+        self.write_inputs()
+
+    # rewrite all our input slots
+    def write_inputs(self):
+        if self._input_slices:
+            row = array('d', self.encode_inputs())
+            for values, offset in self._input_slices:
+                values[offset:offset + self.observable_width] = row
+
+    # rewrite a single input slot
+    def write_input(self, index, value):
+        if index < self.observable_width:
+            for values, offset in self._input_slices:
+                values[offset + index] = value
+
+    # the encoding of our current state, built at most once per version however many observers ask for it. plane
+    # picks one of our onehot_planes (as active positions) rather than organize_data().
+    def snapshot(self, plane=None):
+        if self._snapshot_version != self.version:
+            self._snapshots = {}
+            self._snapshot_version = self.version
+        try:
+            return self._snapshots[plane]
+        except KeyError:
+            pass
+
+        if plane is None:
+            data = self.organize_data()
+            snapshot = Snapshot(data) if data is not None else None
+        else:
+            snapshot = tuple(self.organize_active(plane))
+        self.snapshots_built += 1
+        self._snapshots[plane] = snapshot
+        return snapshot
+
     def register_observer(self, obj):
-        if obj not in self._observers:
-            self._observers.append(obj)
+        self._observers.add(obj)
+
+    def unregister_observer(self, obj):
+        self._observers.discard(obj)
+
+    # forget our observers and stop writing into any InputBuffer
+    def detach(self):
+        self._observers.clear()
+        self._input_slices = []
 
     # trigger a notification of observers without changing state
     @notify_observers_after
@@ -51,28 +153,129 @@ class Observable(object):
         pass
 
 
+# with observable.batch(): ... -- defers the observable's version bumps until the (outermost) block exits, then
+# emits one if anything changed. batches nest, and several observables can share one with statement.
+class ObservableBatch(object):
+    def __init__(self, observable):
+        self.observable = observable
+
+    def __enter__(self):
+        self.observable._batch_depth += 1
+        return self.observable
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        observable = self.observable
+        observable._batch_depth -= 1
+        if not observable._batch_depth and observable._pending_change:
+            observable._pending_change = False
+            observable._version += 1
+        return False
+
+
+# A match's network inputs, as one contiguous array of doubles. Each network reads a window of it, and each
+# Observable in that window writes its encoding straight into its own slice as its state changes (a single slot,
+# where the change allows). An Observable seen by several networks, like the table, owns one slice per window.
+#
+# growing values can move it in memory, which would leave any view of it reading freed memory. so the buffer freezes
+# once a network attaches to it (see BoundNeuralNet.attach_inputs()), and every window has to be laid out before then.
+class InputBuffer(object):
+    def __init__(self):
+        self.values = array('d')
+        self.frozen = False
+
+    # lay the observables' slices out end to end, returning the (offset, width) of the window they make up
+    def add_window(self, observables):
+        assert not self.frozen, "can't add a window once a network has attached to the input buffer"
+        offset = len(self.values)
+        for observable in observables:
+            start = len(self.values)
+            self.values.extend([0.0] * observable.observable_width)
+            observable.attach_input_slice(self.values, start)
+        return offset, len(self.values) - offset
+
+    def freeze(self):
+        self.frozen = True
+
+    # a numpy view of count values from offset, which freezes the buffer
+    def view(self, offset, count):
+        self.freeze()
+        return numpy.frombuffer(self.values, dtype=float, count=count, offset=offset * self.values.itemsize)
+
+
 class Observer(object):
+    # dense observers expose values by index. see SparseObserver.
+    sparse = False
+
     def __init__(self, obj):
         self._observed = obj
         self.register(obj)
         self.buffer = None
         self.id = uuid.uuid4()
 
+        # the version of the observable our buffer holds
+        self.version = None
+
         # fill the buffer
-        self._observed.noop_notify()
+        self.refresh()
 
         self.width = obj.observable_width
 
     def register(self, obj):
         obj.register_observer(self)
 
-    # store a copy of the integer dict passed our way
+    # re-encode the observable into our buffer
+    def notify(self, observable):
+        self.observe(observable.snapshot())
+
+    # bring our buffer up to date, if the observable has changed since we last encoded it
+    def refresh(self):
+        version = self._observed.version
+        if self.version != version:
+            self.notify(self._observed)
+            self.version = version
+
+    # store the integer dict passed our way. snapshots are immutable, so we keep a reference rather than a copy.
     def observe(self, int_dict):
         if not int_dict:
             self.buffer = None
+        elif isinstance(int_dict, Snapshot):
+            self.buffer = int_dict
         else:
-            self.buffer = dict(int_dict)
+            self.buffer = Snapshot(int_dict)
 
     # return the ith member of the buffer. This is useful for assigning 10 neurons to the same Observer, each with id
     def get_value_by_index(self, index):
-        return self.buffer[index]
\ No newline at end of file
+        if self.version != self._observed.version:
+            self.refresh()
+        return self.buffer[index]
+
+
+# observe one one-hot plane of an Observable, buffering only the list of active positions
+class SparseObserver(Observer):
+    sparse = True
+
+    def __init__(self, obj, plane):
+        assert plane in obj.onehot_planes, "unknown plane: " + str(plane)
+        self.plane = plane
+        super(SparseObserver, self).__init__(obj)
+
+        self.width = obj.onehot_planes[plane]
+
+    def notify(self, observable):
+        self.observe(observable.snapshot(self.plane))
+
+    # store the active positions passed our way, as a tuple (which snapshots already are)
+    def observe(self, active_indexes):
+        self.buffer = tuple(active_indexes)
+
+    def get_active_indexes(self):
+        if self.version != self._observed.version:
+            self.refresh()
+        return self.buffer
+
+    # dense view of the plane, for consumers that read inputs one index at a time
+    def get_value_by_index(self, index):
+        if index in self.get_active_indexes():
+            return 1
+        else:
+            return 0
@@ -8,8 +8,11 @@
 # test bed for gin rummy neural network
 
 from genetic_algorithm import *
+from pruning import pruning_report
+from distill import distillation_report
+from autotune import default_autotuner, configure_autotuner
+from tracing import LogTracer
 from utility import *
-import utility
 import signal
 import sys
 
@@ -23,20 +26,38 @@ class RunCheckIntelligence(object):
         self.population_size = 30
         self.max_generations = int(20 * 60 * 24)  # one day of runtime: runs about 20 per minute
         self.retain_best = 3
+        self.encoding = 'ranking'  # or 'onehot'
+        self.strategy = 'signal'  # or 'action-value' (ranking encoding only)
 
         local_storage = 'playground_check_intelligence.persist.txt'
+        self.champion_storage = 'playground_champion.net'
 
-        self.p = Population(self.population_size, self.retain_best, local_storage)
+        self.p = Population(self.population_size, self.retain_best, local_storage, encoding=self.encoding,
+                            strategy=self.strategy)
         self.p.persist(action='load')
 
+        # pick inference backends for this machine up front (cached on disk after the first run)
+        configure_autotuner('autotune.cache.json')
+        self.tune_backends()
+
         self.register_sigint()
 
+    def tune_backends(self):
+        compiled = self.p.get_compiled_net(self.p.member_genes.keys()[0])
+        # 'batch' is the lockstep engine's: a network decides in about half its games of a round at once
+        for call_site, batch_size in (('pulse', 1), ('afterstates', 12), ('batch', self.population_size // 2)):
+            default_autotuner().choose(call_site, batch_size, compiled)
+        log_warn(default_autotuner().describe())
+
     def run(self):
         for _ in range(self.max_generations):
             self.p.generate_next_generation()
 
         self.p.persist(action='store')
 
+        # the champion on its own, in a form other processes can map and play without unpickling the population
+        self.p.export_network(self.p.get_top_members(1)[0], self.champion_storage)
+
         if exhibit_winners:
             self.do_exhibit_winners()
 
@@ -44,16 +65,31 @@ class RunCheckIntelligence(object):
         # get top two and watch a couple games
         best_genes = self.p.get_top_members(2)
 
-        p2 = Population(2)
+        # report how far the champion's network prunes, and what that buys us
+        report = pruning_report(self.p, best_genes[0])
+        log_warn(report)
+        print(report)
+
+        # against the fixed greedy heuristic
+        results = self.p.heuristic_results(best_genes[0])
+        report = "champion vs heuristic: {0:.0%} won, {1:.0%} drawn, {2:.0%} lost".format(
+            results['win'], results['draw'], results['loss'])
+        log_warn(report)
+        print(report)
+
+        # and how much of its play survives distillation into lookup tables
+        report = distillation_report(self.p, best_genes[0])
+        log_warn(report)
+        print(report)
+
+        p2 = Population(2, encoding=self.p.encoding, strategy=self.p.strategy)
         p2.member_genes = {}
         p2.add_member(best_genes[0], 0, 0)
         p2.add_member(best_genes[1], 0, 0)
 
-        utility.enable_logging_debug = True
-        utility.enable_logging_info = True
-
-        p2.fitness_test()
-        p2.fitness_test()
+        # only these matches are traced
+        p2.fitness_test(tracer=LogTracer())
+        p2.fitness_test(tracer=LogTracer())
 
     def register_sigint(self):
         the_class = self
@@ -71,6 +107,9 @@ class RunCheckIntelligence(object):
         signal.signal(signal.SIGINT, signal_handler)
 
 
+# log through a background thread to debug.log.txt
+setup_logging()
+
 for _ in range(1):
     a = RunCheckIntelligence()
     a.run()
@@ -0,0 +1,103 @@
+#!/usr/bin/python
+#
+# pruning.py
+#
+# 2026/10/19
+# rg
+#
+# prune near-zero weights out of an evolved network. we record the inputs a genome's network sees in real play,
+# then pick the largest threshold whose sparsified network still makes the same decisions on that corpus, and run
+# the result through the CSR kernels in SparseCompiledNeuralNet.
+
+from genetic_algorithm import *
+
+# thresholds to try, smallest first. genes start out as gauss(0, 1), so 0.5 zeroes about 38% of the weights
+# and 1.0 about 68%.
+DEFAULT_THRESHOLDS = [0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.75, 1.0, 1.25, 1.5]
+
+
+# play geneset against other members of the population, recording the inputs its network sees on every pulse
+def record_state_corpus(population, geneset, games=10):
+    opponents = [member for member in population.member_genes if member is not geneset]
+    if not opponents:
+        opponents = [GeneSet(population.gene_size)]
+
+    corpus = []
+    for i in range(games):
+        match = population.create_match(geneset, opponents[i % len(opponents)])
+        match.p1.strategy.nn.recorder = corpus
+        match.run()
+        match.close()
+    return corpus
+
+
+# fraction of the corpus on which two compiled networks reach the same decisions, in either phase
+def action_agreement(reference, candidate, corpus):
+    if not corpus:
+        return 1.0
+
+    agreed = 0
+    for inputs in corpus:
+        expected = NeuralGinStrategy.decode_outputs(dict(zip(reference.output_keys, reference.forward(inputs))))
+        actual = NeuralGinStrategy.decode_outputs(dict(zip(candidate.output_keys, candidate.forward(inputs))))
+        if expected == actual:
+            agreed += 1
+    return float(agreed) / len(corpus)
+
+
+# return (threshold, pruned weightset, agreement) for the largest threshold whose pruned network agrees with the
+# dense one on at least min_agreement of the corpus. threshold is 0 (and the weightset unpruned) if none do.
+def find_pruning_threshold(population, weightset, corpus, thresholds=None, min_agreement=0.99):
+    if thresholds is None:
+        thresholds = DEFAULT_THRESHOLDS
+
+    dense = population.compile_weightset(weightset)
+    best = (0, weightset, 1.0)
+    for threshold in sorted(thresholds):
+        pruned = weightset.sparsify(threshold)
+        agreement = action_agreement(dense, population.compile_weightset(pruned, SparseCompiledNeuralNet), corpus)
+        if agreement >= min_agreement:
+            best = (threshold, pruned, agreement)
+    return best
+
+
+# prune a genome's network and compare the pruned CSR network against the dense one
+def prune_geneset(population, geneset, games=10, thresholds=None, min_agreement=0.99):
+    corpus = record_state_corpus(population, geneset, games)
+    weightset = population.create_weightset(geneset)
+    threshold, pruned, agreement = find_pruning_threshold(population, weightset, corpus, thresholds, min_agreement)
+
+    dense = population.compile_weightset(weightset)
+    sparse = population.compile_weightset(pruned, SparseCompiledNeuralNet)
+
+    # time a pulse over a slice of the corpus
+    sample = corpus[:50]
+
+    def run(compiled):
+        return lambda: [compiled.forward(inputs) for inputs in sample]
+
+    dense_time = time_call(run(dense), number=5) / max(1, len(sample))
+    sparse_time = time_call(run(sparse), number=5) / max(1, len(sample))
+
+    return {'threshold': threshold,
+            'sparsity': sparse.sparsity(),
+            'agreement': agreement,
+            'corpus_size': len(corpus),
+            'dense_us': dense_time,
+            'sparse_us': sparse_time,
+            'speedup': dense_time / sparse_time if sparse_time else 0.0,
+            'compiled': sparse}
+
+
+# a table summarising prune_geneset(), for the exhibit output
+def pruning_report(population, geneset, games=10):
+    result = prune_geneset(population, geneset, games)
+
+    table = Texttable(max_width=115)
+    table.set_deco(Texttable.HEADER | Texttable.BORDER)
+    table.add_rows([["threshold", "sparsity", "agreement", "states", "dense us", "sparse us", "speedup"],
+                    [result['threshold'], result['sparsity'], result['agreement'], result['corpus_size'],
+                     result['dense_us'], result['sparse_us'], result['speedup']]])
+
+    return "\n" + "                     PRUNED CHAMPION NETWORK, GENERATION #{0}".format(
+        population.current_generation) + "\n" + table.draw()
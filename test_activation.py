@@ -0,0 +1,53 @@
+import unittest
+from activation import *
+from neuralnet import Perceptron
+
+
+class TestActivation(unittest.TestCase):
+    def setUp(self):
+        # a dense grid well past both ends of the lookup table
+        self.grid = [x / 100.0 for x in range(-3000, 3001)]
+
+    def test_sigmoid(self):
+        # same saturation behaviour as the original Perceptron.sigmoid
+        self.assertEqual(0, sigmoid(-101))
+        self.assertEqual(1, sigmoid(101))
+        self.assertEqual(0.5, sigmoid(0))
+        self.assertAlmostEqual(0.731058578, sigmoid(1), 8)
+        self.assertEqual(Perceptron.sigmoid(3.3), sigmoid(3.3))
+
+    def test_sigmoid_lut_max_error(self):
+        worst = max(abs(sigmoid_lut(x) - sigmoid(x)) for x in self.grid)
+        self.assertLess(worst, LUT_MAX_ERROR)
+
+        # clamped at both ends
+        self.assertEqual(sigmoid_lut(LUT_LIMIT), sigmoid_lut(1000))
+        self.assertEqual(sigmoid_lut(-LUT_LIMIT), sigmoid_lut(-1000))
+
+    def test_sigmoid_vector(self):
+        expected = [sigmoid(x) for x in self.grid]
+        for exact, vectorized in zip(expected, sigmoid_vector(self.grid)):
+            self.assertAlmostEqual(exact, vectorized, 12)
+
+    def test_sigmoid_lut_vector(self):
+        expected = [sigmoid_lut(x) for x in self.grid]
+        for scalar, vectorized in zip(expected, sigmoid_lut_vector(self.grid)):
+            self.assertAlmostEqual(scalar, vectorized, 12)
+
+    def test_get_activation(self):
+        self.assertEqual(sigmoid, get_activation())
+        self.assertEqual(sigmoid_lut, get_activation('lut'))
+        self.assertEqual(sigmoid_lut_vector, get_activation('lut', vectorized=True))
+        with self.assertRaises(AssertionError):
+            get_activation('tanh')
+
+    def test_perceptron_activation(self):
+        # a perceptron squashes its weighted sum with whichever activation it was handed
+        inputs = [Perceptron(), Perceptron()]
+        for name in ACTIVATIONS:
+            p = Perceptron()
+            p.activation = get_activation(name)
+            for i, neuron in enumerate(inputs):
+                neuron.memo = 0.25 * (i + 1)
+                p.add_input(neuron, 2.0)
+            self.assertAlmostEqual(sigmoid(1.5), p.generate_output(), 5)
@@ -0,0 +1,76 @@
+import unittest
+import random
+import os
+import tempfile
+from autotune import *
+from genetic_algorithm import GeneSet
+
+
+class TestAutotune(unittest.TestCase):
+    def setUp(self):
+        num_inputs, num_hidden, num_outputs = 44, 31, 3
+        geneset = GeneSet(num_inputs + num_hidden * num_inputs + num_hidden * num_hidden + num_outputs * num_hidden)
+        weightset = WeightSet(geneset, num_inputs, num_hidden, num_outputs)
+        self.compiled = CompiledNeuralNet(weightset, GinNeuralNet.output_keys, GinNeuralNet.input_widths)
+
+        handle, self.cache_path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        os.remove(self.cache_path)
+
+    def tearDown(self):
+        if os.path.exists(self.cache_path):
+            os.remove(self.cache_path)
+
+    def test_batch_bucket(self):
+        self.assertEqual(1, batch_bucket(1))
+        self.assertEqual(2, batch_bucket(2))
+        self.assertEqual(64, batch_bucket(33))
+        self.assertEqual(64, batch_bucket(64))
+
+    def test_choose(self):
+        tuner = BackendAutotuner(self.cache_path, number=5, repeat=1)
+        backend = tuner.choose('pulse', 1, self.compiled)
+        self.assertIn(backend, available_backends())
+
+        # every available backend was timed, and the fastest won
+        timings = tuner.choices[tuner.key('pulse', 1, self.compiled)]['timings']
+        self.assertEqual(sorted(available_backends()), sorted(timings.keys()))
+        self.assertEqual(backend, min(timings, key=timings.get))
+
+    def test_own_random_numbers(self):
+        random.seed(1)
+        expected = random.random()
+        random.seed(1)
+        BackendAutotuner(None, number=5, repeat=1).choose('batch', 20, self.compiled)
+        self.assertEqual(expected, random.random())
+
+    def test_cached_on_disk(self):
+        tuner = BackendAutotuner(self.cache_path, number=5, repeat=1)
+        backend = tuner.choose('batch', 20, self.compiled)
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        # a fresh tuner picks up the choice without timing anything again
+        reloaded = BackendAutotuner(self.cache_path, number=5, repeat=1)
+        reloaded.tune = None
+        self.assertEqual(backend, reloaded.choose('batch', 32, self.compiled))
+        self.assertIn('batch', reloaded.describe())
+
+    def test_other_machines_ignored(self):
+        tuner = BackendAutotuner(self.cache_path, number=5, repeat=1)
+        tuner.fingerprint = 'elsewhere'
+        tuner.choose('pulse', 1, self.compiled)
+
+        self.assertEqual({}, BackendAutotuner(self.cache_path).choices)
+
+    def test_default_autotuner(self):
+        # in memory until configured
+        self.assertIsNone(default_autotuner().cache_path)
+        self.assertIs(default_autotuner(), default_autotuner())
+
+        configured = configure_autotuner(self.cache_path, number=5, repeat=1)
+        try:
+            self.assertIs(configured, default_autotuner())
+            configured.choose('pulse', 1, self.compiled)
+            self.assertTrue(os.path.exists(self.cache_path))
+        finally:
+            configure_autotuner()
@@ -0,0 +1,90 @@
+import random
+import unittest
+from belief import *
+
+
+class TestOpponentBelief(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.t = GinTable()
+        self.p1 = GinPlayer()
+        self.p2 = GinPlayer()
+        self.t.seat_player(self.p1)
+        self.t.seat_player(self.p2)
+        self.belief = OpponentBelief(self.t, self.p1, self.p2)
+        for _ in range(10):
+            self.p1.draw()
+            self.p2.draw()
+        self.p1.draw()
+
+    def test_meld_neighbours(self):
+        neighbours = meld_neighbours()
+        # 5c melds with 5d, 5h, 5s and 3c, 4c, 6c, 7c
+        five = GinCard(5, 'c').index()
+        expected = [GinCard(rank, suit).index() for rank, suit in
+                    [(5, 'd'), (5, 'h'), (5, 's'), (3, 'c'), (4, 'c'), (6, 'c'), (7, 'c')]]
+        self.assertEqual(sorted(expected), numpy.flatnonzero(neighbours[five]).tolist())
+
+        # aces only reach up
+        self.assertEqual(5, neighbours[GinCard(1, 'h').index()].sum())
+
+    def test_probabilities(self):
+        probabilities = self.belief.probabilities()
+        self.assertAlmostEqual(10, probabilities.sum())
+
+        # nothing we hold can be theirs, and every other card is equally likely
+        for card in self.p1.hand.cards:
+            self.assertEqual(0, probabilities[card.index()])
+        self.assertAlmostEqual(10.0 / 41, max(probabilities))
+
+    def test_events(self):
+        card = self.p1.discard_card(self.p1.hand.cards[0])
+        neighbours = meld_neighbours()[card.index()]
+
+        # the opponent passes on our discard: its neighbours get less likely
+        self.p2.draw()
+        probabilities = self.belief.probabilities()
+        self.assertAlmostEqual(11, probabilities.sum())
+        self.assertEqual(0, probabilities[card.index()])
+        open_cards = probabilities > 0
+        self.assertLess(probabilities[neighbours & open_cards].max(), probabilities[~neighbours & open_cards].min())
+
+        # their discard is out of their hand, and a card they pick up is certain
+        discard = self.p2.discard_card(self.p2.hand.cards[0])
+        self.assertEqual(0, self.belief.probabilities()[discard.index()])
+        self.p1.draw()
+        self.p1.discard_card(self.p1.hand.cards[0])
+        picked = self.p2.pickup_discard()
+        probabilities = self.belief.probabilities()
+        self.assertEqual(1, probabilities[picked.index()])
+        self.assertAlmostEqual(11, probabilities.sum())
+
+        # a new deal forgets it all
+        self.t.refresh_deck()
+        self.assertTrue((self.belief.weights == 1).all())
+
+    def test_capped(self):
+        # weights strong enough to push a card past certainty still leave a valid distribution
+        self.belief.weights[:] = 1
+        self.belief.weights[self.p2.hand.cards[0].index()] = 1e6
+        probabilities = self.belief.probabilities()
+        self.assertAlmostEqual(1, probabilities.max())
+        self.assertAlmostEqual(10, probabilities.sum())
+
+    def test_sample_hand(self):
+        state = numpy.random.RandomState(0)
+        self.p1.discard_card(self.p1.hand.cards[0])
+        picked = self.p2.pickup_discard()
+        ours = set(card.index() for card in self.p1.hand.cards)
+
+        for hand in self.belief.sample_hands(20, state):
+            self.assertEqual(11, len(set(hand)))
+            self.assertIn(picked.index(), hand)
+            self.assertFalse(ours & set(hand))
+
+    def test_close(self):
+        self.belief.close()
+        self.p1.discard_card(self.p1.hand.cards[0])
+        self.p2.draw()
+        self.p2.discard_card(self.p2.hand.cards[0])
+        self.assertTrue((self.belief.weights == 1).all())
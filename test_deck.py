@@ -34,6 +34,11 @@ class TestCard(unittest.TestCase):
         self.assertGreaterEqual(card3.__cmp__(card1), 1)
         self.assertGreaterEqual(card3.__cmp__(card2), 1)
 
+    def test_index(self):
+        self.assertEqual(0, Card(1, 'c').index())
+        self.assertEqual(13, Card(1, 'd').index())
+        self.assertEqual(51, Card(13, 's').index())
+
     def test_to_s(self):
         c = Card(9, 'c')
         self.assertEqual('9c', c.to_s())
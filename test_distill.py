@@ -0,0 +1,59 @@
+import unittest
+from distill import *
+
+
+class TestDistill(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.p = Population(3)
+        self.geneset = self.p.member_genes.keys()[0]
+
+    def test_record_decisions(self):
+        decisions = record_decisions(self.p, self.geneset, games=2)
+        self.assertGreater(len(decisions), 0)
+        for phase, (hand, top, height), (action, index) in decisions:
+            if phase == 'start':
+                self.assertEqual(10, len(hand))
+                self.assertIn(action, NeuralGinStrategy.start_actions)
+            else:
+                self.assertEqual(11, len(hand))
+                self.assertIn(action, NeuralGinStrategy.end_actions)
+
+    def test_fit_reproduces_consistent_decisions(self):
+        # a teacher that always throws the card leaving the least deadwood, and knocks only on gin
+        decisions = []
+        for _ in range(50):
+            hand = sorted(random.sample(range(52), 11))
+            best, after = discard_deadwoods(index_mask(hand))
+            action = 'KNOCK-GIN' if best == 0 else 'DISCARD'
+            decisions.append(('end', (hand, None, 20), [action, after.index(best)]))
+
+        # the tables pick up both habits: the same knock calls, and a discard that is just as good
+        policy = DistilledPolicy().fit(decisions)
+        for phase, (hand, top, height), (action, index) in decisions:
+            best, after = discard_deadwoods(index_mask(hand))
+            ours = policy.decide(phase, hand, top, height)
+            self.assertEqual(action, ours[0])
+            self.assertEqual(best, after[ours[1]])
+
+    def test_json_round_trip(self):
+        decisions = record_decisions(self.p, self.geneset, games=2)
+        policy = DistilledPolicy().fit(decisions)
+        restored = DistilledPolicy.from_json(policy.to_json())
+        for phase, (hand, top, height), _ in decisions:
+            self.assertEqual(policy.decide(phase, hand, top, height), restored.decide(phase, hand, top, height))
+
+    def test_distill_geneset(self):
+        result = distill_geneset(self.p, self.geneset, games=4, match_games=2)
+        self.assertGreater(result['decisions'], 0)
+        self.assertGreater(result['policy'].size(), 0)
+        for phase in ('start', 'end', 'all'):
+            self.assertTrue(0 <= result['agreement'][phase] <= 1)
+        self.assertAlmostEqual(1.0, sum(result['results'].values()))
+
+    def test_distilled_strategy_plays(self):
+        policy = DistilledPolicy().fit(record_decisions(self.p, self.geneset, games=2))
+        match = self.p.create_match(self.geneset, self.p.member_genes.keys()[1])
+        match.p1.strategy = DistilledGinStrategy(match.p1, match.p2, match, policy)
+        match.run()
+        self.assertEqual(1, match.p1_wins + match.p1_losses + match.p1_draws)
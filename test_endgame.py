@@ -0,0 +1,141 @@
+import random
+import time
+import unittest
+from endgame import *
+from ginmatch import *
+
+
+# plain expectiminimax, without the memo, for checking the solver's values
+def brute_value(state, seat):
+    if state.gameover:
+        winner, points = state.result()
+        if winner == NOBODY:
+            return 0
+        return points if winner == seat else -points
+    values = []
+    for move in state.legal_moves():
+        if move_kind(move) == DRAW:
+            total = 0.0
+            top = state.deck_height - 1
+            for i in range(state.deck_height):
+                state.deck[i], state.deck[top] = state.deck[top], state.deck[i]
+                state.apply(move)
+                total += brute_value(state, seat)
+                state.undo()
+                state.deck[i], state.deck[top] = state.deck[top], state.deck[i]
+            values.append(total / state.deck_height)
+        else:
+            state.apply(move)
+            values.append(brute_value(state, seat))
+            state.undo()
+    return max(values) if state.to_move == seat else min(values)
+
+
+class TestEndgameSolver(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.rng = random.Random(0)
+
+    def hand(self, card_data):
+        return index_mask(GinCard(rank, suit).index() for rank, suit in card_data)
+
+    # a late position, one round from the turn limit: seat 0 to start a turn with deck_height cards left. each hand
+    # holds two melds, so knocks are in reach.
+    def late_position(self, deck_height):
+        ours = self.hand([(1, 'c'), (2, 'c'), (3, 'c'), (7, 'c'), (7, 'd'), (7, 'h')])
+        theirs = self.hand([(9, 's'), (10, 's'), (11, 's'), (4, 'd'), (4, 'h'), (4, 's')])
+        cards = mask_indexes(FULL_MASK & ~(ours | theirs))
+        self.rng.shuffle(cards)
+        ours |= index_mask(cards[:4])
+        theirs |= index_mask(cards[4:8])
+        return GinState([ours, theirs], cards[8:8 + deck_height], cards[8 + deck_height:], 0, START, 58)
+
+    def test_knocks(self):
+        ours = self.hand([(1, 'c'), (2, 'c'), (3, 'c'), (5, 'h'), (5, 's'), (5, 'd'), (9, 'h'), (10, 'h'),
+                          (11, 'h'), (2, 'd'), (13, 's')])
+        theirs = self.hand([(7, 'd'), (8, 's'), (12, 'c'), (13, 'c'), (12, 'd'), (4, 's'), (6, 'c'), (1, 's'),
+                            (3, 'h'), (7, 'c')])
+        unseen = mask_indexes(FULL_MASK & ~(ours | theirs))
+        state = GinState([ours, theirs], unseen[:4], unseen[4:], 0, END, 58)
+
+        move, value = EndgameSolver(0).solve(state, [theirs])
+        self.assertEqual(make_move(KNOCK, GinCard(13, 's').index()), move)
+        self.assertEqual(deadwood(theirs) - 2, value)
+
+    def test_position_key(self):
+        # the same hands, deck and top discard, with the cards below the top stacked in either order
+        state = self.late_position(3)
+        pile = state.pile[:state.pile_height].tolist()
+        swapped = pile[:-3] + [pile[-2], pile[-3], pile[-1]]
+        other = GinState(state.hands, state.deck[:state.deck_height], swapped, 0, START, 58)
+        self.assertNotEqual(EndgameSolver.position_key(state), EndgameSolver.position_key(other))
+
+        # a deck in another order is the same position
+        deck = state.deck[:state.deck_height].tolist()
+        same = GinState(state.hands, deck[::-1], pile, 0, START, 58)
+        self.assertEqual(EndgameSolver.position_key(state), EndgameSolver.position_key(same))
+
+    def test_matches_brute_force(self):
+        for trial in range(5):
+            state = self.late_position(4)
+            theirs = state.hands[1]
+            move, value = EndgameSolver(0).solve(state, [theirs])
+            self.assertAlmostEqual(brute_value(state, 0), value)
+            self.assertEqual(0, state.depth)
+
+    def test_belief_set(self):
+        # the value of a move is its mean over the opponent's possible hands
+        state = self.late_position(3)
+        known = state.hands[0] | index_mask(state.pile[:state.pile_height])
+        unseen = mask_indexes(FULL_MASK & ~known)
+        hands = [index_mask(self.rng.sample(unseen, 10)) for _ in range(3)]
+
+        solver = EndgameSolver(0)
+        move, value = solver.solve(state, hands)
+        expected = []
+        for hand in hands:
+            determinized = state.determinize(0, hand, mask_indexes(FULL_MASK & ~(known | hand)))
+            expected.append(dict(solver.move_values(determinized))[move])
+        self.assertAlmostEqual(sum(expected) / len(expected), value)
+
+    def test_budget(self):
+        state = self.late_position(6)
+        self.assertIsNone(EndgameSolver(0, node_budget=3).solve(state, [state.hands[1]]))
+
+        # far from the turn limit, the time budget stops the search short of solving the game
+        state.turns_taken = 30
+        solver = EndgameSolver(0, budget_ms=50)
+        started = time.time()
+        self.assertIsNotNone(solver.solve(state, [state.hands[1]]))
+        self.assertLess(time.time() - started, 1)
+        self.assertFalse(solver.exact)
+        self.assertGreaterEqual(solver.horizon, 1)
+
+
+class TestEndgameGinStrategy(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+
+    def test_plays_a_match(self):
+        gm = GinMatch(GinPlayer(), GinPlayer())
+        gm.p1.strategy = EndgameGinStrategy(gm.p1, gm.p2, gm, HeuristicGinStrategy(gm.p1, gm.p2, gm), threshold=5,
+                                            samples=2, seed=0)
+        gm.p2.strategy = HeuristicGinStrategy(gm.p2, gm.p1, gm)
+        gm.deal_cards()
+        self.assertIsNone(gm.p1.strategy.solved)
+
+        # play into the endgame
+        gm.take_turns()
+        gm.update_score()
+        self.assertEqual(1, gm.p1_wins + gm.p1_losses + gm.p1_draws)
+
+    def test_solves_late(self):
+        gm = GinMatch(GinPlayer(), GinPlayer())
+        strategy = EndgameGinStrategy(gm.p1, gm.p2, gm, HeuristicGinStrategy(gm.p1, gm.p2, gm), threshold=5,
+                                      samples=2, seed=0)
+        gm.deal_cards()
+        gm.table.deck_height = 5
+        action = strategy.determine_best_action('end')
+        self.assertIsNotNone(strategy.solved)
+        self.assertIn(action[0], ('DISCARD', 'KNOCK', 'KNOCK-GIN'))
+        self.assertLess(action[1], 11)
@@ -99,6 +99,16 @@ class TestGeneSet(unittest.TestCase):
         zeroes_found = gs.genes.count(0)
         self.assertNotEqual(zeroes_found, len(gene_list))
 
+    def test_content_hash(self):
+        # equal genes hash equally, whichever GeneSet holds them
+        gs = GeneSet(50)
+        twin = GeneSet(list(gs.genes))
+        self.assertEqual(gs.content_hash(), twin.content_hash())
+
+        # and any change to the genes changes the hash
+        twin.genes[7] += 0.5
+        self.assertNotEqual(gs.content_hash(), twin.content_hash())
+
     def test_mutate(self):
         self.mutate_with_size_and_probability(100000, 0.01)
 
@@ -239,6 +249,60 @@ class TestPopulation(unittest.TestCase):
         self.assertEqual(1, len(self.p.member_genes))
         self.assertEqual(2, self.p.member_genes.items()[0][1]['generation'])
 
+    def test_get_compiled_net(self):
+        p = Population(2)
+        gs1, gs2 = p.member_genes.keys()
+
+        # one compiled network per genome, reused on every later request
+        compiled = p.get_compiled_net(gs1)
+        self.assertIsInstance(compiled, CompiledNeuralNet)
+        self.assertIs(compiled, p.get_compiled_net(gs1))
+        self.assertIs(compiled, p.get_compiled_net(GeneSet(list(gs1.genes))))
+        self.assertIsNot(compiled, p.get_compiled_net(gs2))
+        self.assertEqual(2, len(p.net_cache))
+
+    def test_fitness_test_reuses_compiled_nets(self):
+        p = Population(4)
+        p.fitness_test()
+
+        # 6 pairings, 12 seats: each genome is compiled once and served from the cache afterwards
+        self.assertEqual(4, p.net_cache.misses)
+        self.assertEqual(8, p.net_cache.hits)
+
+        # survivors keep their compiled form into the next generation
+        p.fitness_test()
+        self.assertEqual(4, p.net_cache.misses)
+
+        # the cache is not persisted
+        self.assertNotIn('net_cache', p.__getstate__())
+
+    def test_decision_cache_stats(self):
+        p = Population(4)
+        p.fitness_test()
+
+        # every decision was either computed or served from a network's cache
+        compiled = p.net_cache.values()
+        hits = sum(c.decision_cache.hits for c in compiled)
+        misses = sum(c.decision_cache.misses for c in compiled)
+        self.assertGreater(misses, 0)
+        self.assertIn("{0} cached, {1} computed".format(hits, misses), p.decision_cache_stats(reset=True))
+        self.assertIn("0 cached, 0 computed", p.decision_cache_stats())
+
+    def test_heuristic_results(self):
+        p = Population(2)
+        results = p.heuristic_results(p.member_genes.keys()[0], games=4)
+        self.assertEqual(['draw', 'loss', 'win'], sorted(results))
+        self.assertAlmostEqual(1.0, sum(results.values()))
+
+    def test_fitness_test_onehot(self):
+        p = Population(3, encoding='onehot')
+        self.assertEqual(188, p.num_inputs)
+        p.fitness_test()
+
+        # every pairing played its one game
+        games = sum(v['game_wins'] + v['game_losses'] + v['game_draws'] for v in p.member_genes.values())
+        self.assertEqual(6, games)
+
     def test_fitness_test(self):
         member_count = 4
         self.p.member_genes = {}
@@ -0,0 +1,57 @@
+import unittest
+import random
+from ginbits import *
+from ginhand import *
+
+
+class TestGinBits(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.all_cards = [GinCard(rank, suit) for suit in 'cdhs' for rank in range(1, 14)]
+
+    @staticmethod
+    def hand_of(cards):
+        hand = GinHand()
+        for card in cards:
+            hand.add_card(card)
+        return hand
+
+    def test_masks(self):
+        cards = [GinCard(1, 'c'), GinCard(13, 's'), GinCard(5, 'd')]
+        mask = card_mask(cards)
+        self.assertEqual(sorted(c.index() for c in cards), mask_indexes(mask))
+        self.assertEqual(mask, index_mask(mask_indexes(mask)))
+        self.assertEqual(3, popcount(mask))
+        self.assertEqual(1 + 10 + 5, points(mask))
+        self.assertEqual(1 + 13 + 5, rank_sum(mask))
+
+    def test_meld_cards(self):
+        run = [GinCard(4, 'h'), GinCard(5, 'h'), GinCard(6, 'h')]
+        trio = [GinCard(9, 'c'), GinCard(9, 'd'), GinCard(9, 's')]
+        loose = [GinCard(12, 'h'), GinCard(2, 'c')]
+        self.assertEqual(card_mask(run + trio), meld_cards(card_mask(run + trio + loose)))
+
+        # runs don't wrap from one suit into the next
+        self.assertEqual(0, meld_cards(card_mask([GinCard(12, 'c'), GinCard(13, 'c'), GinCard(1, 'd')])))
+
+    def test_deadwood_matches_ginhand(self):
+        for trial in range(300):
+            # draw half the hands from low ranks only, so they are rich in melds
+            pool = self.all_cards if trial % 2 else [c for c in self.all_cards if c.rank <= 6]
+            cards = random.sample(pool, random.choice([10, 11]))
+            self.assertEqual(self.hand_of(cards).deadwood_count(), deadwood(card_mask(cards)))
+
+    def test_outs(self):
+        hand = card_mask([GinCard(4, 'h'), GinCard(5, 'h'), GinCard(9, 'c'), GinCard(9, 'd')])
+        expected = card_mask([GinCard(3, 'h'), GinCard(6, 'h'), GinCard(9, 'h'), GinCard(9, 's')])
+        self.assertEqual(expected, outs(hand))
+
+        # only unseen cards count
+        self.assertEqual(card_mask([GinCard(3, 'h')]), outs(hand, card_mask([GinCard(3, 'h'), GinCard(1, 'c')])))
+
+    def test_discard_deadwoods(self):
+        cards = [GinCard(4, 'h'), GinCard(5, 'h'), GinCard(6, 'h'), GinCard(13, 's')]
+        best, after = discard_deadwoods(card_mask(cards))
+        self.assertEqual(0, best)
+        self.assertEqual(4, len(after))
+        self.assertEqual(0, after[3])
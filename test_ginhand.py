@@ -526,4 +526,43 @@ class TestGinHand(Helper):
         gh_layer.process_layoff(gh_winner)
 
         # we lay off our 2d, 4c, 8c, and 9h. this gives us an expected deadwood count of 14
-        self.assertEqual(gh_layer.deadwood_count(), 14)
\ No newline at end of file
+        self.assertEqual(gh_layer.deadwood_count(), 14)
+
+    def test_what_if(self):
+        random.seed(0)
+        deck = [GinCard(rank, suit) for suit in ('c', 'd', 'h', 's') for rank in range(1, 14)]
+        for _ in range(50):
+            cards = random.sample(deck, 12)
+            hand = GinHand()
+            for card in cards[:11]:
+                hand.add_card(card)
+            self.assertEqual(hand.deadwood_count(), hand.quick_deadwood())
+
+            # each what-if agrees with building the hand and scoring it the slow way
+            after = hand.deadwood_after_discards()
+            for index, card in enumerate(hand.cards):
+                other = GinHand()
+                for kept in hand.cards:
+                    if kept is not card:
+                        other.add_card(kept)
+                self.assertEqual(other.deadwood_count(), after[index])
+
+            ten = GinHand()
+            for card in hand.cards[:10]:
+                ten.add_card(card)
+            expected = min(self.deadwood_without(ten.cards + [cards[11]], card) for card in ten.cards)
+            self.assertEqual(expected, ten.deadwood_after_pickup(cards[11]))
+
+        # 4c 5c 6c 9h: dropping the 9h keeps a run, and leaves 3c and 7c as outs
+        hand = self.generate_ginhand_from_card_data([(4, 'c'), (5, 'c'), (6, 'c'), (9, 'h')])
+        self.assertEqual([20, 19, 18, 0], hand.deadwood_after_discards())
+        self.assertEqual(2, hand.outs_after_discards()[3])
+
+    @staticmethod
+    def deadwood_without(cards, excluded):
+        hand = GinHand()
+        for card in cards:
+            if card is not excluded:
+                hand.add_card(card)
+        return hand.deadwood_count()
+
@@ -0,0 +1,104 @@
+import random
+import unittest
+from ginkernel import *
+from ginmatch import *
+from ginstrategy import *
+from genetic_algorithm import Population
+
+
+# a decision that depends only on what's observed: the same observation always gets the same answer. it plays for low
+# deadwood, but now and then discards at random or knocks (or knocks gin) whatever the hand, to exercise improper knocks.
+def scripted_decision(phase, observation):
+    rng = random.Random(hash((phase, tuple(observation))))
+    hand = index_mask(int(ranking) - 1 for ranking in observation[:HAND_WIDTH] if ranking)
+    if phase == 'start':
+        pile = [int(ranking) - 1 for ranking in observation[HAND_WIDTH + 1:] if ranking]
+        if pile and min(deadwood((hand | 1 << pile[-1]) & ~(1 << card)) for card in mask_indexes(hand)) < deadwood(hand):
+            return ['PICKUP-FROM-DISCARD', 0]
+        return ['DRAW', 0]
+
+    cards = mask_indexes(hand)
+    remaining = [deadwood(hand & ~(1 << card)) for card in cards]
+    slot = remaining.index(min(remaining)) if rng.random() < 0.8 else rng.randint(0, len(cards) - 1)
+    roll = rng.random()
+    if roll < 0.05:
+        return [rng.choice(['KNOCK', 'KNOCK-GIN']), slot]
+    if remaining[slot] == 0:
+        return ['KNOCK-GIN', slot]
+    if remaining[slot] <= 10:
+        return ['KNOCK', slot]
+    return ['DISCARD', slot]
+
+
+# scripted_decision() for a GinPlayer, reading its window of the match's InputBuffer
+class ScriptedGinStrategy(GinStrategy):
+    def __init__(self, us, opponent, ginmatch):
+        super(ScriptedGinStrategy, self).__init__(us, opponent, ginmatch)
+        self.offset = ginmatch.inputs.add_window([us, us.table])[0]
+
+    def determine_best_action(self, phase=None):
+        values = self.ginmatch.inputs.values
+        return scripted_decision(phase, values[self.offset:self.offset + OBSERVATION_WIDTH])
+
+
+class TestGinKernel(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+
+    def test_write_hand(self):
+        observation = new_observation()
+        observation[:] = array('d', [9.0] * OBSERVATION_WIDTH)
+        write_hand(observation, ginbits.index_mask([51, 0, 13]))
+        self.assertEqual([1, 14, 52] + [0] * 8, observation[:HAND_WIDTH].tolist())
+        self.assertEqual(9, observation[HAND_WIDTH])
+
+    def test_matches_ginmatch(self):
+        outcomes = set()
+        for trial in range(150):
+            random.seed(trial)
+            gm = GinMatch(GinPlayer(), GinPlayer())
+            gm.p1.strategy = ScriptedGinStrategy(gm.p1, gm.p2, gm)
+            gm.p2.strategy = ScriptedGinStrategy(gm.p2, gm.p1, gm)
+            gm.run()
+            after_objects = random.random()
+
+            random.seed(trial)
+            result = play_match([scripted_decision, scripted_decision])
+            after_kernel = random.random()
+
+            self.assertEqual((gm.p1_score, gm.p2_score, gm.p1_wins, gm.p2_wins, gm.p1_draws), result.tally())
+            self.assertEqual(gm.p1_losses, result.tally()[3])
+            self.assertEqual(after_objects, after_kernel)
+            outcomes.add((result.winner, result.points > 25))
+            gm.close()
+
+        # wins both ways, draws, and bonuses all came up
+        self.assertGreaterEqual(len(outcomes), 4)
+
+    def test_play_game(self):
+        order = range(52)
+        random.shuffle(order)
+        result = play_game(order, [scripted_decision, scripted_decision])
+        self.assertIn(result.winner, (None, 0, 1))
+        self.assertEqual(result.tally(), play_game(list(order), [scripted_decision, scripted_decision]).tally())
+
+        # a strategy must answer with an action for its phase
+        self.assertRaises(ValueError, play_game, order, [lambda phase, observation: ['KNOCK', 0]] * 2)
+
+    def test_population_engine(self):
+        population = Population(4)
+        before = dict((geneset, dict(record)) for geneset, record in population.member_genes.items())
+
+        random.seed(3)
+        population.fitness_test()
+        objects = dict((geneset, dict(record)) for geneset, record in population.member_genes.items())
+
+        # the same round again, from the same records and the same cards, on the kernel
+        for geneset, record in before.items():
+            population.member_genes[geneset].update(record)
+        population.engine = 'kernel'
+        random.seed(3)
+        population.fitness_test()
+        self.assertEqual(objects, population.member_genes)
+
+        self.assertRaises(AssertionError, Population, 2, encoding='onehot', engine='kernel')
@@ -0,0 +1,65 @@
+import random
+import unittest
+from ginlockstep import *
+from ginkernel import play_game
+from genetic_algorithm import Population
+from test_ginkernel import scripted_decision
+
+
+# scripted_decision() a row at a time, as a lockstep strategy
+def scripted_rows(phases, observations):
+    decisions = [scripted_decision('start' if phase == START else 'end', observation.tolist())
+                 for phase, observation in zip(phases, observations)]
+    return (numpy.array([MOVE_NAMES.index(name) for name, slot in decisions]),
+            numpy.array([slot for name, slot in decisions]))
+
+
+class TestGinLockstep(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+
+    def test_deal(self):
+        order = range(52)
+        games = LockstepGames([order, order[::-1]])
+        self.assertEqual(ginbits.index_mask(range(31, 52, 2)), games.hands[0, 0])
+        self.assertEqual(ginbits.index_mask(range(32, 52, 2)), games.hands[0, 1])
+        self.assertEqual(ginbits.index_mask(range(0, 21, 2)), games.hands[1, 0])
+        self.assertEqual([31, 31], games.height.tolist())
+
+        observations, slots = games.observe(numpy.arange(2))
+        self.assertEqual(range(32, 53, 2), observations[0, :HAND_WIDTH].tolist())
+        self.assertEqual([31] + [0] * 32, observations[0, HAND_WIDTH:].tolist())
+
+    def test_matches_kernel(self):
+        orders = shuffled_orders(200)
+        seats = [(0, 1)] * len(orders)
+        results = play_games(orders, seats, [scripted_rows, scripted_rows])
+        for order, result in zip(orders, results):
+            expected = play_game(order, [scripted_decision, scripted_decision])
+            self.assertEqual((expected.tally(), expected.turns_taken), (result.tally(), result.turns_taken))
+
+        # wins both ways, draws, and bonuses all came up
+        self.assertGreaterEqual(len(set((result.winner, result.points > 25) for result in results)), 4)
+
+    def test_bad_moves(self):
+        games = LockstepGames(shuffled_orders(3))
+        seats = numpy.zeros((3, 2), dtype=int)
+        games.step([scripted_rows], seats)
+        self.assertRaises(ValueError, games.step, [lambda phases, observations: (phases * 0 + KNOCK, phases * 0)],
+                          seats)
+
+    def test_population_engine(self):
+        population = Population(6)
+        before = dict((geneset, dict(record)) for geneset, record in population.member_genes.items())
+
+        population.engine = 'kernel'
+        random.seed(3)
+        population.fitness_test()
+        kernel = dict((geneset, dict(record)) for geneset, record in population.member_genes.items())
+
+        for geneset, record in before.items():
+            population.member_genes[geneset].update(record)
+        population.engine = 'lockstep'
+        random.seed(3)
+        population.fitness_test()
+        self.assertEqual(kernel, population.member_genes)
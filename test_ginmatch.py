@@ -1,3 +1,5 @@
+import gc
+import weakref
 from ginmatch import *
 from test_helpers import *
 from test_ginstrategy import MockGinStrategy
@@ -90,6 +92,25 @@ class TestGinMatch(Helper):
         self.p1.knock_gin(self.c)
         self.assertEqual(self.gm.player_who_knocked_gin, self.p1)
 
+    def test_close(self):
+        observer = Observer(self.p1)
+        self.gm.deal_cards()
+        self.gm.close()
+
+        self.assertEqual(0, len(self.p1._observers))
+        self.assertEqual([], self.p1._knock_listeners)
+        self.assertFalse(self.p1.table)
+        self.assertFalse(self.p2.strategy)
+
+        # with the cycles broken, dropping the match frees it without waiting for the garbage collector
+        match = weakref.ref(self.gm)
+        gc.disable()
+        try:
+            del self.gm
+            self.assertIsNone(match())
+        finally:
+            gc.enable()
+
     def test_organize_data(self):
         data = self.gm.organize_data()
 
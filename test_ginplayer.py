@@ -172,16 +172,16 @@ class TestGinPlayer(Helper):
         #        self.p.table = GinTable()
 
         # ensure the player picks up the card from the top of the deck.
-        topcard = self.p1.table.deck.cards[-1]
+        topcard = self.p1.table.next_card()
         self.assertEqual(0, self.p1.hand.size())
-        self.assertEqual(52, len(self.p1.table.deck.cards))
+        self.assertEqual(52, self.p1.table.deck_height)
 
         self.p1.consult_strategy(phase='start')
         self.p1.execute_strategy()
 
         self.assertEqual(1, self.p1.hand.size())
         self.assertTrue(self.p1.hand.contains_card(topcard))
-        self.assertEqual(51, len(self.p1.table.deck.cards))
+        self.assertEqual(51, self.p1.table.deck_height)
 
     def test_execute_strategy_pickup_discard(self):
         strat = MockGinStrategy({'start': ['PICKUP-FROM-DISCARD']})
@@ -189,21 +189,20 @@ class TestGinPlayer(Helper):
 
         # monkey-patching in a table and a discard pile of depth 3
         #        p.table = GinTable()
-        self.p1.table.discard_pile.append(self.p1.table.deck.cards.pop())
-        self.p1.table.discard_pile.append(self.p1.table.deck.cards.pop())
-        self.p1.table.discard_pile.append(self.p1.table.deck.cards.pop())
+        for _ in range(3):
+            self.p1.table.add_card_to_discard_pile(self.p1.table.deal_a_card())
 
         # ensure the player picks up the card from the top of the discard pile
-        topcard = self.p1.table.discard_pile[-1]
+        topcard = self.p1.table.top_discard()
         self.assertEqual(0, self.p1.hand.size())
-        self.assertEqual(49, len(self.p1.table.deck.cards))
+        self.assertEqual(49, self.p1.table.deck_height)
 
         self.p1.consult_strategy(phase='start')
         self.p1.execute_strategy()
 
         self.assertEqual(1, self.p1.hand.size())
         self.assertTrue(self.p1.hand.contains_card(topcard))
-        self.assertEqual(49, len(self.p1.table.deck.cards))
+        self.assertEqual(49, self.p1.table.deck_height)
 
     def test_execute_strategy_knock(self):
         self.p1.register_knock_listener(self.l)
@@ -261,7 +260,7 @@ class TestGinPlayer(Helper):
 
     def test_pickup_discard(self):
         # monkey-patch a card into the discard pile
-        self.t.discard_pile.append(GinCard(4, 'c'))
+        self.t.add_card_to_discard_pile(GinCard(4, 'c'))
 
         # a player's hand should change after picking up a discard
         size_before = self.p1.hand.size()
@@ -281,7 +280,7 @@ class TestGinPlayer(Helper):
         # discard it and ensure we have 0 cards in hand, and that it is on top of the discard pile
         self.p1.discard_card(card)
         self.assertEqual(0, self.p1.hand.size())
-        self.assertEqual(card, self.t.discard_pile.pop())
+        self.assertEqual(card, self.t.pickup_from_discard_pile())
 
     def test_accept_improper_knock(self):
         # verify that we return whatever the mock strategy says to return
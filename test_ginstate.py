@@ -0,0 +1,122 @@
+import random
+import unittest
+from ginstate import *
+from ginmatch import *
+from ginstrategy import *
+
+
+# plays random moves off a shadow GinState, sometimes knocking improperly, and checks the state against the match
+class ShadowStrategy(GinStrategy):
+    def __init__(self, us, opponent, ginmatch, test, rng):
+        super(ShadowStrategy, self).__init__(us, opponent, ginmatch)
+        self.test = test
+        self.rng = rng
+
+    def determine_best_action(self, phase=None):
+        state = self.test.state
+        self.test.assertEqual(snapshot(state), snapshot(GinState.from_match(self.ginmatch)))
+
+        moves = state.legal_moves()
+        if phase == 'end' and self.rng.random() < 0.1:
+            card = mask_indexes(state.hands[state.to_move])[0]
+            moves = [make_move(self.rng.choice([KNOCK, KNOCK_GIN]), card)]
+        move = self.rng.choice(moves)
+        action = state.action(move)
+        state.apply(move)
+        return action
+
+
+def snapshot(state):
+    return (tuple(state.hands), state.deck[:state.deck_height].tolist(), state.pile[:state.pile_height].tolist(),
+            state.to_move, state.phase, state.turns_taken, state.knocker, state.gin_knocker, state.exposed,
+            state.gameover, state.draw)
+
+
+class TestGinState(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.rng = random.Random(0)
+
+    def deal(self):
+        cards = range(52)
+        self.rng.shuffle(cards)
+        return GinState([index_mask(cards[:11]), index_mask(cards[11:21])], cards[21:], [])
+
+    def test_moves(self):
+        move = make_move(KNOCK, 51)
+        self.assertEqual(KNOCK, move_kind(move))
+        self.assertEqual(51, move_card(move))
+
+        state = self.deal()
+        self.assertEqual([DRAW << 6], GinState(state.hands, state.deck, [], phase=START).legal_moves())
+        self.assertEqual(11, len([m for m in state.legal_moves() if move_kind(m) == DISCARD]))
+
+    def test_apply_undo(self):
+        for trial in range(30):
+            state = self.deal()
+            history = []
+            while not state.gameover:
+                history.append(snapshot(state))
+                moves = state.legal_moves()
+                if state.phase == END and self.rng.random() < 0.1:
+                    moves = [make_move(KNOCK, mask_indexes(state.hands[state.to_move])[0])]
+                state.apply(self.rng.choice(moves))
+
+            # take it all back, one move at a time
+            while history:
+                state.undo()
+                self.assertEqual(history.pop(), snapshot(state))
+            self.assertEqual(0, state.depth)
+
+    def test_improper_knock(self):
+        # seat 0 knocks on a hand of junk: exposed, and the knock stays pending for seat 1's turn
+        junk = [(13, 'c'), (11, 'd'), (9, 'h'), (7, 's'), (5, 'c'), (3, 'd'), (12, 'h'), (10, 's'), (8, 'c'),
+                (6, 'd'), (4, 'h')]
+        knocker = index_mask(GinCard(rank, suit).index() for rank, suit in junk)
+        melded = [(1, 'c'), (2, 'c'), (3, 'c'), (5, 'h'), (5, 's'), (5, 'd'), (9, 'c'), (10, 'c'), (11, 'c'),
+                  (2, 's')]
+        defender = index_mask(GinCard(rank, suit).index() for rank, suit in melded)
+        deck = mask_indexes(FULL_MASK & ~(knocker | defender))
+        state = GinState([knocker, defender], deck, [])
+
+        state.apply(make_move(KNOCK, GinCard(13, 'c').index()))
+        self.assertFalse(state.gameover)
+        self.assertEqual(1, state.exposed)
+        self.assertEqual(0, state.knocker)
+
+        # seat 1, with 2 deadwood, finishes its turn and is taken to have knocked
+        state.apply(make_move(DRAW))
+        state.apply(make_move(DISCARD, deck[-1]))
+        self.assertTrue(state.gameover)
+        self.assertEqual(1, state.knocker)
+        winner, points = state.result()
+        self.assertEqual(1, winner)
+        self.assertEqual(deadwood(state.hands[0]) - 2, points)
+
+    def test_matches_ginmatch(self):
+        for trial in range(20):
+            gm = GinMatch(GinPlayer(), GinPlayer())
+            gm.p1.strategy = ShadowStrategy(gm.p1, gm.p2, gm, self, self.rng)
+            gm.p2.strategy = ShadowStrategy(gm.p2, gm.p1, gm, self, self.rng)
+
+            gm.deal_cards()
+            self.state = GinState.from_match(gm)
+            gm.take_turns()
+            gm.update_score()
+
+            self.assertEqual(snapshot(self.state), snapshot(GinState.from_match(gm)))
+            winner, points = self.state.result()
+            self.assertEqual([gm.p1_score, gm.p2_score], [points if winner == seat else 0 for seat in (0, 1)])
+            self.assertEqual(gm.p1_draws, int(winner == NOBODY))
+            gm.close()
+
+    def test_determinize(self):
+        state = self.deal()
+        state.apply(make_move(DISCARD, mask_indexes(state.hands[0])[0]))
+        unseen = mask_indexes(FULL_MASK & ~(state.hands[0] | index_mask(state.pile[:state.pile_height])))
+        other = state.determinize(0, index_mask(unseen[:10]), unseen[10:])
+        self.assertEqual(state.hands[0], other.hands[0])
+        self.assertEqual(index_mask(unseen[:10]), other.hands[1])
+        self.assertEqual((1, START, 1), (other.to_move, other.phase, other.turns_taken))
+        self.assertEqual(0, other.depth)
+
@@ -4,6 +4,8 @@ from test_helpers import *
 from ginplayer import *
 from ginmatch import *
 from test_neuralnet import MockNeuralNetwork
+from genetic_algorithm import Population
+import random
 
 
 # noinspection PyMethodMayBeStatic,PyMissingConstructor
@@ -116,4 +118,126 @@ class TestNeuralGinStrategy(Helper):
 
     def test_determine_best_action(self):
         # we test most of this in the above two tests
-        pass
\ No newline at end of file
+        pass
+
+class TestActionValueGinStrategy(Helper):
+    def setUp(self):
+        random.seed(0)
+        self.p = Population(2, strategy='action-value')
+        challenger, defender = self.p.member_genes.keys()
+        self.gm = self.p.create_match(challenger, defender)
+        self.p1 = self.gm.p1
+        self.p2 = self.gm.p2
+        self.strat = self.p1.strategy
+        self.gm.deal_cards()
+        self.strat.locate_inputs()
+
+    def test_locate_inputs(self):
+        self.assertEqual(0, self.strat.hand_offset)
+        self.assertEqual(11, self.strat.table_offset)
+
+    def test_end_afterstates(self):
+        # each afterstate is what we actually see after making that discard
+        afterstates = self.strat.end_afterstates(self.strat.nn.sense())
+        self.assertEqual(11, len(afterstates))
+
+        # (execute_strategy notifies the hand's observers during play)
+        self.p1.discard_card(self.p1.hand.cards[4])
+        self.p1.noop_notify()
+        self.assertEqual(afterstates[4], self.strat.nn.sense())
+
+    def test_start_afterstates(self):
+        self.p1.discard_card(self.p1.hand.cards[0])
+        self.p2.discard_card(self.p2.hand.cards[0])
+        self.p1.noop_notify()
+        pickup, draw = self.strat.start_afterstates(self.strat.nn.sense())
+
+        self.p1.pickup_discard()
+        self.p1.noop_notify()
+        self.assertEqual(pickup, self.strat.nn.sense())
+
+        # drawing takes a card off the deck, which we only learn the identity of afterwards
+        self.p1.discard_card(self.p1.hand.cards[0])
+        self.p1.noop_notify()
+        before = self.strat.nn.sense()
+        pickup, draw = self.strat.start_afterstates(before)
+        self.p1.draw()
+        self.assertEqual(draw[11:], self.strat.nn.sense()[11:])
+
+    def test_determine_best_action(self):
+        inputs = self.strat.nn.sense()
+        scored = self.strat.nn.pulse_batch(self.strat.end_afterstates(inputs))
+        values = [outputs['index'] for outputs in scored]
+
+        action, index = self.strat.determine_best_action(phase='end')
+        self.assertIn(action, NeuralGinStrategy.end_actions)
+        self.assertEqual(values.index(max(values)), index)
+
+        # with nothing to pick up, we draw
+        self.p1.discard_card(self.p1.hand.cards[index])
+        while self.gm.table.discard_height:
+            self.gm.table.pickup_from_discard_pile()
+        self.assertEqual('DRAW', self.strat.determine_best_action(phase='start')[0])
+
+    def test_decision_cache(self):
+        cache = self.strat.nn.decision_cache
+        first = self.strat.determine_best_action(phase='end')
+        self.assertEqual(1, cache.misses)
+
+        # the same position is decided from the cache without pulsing
+        self.strat.nn.pulse_batch = None
+        self.assertEqual(first, self.strat.determine_best_action(phase='end'))
+        self.assertEqual(1, cache.hits)
+
+    def test_plays_a_match(self):
+        self.p.fitness_test()
+        games = sum(v['game_wins'] + v['game_losses'] + v['game_draws'] for v in self.p.member_genes.values())
+        self.assertEqual(2, games)
+
+
+class TestHeuristicGinStrategy(Helper):
+    def setUp(self):
+        self.p1 = GinPlayer()
+        self.p2 = GinPlayer()
+        self.gm = GinMatch(self.p1, self.p2)
+        self.strat = HeuristicGinStrategy(self.p1, self.p2, self.gm)
+
+    def give(self, player, card_data):
+        for rank, suit in card_data:
+            player._add_card(GinCard(rank, suit))
+
+    def test_start(self):
+        self.give(self.p1, [(4, 'c'), (5, 'c'), (6, 'c'), (1, 'h')])
+
+        # nothing to pick up
+        self.assertEqual(['DRAW', 0], self.strat.determine_best_action(phase='start'))
+
+        # the 2d would only replace the ace; the 7c extends the run and goes gin
+        self.gm.table.add_card_to_discard_pile(GinCard(2, 'd'))
+        self.assertEqual(['DRAW', 0], self.strat.determine_best_action(phase='start'))
+        self.gm.table.add_card_to_discard_pile(GinCard(7, 'c'))
+        self.assertEqual(['PICKUP-FROM-DISCARD', 0], self.strat.determine_best_action(phase='start'))
+
+    def test_end(self):
+        # discard the king (in slot 4), leaving 10 deadwood: low enough to knock
+        self.give(self.p1, [(1, 'c'), (2, 'c'), (3, 'c'), (4, 'h'), (4, 's'), (4, 'd'), (7, 'h'), (8, 'h'), (9, 'h'),
+                            (10, 's'), (13, 'd')])
+        self.assertEqual(['KNOCK', 4], self.strat.determine_best_action(phase='end'))
+
+        # with a gin hand after the discard, go gin
+        self.p1.discard_card(GinCard(10, 's'))
+        self.give(self.p1, [(10, 'h')])
+        self.assertEqual(['KNOCK-GIN', 4], self.strat.determine_best_action(phase='end'))
+
+    def test_ties_broken_by_outs(self):
+        # dropping either 7 leaves 14 deadwood, but only keeping the 7d leaves outs (the 5d and 8d)
+        self.give(self.p1, [(1, 'd'), (6, 'd'), (7, 'd'), (7, 's')])
+        self.assertEqual([20, 15, 14, 14], self.p1.hand.deadwood_after_discards())
+        self.assertEqual(['DISCARD', 3], self.strat.determine_best_action(phase='end'))
+
+    def test_plays_a_match(self):
+        self.p1.strategy = self.strat
+        self.p2.strategy = HeuristicGinStrategy(self.p2, self.p1, self.gm)
+        self.gm.run()
+        self.assertEqual(1, self.gm.p1_wins + self.gm.p1_draws + self.gm.p1_losses)
+
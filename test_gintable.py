@@ -1,4 +1,5 @@
 from gintable import *
+import random
 import unittest
 
 
@@ -43,9 +44,8 @@ class TestGinTable(unittest.TestCase):
     # ensure we return the current deck, as well as the discard pile
     def test_organize_data(self):
         # we move a few cards into the discard pile
-        self.t.discard_pile.append(self.t.deck.cards.pop())
-        self.t.discard_pile.append(self.t.deck.cards.pop())
-        self.t.discard_pile.append(self.t.deck.cards.pop())
+        for _ in range(3):
+            self.t.add_card_to_discard_pile(self.t.deal_a_card())
 
         data = self.t.organize_data()
 
@@ -69,7 +69,7 @@ class TestGinTable(unittest.TestCase):
     def test_deal_a_card(self):
         card = self.t.deal_a_card()
         self.assertIsInstance(card, GinCard)
-        self.assertTrue(card.ranking() not in [x.ranking() for x in self.t.deck.cards])
+        self.assertTrue(card.ranking() not in [x.ranking() for x in self.t.remaining_cards()])
 
     def test_add_card_to_discard_pile(self):
         card = self.t.deal_a_card()
@@ -89,13 +89,70 @@ class TestGinTable(unittest.TestCase):
         self.assertTrue(card.ranking() not in [x.ranking() for x in self.t.discard_pile])
 
     def test_refresh_deck(self):
-        first_deck = self.t.deck.cards.__repr__()
-        self.t.discard_pile.append(self.t.deck.deal_a_card())
+        first_deck = self.t.remaining_cards().__repr__()
+        self.t.add_card_to_discard_pile(self.t.deal_a_card())
 
         # refresh and make sure the deck isn't the same (this fails every so often)
         self.t.refresh_deck()
-        self.assertEqual(52, len(self.t.deck.cards))
-        second_deck = self.t.deck.cards.__repr__()
+        self.assertEqual(52, self.t.deck_height)
+        second_deck = self.t.remaining_cards().__repr__()
         self.assertEqual(0, len(self.t.discard_pile))
 
-        self.assertNotEqual(first_deck, second_deck)
\ No newline at end of file
+        self.assertNotEqual(first_deck, second_deck)
+
+    def test_incremental_encoding(self):
+        card = self.t.deal_a_card()
+        self.t.add_card_to_discard_pile(card)
+        self.t.add_card_to_discard_pile(self.t.deal_a_card())
+        self.t.pickup_from_discard_pile()
+
+        # what we maintain as cards move matches the pile we'd encode from scratch
+        self.assertEqual([50, card.ranking()] + [0] * 31, self.t.encode_inputs())
+        self.assertEqual([card], self.t.discard_pile)
+        self.assertEqual(card, self.t.top_discard())
+        self.assertEqual(50, len(self.t.remaining_cards()))
+
+    def test_same_deck_as_deck(self):
+        # a table deals in the same order as a Deck shuffled from the same random state
+        random.seed(7)
+        deck = GinDeck()
+        random.seed(7)
+        table = GinTable()
+        self.assertEqual(deck.cards, table.remaining_cards())
+    def test_known_masks(self):
+        self.t.seat_player(self.p1)
+        self.t.seat_player(self.p2)
+        for _ in range(10):
+            self.p1.draw()
+            self.p2.draw()
+
+        # p1 discards, and p2 picks the card up: it's been seen, and p2 is known to hold it
+        card = self.p1.discard_card(self.p1.hand.cards[0])
+        bit = 1 << card.index()
+        self.assertEqual(bit, self.t.known_masks(self.p2)['seen'])
+        self.p2.pickup_discard()
+        self.assertEqual(bit, self.t.known_masks(self.p1)['opponent'])
+        self.assertEqual(0, self.t.known_masks(self.p2)['opponent'])
+        self.assertEqual(bit, self.t.known_masks(self.p1)['unavailable'] & bit)
+
+        # once it's discarded again it's in the pile, not p2's hand
+        self.p2.discard_card(card)
+        self.assertEqual(0, self.t.known_masks(self.p1)['opponent'])
+        self.assertEqual(bit, self.t.known_masks(self.p1)['unavailable'] & bit)
+
+        # an exposed hand is known card for card, including what's drawn after
+        self.t.expose_hand(self.p2)
+        drawn = self.p2.draw()
+        self.assertEqual(ginbits.card_mask(self.p2.hand.cards), self.t.known_masks(self.p1)['opponent'])
+        self.assertTrue(self.t.known_masks(self.p1)['opponent'] & (1 << drawn.index()))
+
+        # the dense vector is the three masks, one bit per input
+        vector = self.t.known_vector(self.p1)
+        self.assertEqual(3 * 52, len(vector))
+        self.assertEqual(1, vector[card.index()])
+        self.assertEqual(1, vector[52 + drawn.index()])
+
+        # and a fresh deal forgets it all
+        self.t.refresh_deck()
+        self.assertEqual({'seen': 0, 'opponent': 0, 'unavailable': ginbits.card_mask(self.p1.hand.cards)},
+                         self.t.known_masks(self.p1))
@@ -0,0 +1,127 @@
+import random
+import unittest
+from ismcts import *
+from ginmatch import *
+
+
+class TestPlayoutState(unittest.TestCase):
+    def hand(self, card_data):
+        return ginbits.index_mask(GinCard(rank, suit).index() for rank, suit in card_data)
+
+    def test_knock(self):
+        knocker = self.hand([(1, 'c'), (2, 'c'), (3, 'c'), (5, 'h'), (5, 's'), (5, 'd'), (9, 'h'), (10, 'h'),
+                             (11, 'h'), (4, 'd'), (13, 's')])
+        defender = self.hand([(2, 'd'), (6, 'd'), (8, 's'), (9, 's'), (11, 'c'), (12, 'c'), (13, 'c'), (1, 's'),
+                              (3, 'h'), (7, 'c')])
+        state = PlayoutState([knocker, defender], [], range(30), 0, 'end', 0, 0)
+
+        king = GinCard(13, 's').index()
+        self.assertIn(('KNOCK', king), state.legal_actions())
+        self.assertIn(('DISCARD', king), state.legal_actions())
+        state.apply(('KNOCK', king))
+        self.assertTrue(state.finished)
+        self.assertEqual(1, state.reward(0))
+        self.assertEqual(-1, state.reward(1))
+
+    def test_undercut(self):
+        knocker = self.hand([(1, 'c'), (2, 'c'), (3, 'c'), (5, 'h'), (5, 's'), (5, 'd'), (9, 'h'), (10, 'h'),
+                             (11, 'h'), (4, 'd'), (13, 's')])
+        defender = self.hand([(1, 'd'), (1, 'h'), (1, 's'), (6, 'c'), (7, 'c'), (8, 'c'), (2, 'h'), (3, 'h'),
+                              (4, 'h'), (2, 's')])
+        state = PlayoutState([knocker, defender], [], range(30), 0, 'end', 0, 0)
+        state.apply(('KNOCK', GinCard(13, 's').index()))
+        self.assertEqual(1, state.winner)
+
+    def test_drawn_game(self):
+        # the round ends with the deck at two cards: a draw
+        state = PlayoutState([self.hand([(13, 's')]), 0], [], [1, 2], 1, 'end', 10, 0)
+        state.apply(('DISCARD', GinCard(13, 's').index()))
+        self.assertTrue(state.finished)
+        self.assertIsNone(state.winner)
+        self.assertEqual(0, state.reward(0))
+
+    def test_play_out(self):
+        rng = random.Random(0)
+        cards = range(52)
+        rng.shuffle(cards)
+        state = PlayoutState([ginbits.index_mask(cards[:11]), ginbits.index_mask(cards[11:21])], [], cards[21:],
+                             0, 'end', 0, 0)
+        horizon = state.copy()
+        state.play_out()
+        self.assertTrue(state.finished)
+
+        # cut short, the result is the deadwood margin
+        horizon.play_out(2)
+        if not horizon.finished:
+            self.assertEqual(2, horizon.turns_taken)
+            margin = ginbits.deadwood(horizon.hands[1]) - ginbits.deadwood(horizon.hands[0])
+            self.assertAlmostEqual(math.tanh(margin / 20.0), horizon.reward(0))
+            self.assertAlmostEqual(-horizon.reward(0), horizon.reward(1))
+
+
+class TestISMCTSGinStrategy(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.p1 = GinPlayer()
+        self.p2 = GinPlayer()
+        self.gm = GinMatch(self.p1, self.p2)
+        self.gm.deal_cards()
+        self.strat = ISMCTSGinStrategy(self.p1, self.p2, self.gm, iterations=30, seed=1)
+
+    def test_determinize(self):
+        self.p1.discard_card(self.p1.hand.cards[0])
+        self.p2.pickup_discard()
+        position = describe_position(self.strat, 'end')
+        rng = random.Random(0)
+        for _ in range(20):
+            state = determinize(position, rng)
+
+            # every card is somewhere, once, and the opponent's known card is in their hand
+            ours, theirs = state.hands
+            self.assertEqual(0, ours & theirs)
+            self.assertEqual(10, ginbits.popcount(ours))
+            self.assertEqual(11, ginbits.popcount(theirs))
+            self.assertTrue(theirs & position['opponent_known'])
+            self.assertEqual(self.gm.table.deck_height, len(state.deck))
+            everything = ours | theirs | ginbits.index_mask(state.deck) | ginbits.index_mask(state.pile)
+            self.assertEqual(ginbits.FULL_MASK, everything)
+
+    def test_search(self):
+        position = describe_position(self.strat, 'end')
+        statistics = search(position, iterations=40, seed=0)
+        self.assertEqual(40, sum(visits for visits, reward in statistics.values()))
+
+        # one action per card, at least, and nothing we don't hold
+        for action in statistics:
+            self.assertTrue(self.p1.hand.mask() & (1 << action[1]))
+
+        # a time budget alone stops the search too
+        self.assertGreater(len(search(position, budget_ms=20, seed=0)), 0)
+
+    def test_merge_statistics(self):
+        merged = merge_statistics([{('DRAW',): [3, 1.0]}, {('DRAW',): [2, -1.0], ('PICKUP',): [1, 1.0]}])
+        self.assertEqual({('DRAW',): [5, 0.0], ('PICKUP',): [1, 1.0]}, merged)
+
+    def test_determine_best_action(self):
+        action, index = self.strat.determine_best_action(phase='end')
+        self.assertIn(action, NeuralGinStrategy.end_actions)
+        self.assertTrue(0 <= index < 11)
+        self.assertEqual(30, sum(visits for visits, reward in self.strat.statistics.values()))
+
+        # with nothing to pick up, we draw without searching
+        self.assertEqual(['DRAW', 0], self.strat.determine_best_action(phase='start'))
+
+    def test_processes(self):
+        strat = ISMCTSGinStrategy(self.p1, self.p2, self.gm, iterations=20, processes=2, seed=1)
+        try:
+            strat.determine_best_action(phase='end')
+        finally:
+            strat.close()
+        self.assertEqual(20, sum(visits for visits, reward in strat.statistics.values()))
+
+    def test_plays_a_match(self):
+        gm = GinMatch(GinPlayer(), GinPlayer())
+        gm.p1.strategy = ISMCTSGinStrategy(gm.p1, gm.p2, gm, iterations=10, seed=2)
+        gm.p2.strategy = HeuristicGinStrategy(gm.p2, gm.p1, gm)
+        gm.run()
+        self.assertEqual(1, gm.p1_wins + gm.p1_draws + gm.p1_losses)
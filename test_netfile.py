@@ -0,0 +1,131 @@
+import unittest
+import random
+import os
+import tempfile
+from netfile import *
+from observer import *
+from ginplayer import *
+from gintable import *
+from genetic_algorithm import GeneSet, Population
+
+
+class TestNetFile(unittest.TestCase):
+    def setUp(self):
+        num_inputs, num_hidden, num_outputs = 44, 31, 3
+        geneset = GeneSet(num_inputs + num_hidden * num_inputs + num_hidden * num_hidden + num_outputs * num_hidden)
+        self.weightset = WeightSet(geneset, num_inputs, num_hidden, num_outputs)
+        self.compiled = CompiledNeuralNet(self.weightset, GinNeuralNet.output_keys, GinNeuralNet.input_widths)
+        self.inputs = [random.randint(0, 52) for _ in range(num_inputs)]
+
+        handle, self.path = tempfile.mkstemp(suffix='.net')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def assert_forward_equal(self, expected, actual, places=10):
+        self.assertEqual(len(expected), len(actual))
+        for e, a in zip(expected, actual):
+            self.assertAlmostEqual(e, a, places)
+
+    def test_round_trip(self):
+        export_network(self.compiled, self.path)
+        mapped = load_network(self.path)
+
+        self.assertEqual(self.compiled.output_keys, mapped.output_keys)
+        self.assertEqual(self.compiled.input_widths, mapped.input_widths)
+        self.assertEqual(self.compiled.activation, mapped.activation)
+        self.assert_forward_equal(self.compiled.forward(self.inputs), mapped.forward(self.inputs))
+        mapped.close()
+
+    def test_float32(self):
+        export_network(self.compiled, self.path, float_size=4)
+        single_size = os.path.getsize(self.path)
+        export_network(self.compiled, self.path, float_size=8)
+        self.assertLess(single_size, os.path.getsize(self.path))
+
+        export_network(self.compiled, self.path, float_size=4)
+        mapped = load_network(self.path)
+        self.assert_forward_equal(self.compiled.forward(self.inputs), mapped.forward(self.inputs), 4)
+        mapped.close()
+
+    def test_kernels_share_mapped_weights(self):
+        for float_size in (4, 8):
+            export_network(self.compiled, self.path, float_size=float_size)
+            mapped = load_network(self.path)
+            for backend in ('numpy', 'batched'):
+                kernel = mapped.kernel(backend)
+                for name in ('input_weights', 'hidden_weights', 'jidden_weights', 'output_weights'):
+                    self.assertTrue(numpy.shares_memory(getattr(mapped, name), getattr(kernel, name)))
+                self.assert_forward_equal(self.compiled.forward(self.inputs), kernel.forward(self.inputs), 4)
+                for outputs in kernel.forward_batch([self.inputs] * 2):
+                    self.assert_forward_equal(self.compiled.forward(self.inputs), outputs, 4)
+            mapped.close()
+
+    def test_bound(self):
+        # a mapped network plays through BoundNeuralNet and every backend like a compiled one
+        t = GinTable()
+        p = GinPlayer()
+        t.seat_player(p)
+        for _ in range(11):
+            p.draw()
+        observers = [Observer(p), Observer(t)]
+
+        export_network(self.compiled, self.path)
+        mapped = load_network(self.path)
+        expected = BoundNeuralNet(observers, self.compiled)
+        expected.pulse()
+        for backend in available_backends():
+            bound = BoundNeuralNet(observers, mapped, backend)
+            bound.pulse()
+            for key in expected.outputs:
+                self.assertAlmostEqual(expected.outputs[key], bound.outputs[key], 10)
+        mapped.close()
+
+    def test_bound_input_buffer(self):
+        # a mapped network reading the first of two windows of a match's input buffer, as create_match() lays them out
+        t = GinTable()
+        p = GinPlayer()
+        t.seat_player(p)
+        for _ in range(11):
+            p.draw()
+        observers = [Observer(p), Observer(t)]
+        inputs = InputBuffer()
+        offset = inputs.add_window([p, t])[0]
+        inputs.add_window([p, t])
+        self.assertEqual(0, offset)
+
+        export_network(self.compiled, self.path)
+        mapped = load_network(self.path)
+        expected = BoundNeuralNet(observers, self.compiled)
+        expected.attach_inputs(inputs, offset)
+        expected.pulse()
+        for backend in available_backends():
+            bound = BoundNeuralNet(observers, mapped, backend)
+            bound.attach_inputs(inputs, offset)
+            bound.pulse()
+            for key in expected.outputs:
+                self.assertAlmostEqual(expected.outputs[key], bound.outputs[key], 10)
+        mapped.close()
+
+    def test_sparse_inputs(self):
+        compiled = CompiledNeuralNet(self.weightset, GinNeuralNet.output_keys, sparse_inputs=True)
+        export_network(compiled, self.path)
+        mapped = load_network(self.path)
+        self.assert_forward_equal(compiled.forward_active([1, 7, 40]), mapped.forward_active([1, 7, 40]))
+        mapped.close()
+
+    def test_not_a_network(self):
+        with open(self.path, 'wb') as f:
+            f.write('not a network file')
+        with self.assertRaises(AssertionError):
+            load_network(self.path)
+
+    def test_population_export(self):
+        p = Population(2)
+        geneset = p.member_genes.keys()[0]
+        p.export_network(geneset, self.path)
+        mapped = load_network(self.path)
+        inputs = [random.randint(0, 52) for _ in range(p.num_inputs)]
+        self.assert_forward_equal(p.get_compiled_net(geneset).forward(inputs), mapped.forward(inputs))
+        mapped.close()
@@ -1,4 +1,5 @@
 import unittest
+import random
 from neuralnet import *
 from observer import *
 from ginplayer import *
@@ -234,6 +235,190 @@ class TestGinNeuralNet(unittest.TestCase):
         self.assertEqual(len(self.gnn.outputs), len(self.output_keys))
 
 
+class TestCompiledNeuralNet(unittest.TestCase):
+    def setUp(self):
+        self.t = GinTable()
+        self.p = GinPlayer()
+        self.t.seat_player(self.p)
+        for _ in range(11):
+            self.p.draw()
+        self.observers = [Observer(self.p), Observer(self.t)]
+
+        num_inputs, num_hidden, num_outputs = 44, 31, 3
+        geneset = GeneSet(num_inputs + num_hidden * num_inputs + num_hidden * num_hidden + num_outputs * num_hidden)
+        self.weightset = WeightSet(geneset, num_inputs, num_hidden, num_outputs)
+
+    def assert_outputs_equal(self, expected, actual):
+        self.assertEqual(sorted(expected.keys()), sorted(actual.keys()))
+        for key in expected:
+            self.assertAlmostEqual(expected[key], actual[key], 10)
+
+    def test_forward_matches_graph(self):
+        for activation in ACTIVATIONS:
+            graph = GinNeuralNet(self.observers, self.weightset, activation=activation)
+            compiled = CompiledNeuralNet(self.weightset, GinNeuralNet.output_keys, GinNeuralNet.input_widths,
+                                         activation=activation)
+            bound = BoundNeuralNet(self.observers, compiled)
+            graph.pulse()
+            bound.pulse()
+            self.assert_outputs_equal(graph.outputs, bound.outputs)
+
+            # both track changes to what they observe
+            self.p.discard_card(self.p.hand.cards[0])
+            self.p.draw()
+            graph.pulse()
+            bound.pulse()
+            self.assert_outputs_equal(graph.outputs, bound.outputs)
+
+    def test_shared_between_matches(self):
+        # one compiled network, bound to two different sets of observers
+        compiled = CompiledNeuralNet(self.weightset, GinNeuralNet.output_keys, GinNeuralNet.input_widths)
+        other_table = GinTable()
+        other_player = GinPlayer()
+        other_table.seat_player(other_player)
+        for _ in range(11):
+            other_player.draw()
+
+        bound = BoundNeuralNet(self.observers, compiled)
+        other_bound = BoundNeuralNet([Observer(other_player), Observer(other_table)], compiled)
+        bound.pulse()
+        other_bound.pulse()
+
+        self.assert_outputs_equal(dict(zip(compiled.output_keys, compiled.forward(bound.sense()))), bound.outputs)
+        self.assert_outputs_equal(dict(zip(compiled.output_keys, compiled.forward(other_bound.sense()))),
+                                  other_bound.outputs)
+
+    def test_attach_inputs(self):
+        compiled = CompiledNeuralNet(self.weightset, GinNeuralNet.output_keys, GinNeuralNet.input_widths)
+        inputs = InputBuffer()
+        inputs.add_window([self.p])
+        offset, width = inputs.add_window([self.p, self.t])
+        self.assertEqual(44, width)
+
+        # the window reads the same numbers the observers report, through every backend
+        for backend in available_backends():
+            bound = BoundNeuralNet(self.observers, compiled, backend)
+            reference = BoundNeuralNet(self.observers, compiled)
+            bound.attach_inputs(inputs, offset)
+            self.assertEqual(reference.sense(), bound.sense())
+
+            self.p.discard_card(self.p.hand.cards[0])
+            self.p.draw()
+            bound.pulse()
+            reference.pulse()
+            self.assert_outputs_equal(reference.outputs, bound.outputs)
+            self.assert_outputs_equal(dict(zip(compiled.output_keys, compiled.forward(inputs.values, offset))),
+                                      bound.outputs)
+
+    def test_attach_freezes_inputs(self):
+        # a network attached to the first window, then a second window laid out: the buffer would grow (and could
+        # move) under the first network's view, so it refuses
+        compiled = CompiledNeuralNet(self.weightset, GinNeuralNet.output_keys, GinNeuralNet.input_widths)
+        for backend in available_backends():
+            inputs = InputBuffer()
+            bound = BoundNeuralNet(self.observers, compiled, backend)
+            bound.attach_inputs(inputs, inputs.add_window([self.p, self.t])[0])
+            self.assertRaises(AssertionError, inputs.add_window, [self.p, self.t])
+
+    def test_forward_active(self):
+        num_inputs, num_hidden, num_outputs = 20, 13, 3
+        geneset = GeneSet(num_inputs + num_hidden * num_inputs + num_hidden * num_hidden + num_outputs * num_hidden)
+        weightset = WeightSet(geneset, num_inputs, num_hidden, num_outputs)
+        compiled = CompiledNeuralNet(weightset, GinNeuralNet.output_keys, sparse_inputs=True)
+
+        # gathering columns for the active inputs matches a dense pass over the one-hot vector
+        active = [2, 5, 17]
+        dense = [1 if i in active else 0 for i in range(num_inputs)]
+        for expected, actual in zip(compiled.forward(dense), compiled.forward_active(active)):
+            self.assertAlmostEqual(expected, actual, 10)
+
+    def test_sparse_observers(self):
+        opponent = GinPlayer()
+        self.t.seat_player(opponent)
+        observers = [SparseObserver(self.p, 'hand'), SparseObserver(opponent, 'known'),
+                     SparseObserver(self.t, 'discard'), SparseObserver(self.t, 'height')]
+
+        num_inputs, num_hidden, num_outputs = 188, 127, 3
+        geneset = GeneSet(num_inputs + num_hidden * num_inputs + num_hidden * num_hidden + num_outputs * num_hidden)
+        weightset = WeightSet(geneset, num_inputs, num_hidden, num_outputs)
+        compiled = CompiledNeuralNet(weightset, GinNeuralNet.output_keys, sparse_inputs=True)
+        bound = BoundNeuralNet(observers, compiled)
+        self.assertTrue(bound.sparse)
+
+        # active positions are offset by the widths of the observers before them
+        active = bound.sense_active()
+        self.assertEqual(sorted([c.index() for c in self.p.hand.cards] + [52 + 52 + 52 + 31]), sorted(active))
+
+        bound.pulse()
+        expected = compiled.forward([1 if i in active else 0 for i in range(num_inputs)])
+        self.assert_outputs_equal(dict(zip(compiled.output_keys, expected)), bound.outputs)
+
+    def test_backends_agree(self):
+        for activation in ACTIVATIONS:
+            compiled = CompiledNeuralNet(self.weightset, GinNeuralNet.output_keys, GinNeuralNet.input_widths,
+                                         activation=activation)
+            batch = [[random.randint(0, 52) for _ in range(44)] for _ in range(5)]
+            expected = [compiled.forward(inputs) for inputs in batch]
+
+            for backend in available_backends():
+                kernel = compiled.kernel(backend)
+                self.assertIs(kernel, compiled.kernel(backend))
+                for expected_row, actual_row in zip(expected, kernel.forward_batch(batch)):
+                    for e, a in zip(expected_row, actual_row):
+                        self.assertAlmostEqual(e, a, 10)
+                for e, a in zip(expected[0], kernel.forward(batch[0])):
+                    self.assertAlmostEqual(e, a, 10)
+
+                # a bound network pulses the same through any backend
+                bound = BoundNeuralNet(self.observers, compiled, backend)
+                reference = BoundNeuralNet(self.observers, compiled)
+                bound.pulse()
+                reference.pulse()
+                self.assert_outputs_equal(reference.outputs, bound.outputs)
+
+
+class MockCompiledNet(object):
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+
+class TestCompiledNetCache(unittest.TestCase):
+    def test_get_or_compile(self):
+        cache = CompiledNetCache()
+        net = MockCompiledNet(10)
+        self.assertIs(net, cache.get_or_compile('a', lambda: net))
+        self.assertIs(net, cache.get_or_compile('a', lambda: MockCompiledNet(10)))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_lru_eviction(self):
+        cache = CompiledNetCache(maxsize=2)
+        cache.put('a', MockCompiledNet(10))
+        cache.put('b', MockCompiledNet(10))
+
+        # touch 'a' so 'b' becomes the least recently used
+        cache.get('a')
+        cache.put('c', MockCompiledNet(10))
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(1, cache.evictions)
+
+    def test_memory_cap(self):
+        cache = CompiledNetCache(max_bytes=25)
+        for key in 'abc':
+            cache.put(key, MockCompiledNet(10))
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(20, cache.nbytes)
+        self.assertNotIn('a', cache)
+
+        # a single oversized entry is still kept, on its own
+        cache.put('d', MockCompiledNet(100))
+        self.assertEqual(['d'], [key for key in 'abcd' if key in cache])
+
+
 class TestPerceptron(unittest.TestCase):
     def setUp(self):
         self.p1 = Perceptron(myid='self.p1')
@@ -501,3 +686,29 @@ class TestWeightSet(unittest.TestCase):
         w.weights['output'][0].pop()
         with self.assertRaises(AssertionError):
             w.validate(num_inputs, num_hidden, num_outputs)()
+
+
+class TestDecisionCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = DecisionCache(maxsize=2)
+        self.assertIsNone(cache.get(('end', (1, 2))))
+        cache.put(('end', (1, 2)), ['DISCARD', 3])
+        self.assertEqual(['DISCARD', 3], cache.get(('end', (1, 2))))
+
+        # the phase is part of the key
+        self.assertIsNone(cache.get(('start', (1, 2))))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(2, cache.misses)
+
+        cache.reset_stats()
+        self.assertEqual(0, cache.hits + cache.misses)
+
+    def test_bounded(self):
+        cache = DecisionCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(1, cache.get('a'))
@@ -1,4 +1,5 @@
 from observer import *
+import gc
 import unittest
 from gindeck import GinCard
 from ginplayer import GinPlayer
@@ -41,9 +42,12 @@ class TestObservable(unittest.TestCase):
         self.p._add_card(self.c1)
         self.mobs = MockObserver(self.p)
 
-        # ensure we call the observe method
+        # changes are only encoded once someone reads them
         self.p._add_card(self.c2)
-        self.assertEqual(2, self.mobs.times_called) # once during init, once during _add_card
+        self.assertEqual(1, self.mobs.times_called) # once during init
+        self.mobs.get_value_by_index(0)
+        self.mobs.get_value_by_index(1)
+        self.assertEqual(2, self.mobs.times_called) # and once for the first read after _add_card
 
         # and that we pass the int_dict to the observer
         self.assertIn(self.c1.ranking(), self.mobs.buffer.values())
@@ -52,11 +56,53 @@ class TestObservable(unittest.TestCase):
     def test_noop_notify(self):
         mobs = MockObserver(self.p)
 
+        # a notification marks our buffer stale, and we re-encode on the next read
+        version = self.p.version
+        self.p.noop_notify()
+        self.assertEqual(version + 1, self.p.version)
+        self.assertEqual(1, mobs.times_called) # once during init
+        mobs.refresh()
+        self.assertEqual(2, mobs.times_called)
+
+        # unread notifications cost nothing, and reading twice encodes once
         self.p.noop_notify()
-        self.assertEqual(2, mobs.times_called) # once during init, once during noop_notify
         self.p.noop_notify()
+        mobs.refresh()
+        mobs.refresh()
         self.assertEqual(3, mobs.times_called)
 
+    def test_batch(self):
+        version = self.p.version
+        with self.p.batch():
+            self.p._add_card(self.c1)
+            self.p._add_card(self.c2)
+            with self.p.batch():
+                self.p.noop_notify()
+        self.assertEqual(version + 1, self.p.version)
+
+        # nothing changed, nothing to emit
+        with self.p.batch():
+            pass
+        self.assertEqual(version + 1, self.p.version)
+
+        # reading mid-batch sees the changes made so far
+        mobs = MockObserver(self.p)
+        with self.p.batch():
+            self.p.noop_notify()
+            self.p.noop_notify()
+            self.assertEqual(version + 2, self.p.version)
+            self.assertEqual(2, mobs.get_value_by_index(0) and mobs.times_called)
+            self.p.noop_notify()
+        self.assertEqual(version + 3, self.p.version)
+
+    def test_batched_deal(self):
+        match = GinMatch(GinPlayer(), GinPlayer())
+        match.deal_cards()
+
+        # the deal reaches the table as one update
+        self.assertEqual(1, match.table.version)
+        self.assertEqual(1, match.p2.version)
+
 
 # noinspection PyProtectedMember
 class TestObserver(unittest.TestCase):
@@ -78,13 +124,20 @@ class TestObserver(unittest.TestCase):
 
     def test_register(self):
         # remove callbacks which were added during obs.__init__()
-        self.p._observers = []
+        self.p.unregister_observer(self.obs)
+        self.p.unregister_observer(self.obs2)
 
         self.assertEqual(0, len(self.p._observers))
 
         self.obs.register(self.p)
         self.assertEqual(1, len(self.p._observers))
 
+    def test_weak_registry(self):
+        # the observable doesn't keep its observers alive
+        del self.obs2
+        gc.collect()
+        self.assertEqual([self.obs], list(self.p._observers))
+
     def test_get_value_by_index(self):
         # draw a few cards and ensure we can get the ith card's ranking
         cards = [GinCard(2, 'd'), GinCard(3, 'h'), GinCard(5, 'c')]
@@ -95,8 +148,143 @@ class TestObserver(unittest.TestCase):
     def test_observe(self):
         # we expect the PlayerObserver's buffer to hold an array of ints representing the player's cards
         self.p._add_card(self.c1)
+        self.obs.refresh()
         self.assertIn(self.c1.ranking(), self.obs.buffer.values())
 
         self.p._add_card(self.c2)
+        self.obs.refresh()
         self.assertIn(self.c1.ranking(), self.obs.buffer.values())
-        self.assertIn(self.c2.ranking(), self.obs.buffer.values())
\ No newline at end of file
+        self.assertIn(self.c2.ranking(), self.obs.buffer.values())
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.t = GinTable()
+
+    def test_shared_between_observers(self):
+        # two players' worth of observers on one table build one snapshot per change between them
+        observers = [Observer(self.t), Observer(self.t)]
+        built = self.t.snapshots_built
+        self.assertIs(observers[0].buffer, observers[1].buffer)
+
+        self.t.deal_a_card()
+        for observer in observers:
+            observer.get_value_by_index(0)
+        self.assertEqual(built + 1, self.t.snapshots_built)
+        self.assertIs(observers[0].buffer, observers[1].buffer)
+        self.assertEqual(self.t.deck_height, observers[1].get_value_by_index(0))
+
+    def test_planes_shared(self):
+        first = SparseObserver(self.t, 'height')
+        second = SparseObserver(self.t, 'height')
+        self.assertIs(first.get_active_indexes(), second.get_active_indexes())
+        self.assertIsNot(first.get_active_indexes(), SparseObserver(self.t, 'discard').get_active_indexes())
+
+    def test_immutable(self):
+        snapshot = self.t.snapshot()
+        with self.assertRaises(TypeError):
+            snapshot[0] = 99
+        with self.assertRaises(TypeError):
+            snapshot.update({0: 99})
+
+
+class TestInputBuffer(unittest.TestCase):
+    def setUp(self):
+        self.t = GinTable()
+        self.p = GinPlayer()
+        self.t.seat_player(self.p)
+        self.inputs = InputBuffer()
+
+    def test_add_window(self):
+        self.assertEqual((0, 44), self.inputs.add_window([self.p, self.t]))
+        self.assertEqual((44, 11), self.inputs.add_window([self.p]))
+        self.assertEqual(55, len(self.inputs.values))
+
+        # each slice starts out holding what its observable currently encodes
+        self.assertEqual(52, self.inputs.values[11])
+        self.assertEqual([0] * 11, list(self.inputs.values[44:]))
+
+    def test_view(self):
+        self.inputs.add_window([self.p, self.t])
+        view = self.inputs.view(11, 33)
+        self.assertEqual(52, view[0])
+        self.p.draw()
+        self.assertEqual(51, view[0])
+
+        # the view would be left reading freed memory if the buffer grew
+        self.assertRaises(AssertionError, self.inputs.add_window, [self.p])
+
+    def test_writes_in_place(self):
+        self.inputs.add_window([self.p, self.t])
+        values = self.inputs.values
+
+        # a draw rewrites the hand slice and the deck height, and nothing else
+        before = list(values)
+        self.p.draw()
+        changed = [i for i, (a, b) in enumerate(zip(before, values)) if a != b]
+        self.assertEqual([0, 11], changed)
+        self.assertEqual(self.p.hand.cards[0].ranking(), values[0])
+        self.assertEqual(51, values[11])
+
+        # a discard fills exactly one slot of the pile
+        card = self.p.hand.cards[0]
+        before = list(values)
+        self.p.discard_card(card)
+        changed = [i for i, (a, b) in enumerate(zip(before, values)) if a != b]
+        self.assertEqual([0, 12], changed)
+        self.assertEqual(card.ranking(), values[12])
+
+        # the buffer always agrees with a fresh encoding
+        self.assertEqual(self.p.encode_inputs() + self.t.encode_inputs(), list(values))
+
+
+class TestSparseObserver(unittest.TestCase):
+    def setUp(self):
+        self.t = GinTable()
+        self.p = GinPlayer()
+        self.opponent = GinPlayer()
+        self.t.seat_player(self.p)
+        self.t.seat_player(self.opponent)
+
+    def test___init__(self):
+        self.assertEqual(52, SparseObserver(self.p, 'hand').width)
+        self.assertEqual(32, SparseObserver(self.t, 'height').width)
+        with self.assertRaises(AssertionError):
+            SparseObserver(self.p, 'discard')
+
+    def test_hand_plane(self):
+        obs = SparseObserver(self.p, 'hand')
+        self.p._add_card(GinCard(9, 'c'))
+        self.p._add_card(GinCard(1, 'd'))
+        self.assertEqual([8, 13], sorted(obs.get_active_indexes()))
+
+        # dense view of the same plane
+        self.assertEqual(1, obs.get_value_by_index(13))
+        self.assertEqual(0, obs.get_value_by_index(12))
+
+    def test_known_plane(self):
+        obs = SparseObserver(self.opponent, 'known')
+        self.p._add_card(GinCard(9, 'c'))
+        self.p.discard_card(GinCard(9, 'c'))
+
+        # our opponent picks the 9c up: it becomes known, until it is discarded again
+        self.opponent.pickup_discard()
+        self.assertEqual([8], list(obs.get_active_indexes()))
+        self.opponent.discard_card(GinCard(9, 'c'))
+        self.opponent.noop_notify()
+        self.assertEqual([], list(obs.get_active_indexes()))
+
+    def test_table_planes(self):
+        discard = SparseObserver(self.t, 'discard')
+        height = SparseObserver(self.t, 'height')
+
+        # a fresh deck is taller than the plane, so it shares the top slot
+        self.assertEqual([31], list(height.get_active_indexes()))
+        for _ in range(21):
+            self.t.deal_a_card()
+        self.assertEqual([31], list(height.get_active_indexes()))
+        self.t.deal_a_card()
+        self.assertEqual([30], list(height.get_active_indexes()))
+
+        self.t.add_card_to_discard_pile(GinCard(13, 's'))
+        self.assertEqual([51], list(discard.get_active_indexes()))
@@ -0,0 +1,65 @@
+import unittest
+from pruning import *
+
+
+class TestPruning(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.p = Population(3)
+        self.geneset = self.p.member_genes.keys()[0]
+        self.weightset = self.p.create_weightset(self.geneset)
+
+    def test_sparsify(self):
+        pruned = self.weightset.sparsify(0.5)
+
+        # the original is untouched
+        self.assertEqual(0, self.weightset.sparsity())
+
+        # every surviving connection weight is at least the threshold, and input weights are left alone
+        for layer in ('hidden', 'jidden', 'output'):
+            for row in pruned.weights[layer]:
+                for weight in row:
+                    self.assertTrue(weight == 0.0 or abs(weight) >= 0.5)
+        self.assertEqual(self.weightset.weights['input'], pruned.weights['input'])
+        self.assertGreater(pruned.sparsity(), 0.2)
+
+    def test_csr_matrix(self):
+        rows = [[0.0, 2.0, 0.0], [1.0, 0.0, 3.0]]
+        matrix = CSRMatrix(rows)
+        self.assertEqual([0, 1, 3], matrix.indptr)
+        self.assertEqual([1, 0, 2], matrix.indices)
+        self.assertEqual(3, matrix.nnz())
+        self.assertEqual([4.0, 10.0], matrix.dot([1.0, 2.0, 3.0]))
+
+    def test_sparse_compiled_matches_dense(self):
+        pruned = self.weightset.sparsify(0.5)
+        dense = self.p.compile_weightset(pruned)
+        sparse = self.p.compile_weightset(pruned, SparseCompiledNeuralNet)
+        self.assertAlmostEqual(pruned.sparsity(), sparse.sparsity())
+
+        inputs = [random.randint(0, 52) for _ in range(self.p.num_inputs)]
+        for expected, actual in zip(dense.forward(inputs), sparse.forward(inputs)):
+            self.assertAlmostEqual(expected, actual, 10)
+
+    def test_record_state_corpus(self):
+        corpus = record_state_corpus(self.p, self.geneset, games=2)
+        self.assertGreater(len(corpus), 0)
+        for inputs in corpus:
+            self.assertEqual(self.p.num_inputs, len(inputs))
+
+    def test_find_pruning_threshold(self):
+        corpus = record_state_corpus(self.p, self.geneset, games=2)
+        dense = self.p.compile_weightset(self.weightset)
+
+        # an unpruned network agrees with itself everywhere
+        self.assertEqual(1.0, action_agreement(dense, dense, corpus))
+
+        threshold, pruned, agreement = find_pruning_threshold(self.p, self.weightset, corpus, min_agreement=0.9)
+        self.assertGreaterEqual(agreement, 0.9)
+        self.assertEqual(agreement, action_agreement(dense, self.p.compile_weightset(pruned), corpus))
+
+    def test_prune_geneset(self):
+        result = prune_geneset(self.p, self.geneset, games=2)
+        self.assertIsInstance(result['compiled'], SparseCompiledNeuralNet)
+        self.assertGreaterEqual(result['agreement'], 0.99)
+        self.assertGreater(result['speedup'], 0)
@@ -0,0 +1,89 @@
+import logging
+import random
+import unittest
+from tracing import *
+from ginmatch import *
+from ginstrategy import *
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+
+    def heuristic_match(self):
+        gm = GinMatch(GinPlayer(), GinPlayer())
+        gm.p1.strategy = HeuristicGinStrategy(gm.p1, gm.p2, gm)
+        gm.p2.strategy = HeuristicGinStrategy(gm.p2, gm.p1, gm)
+        return gm
+
+    def test_recording(self):
+        traced = self.heuristic_match()
+        untraced = self.heuristic_match()
+        tracer = RecordingTracer()
+        traced.attach_tracer(tracer)
+        self.assertIs(tracer, traced.p1.tracer)
+
+        untraced.run()
+        self.assertEqual([], tracer.events)
+        traced.run()
+
+        names = [event[0] for event in tracer.events]
+        self.assertEqual(['game', 'deal', 'turn', 'action'], names[:4])
+        self.assertEqual(['score', 'game-over', 'match-over'], names[-3:])
+
+        # every turn ends with the state of the table, in plain values
+        self.assertEqual(traced.turns_taken, len(tracer.named('turn')))
+        self.assertEqual(traced.turns_taken, len(tracer.named('state')))
+        state = tracer.named('state')[-1]
+        self.assertEqual((10, 10), (ginbits.popcount(state[1]), ginbits.popcount(state[2])))
+        self.assertTrue(all(isinstance(index, int) for index in state[5]))
+
+        # deals are masks of the hands as dealt
+        deal = tracer.named('deal')[0]
+        self.assertEqual((11, 10), (ginbits.popcount(deal[1]), ginbits.popcount(deal[2])))
+
+        # the final scores
+        self.assertEqual(('match-over', traced.p1_score, traced.p2_score), tracer.events[-1])
+
+        # every event formats
+        for event in tracer.events:
+            self.assertTrue(format_event(event))
+
+        # a closed match stops tracing
+        traced.close()
+        self.assertIsNone(traced.tracer)
+        self.assertIsNone(traced.p1.tracer)
+
+    def test_log_tracer(self):
+        logger = logging.getLogger('gin.trace.test')
+        logger.propagate = False
+        handler = ListHandler()
+        logger.addHandler(handler)
+        try:
+            tracer = LogTracer(logger)
+            logger.setLevel(logging.WARNING)
+            tracer.emit(('turn', 1, 2))
+            self.assertEqual([], handler.messages)
+
+            logger.setLevel(logging.DEBUG)
+            tracer.emit(('turn', 1, 2))
+            tracer.emit(('action', 'DISCARD', GinCard(13, 's').index()))
+            self.assertEqual("Turn 1. It is player 2's turn:", handler.messages[0])
+            self.assertIn(str(GinCard(13, 's')), handler.messages[1])
+        finally:
+            logger.removeHandler(handler)
+
+    def test_get_seat(self):
+        gm = self.heuristic_match()
+        self.assertEqual(1, gm.get_seat(gm.p1))
+        self.assertEqual(2, gm.get_seat(gm.p2))
+        self.assertRaises(Exception, gm.get_seat, GinPlayer())
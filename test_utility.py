@@ -0,0 +1,67 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+import unittest
+import utility
+from utility import *
+
+
+def log_from_worker(queue):
+    setup_worker_logging(queue)
+    logging.getLogger('gin.worker').warning("hello from %s", "a worker")
+
+
+class TestLogging(unittest.TestCase):
+    def setUp(self):
+        self.root_handlers = list(logging.getLogger().handlers)
+        self.root_level = logging.getLogger().level
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        stop_logging()
+        root = logging.getLogger()
+        root.handlers = self.root_handlers
+        root.setLevel(self.root_level)
+        os.remove(self.path)
+
+    def read_log(self):
+        with open(self.path) as f:
+            return f.read()
+
+    def test_no_setup_on_import(self):
+        # importing utility leaves the root logger alone; our own logger just swallows records
+        self.assertIsNone(log_queue())
+        self.assertTrue(any(isinstance(h, logging.NullHandler) for h in utility.logger.handlers))
+
+    def test_queued(self):
+        listener = setup_logging(self.path)
+        self.assertIs(listener, setup_logging(self.path))
+        self.assertIsNotNone(log_queue())
+
+        log_warn("leaderboard {0}", 47)
+        logging.getLogger('gin.trace').info("traced")
+        stop_logging()
+
+        text = self.read_log()
+        self.assertIn("leaderboard 47", text)
+        self.assertIn("traced", text)
+        self.assertIsNone(log_queue())
+
+    def test_worker_records(self):
+        setup_logging(self.path)
+        worker = multiprocessing.Process(target=log_from_worker, args=(log_queue(),))
+        worker.start()
+        worker.join()
+        stop_logging()
+        self.assertIn("hello from a worker", self.read_log())
+
+    def test_prepare(self):
+        # a prepared record has its message baked in, and pickles
+        import cPickle
+        handler = QueueHandler(None)
+        record = logging.LogRecord('gin', logging.WARNING, __file__, 1, "%s and %s", ("this", "that"), None)
+        prepared = handler.prepare(record)
+        self.assertEqual("this and that", prepared.getMessage())
+        self.assertEqual("this and that", cPickle.loads(cPickle.dumps(prepared)).getMessage())
@@ -0,0 +1,103 @@
+#!/usr/bin/python
+#
+# tracing.py
+#
+# 2026/10/19
+# rg
+#
+# structured tracing of gin matches. a match with a tracer attached (see GinMatch.attach_tracer()) hands it each
+# event as a tuple, the event's name first, then plain values: seats, counts, card indexes and card masks (see
+# ginbits). nothing is formatted until a tracer asks for it, and a match without a tracer builds no tuples at all,
+# so one exhibit match can be traced while every other match runs at full speed.
+#
+# events, and their fields:
+#   ('game', p1 id, p2 id)                                      a game begins
+#   ('deal', p1 hand, p2 hand)                                  hands as card masks
+#   ('turn', turn number, seat)                                 seat is 1 or 2
+#   ('action', action name, card index or None)                 the action the player just took
+#   ('knock', seat, ruling)                                     ruling: 'improper', 'gin' or 'valid'
+#   ('knock-gin', seat, ruling)                                 ruling: 'rejected' or 'valid'
+#   ('state', p1 hand, p2 hand, deck height, next card index or None, discard pile as a tuple of card indexes)
+#   ('score', p1 score, p1 wins, p1 losses, p1 draws, p2 score, p2 wins, p2 losses, p2 draws)
+#   ('game-over',)
+#   ('match-over', p1 score, p2 score)
+
+from gindeck import GIN_CARDS
+import ginbits
+import logging
+
+
+def _cards(mask):
+    return str([GIN_CARDS[index] for index in ginbits.mask_indexes(mask)])
+
+
+def _card(index):
+    return str(GIN_CARDS[index]) if index is not None else 'None'
+
+
+def _format_state(p1_hand, p2_hand, height, next_card, pile):
+    return ("+---next turn---\n"
+            "| player 1 holds: {0} \tdeadwood: {1}\n"
+            "| player 2 holds: {2} \tdeadwood: {3}\n"
+            "| deck height: {4}  next_card: {5}  discard pile: {6}\n"
+            "+---------------").format(_cards(p1_hand), ginbits.deadwood(p1_hand), _cards(p2_hand),
+                                       ginbits.deadwood(p2_hand), height, _card(next_card),
+                                       [GIN_CARDS[index] for index in pile])
+
+
+def _format_score(p1_score, p1_wins, p1_losses, p1_draws, p2_score, p2_wins, p2_losses, p2_draws):
+    return ("End-of-game scores:\n"
+            "  player 1 score: {0}  matches: {1} (win), {2} (lose), {3} (draw)\n"
+            "  player 2 score: {4}  matches: {5} (win), {6} (lose), {7} (draw)").format(
+        p1_score, p1_wins, p1_losses, p1_draws, p2_score, p2_wins, p2_losses, p2_draws)
+
+
+# event name -> function of the event's fields, returning its text
+EVENT_FORMATS = {
+    'game':       lambda p1, p2: "==== beginning new game between {0} and {1} ====".format(p1, p2),
+    'deal':       lambda p1_hand, p2_hand: "player 1 is dealt: {0}\nplayer 2 is dealt: {1}".format(
+        _cards(p1_hand), _cards(p2_hand)),
+    'turn':       lambda number, seat: "Turn {0}. It is player {1}'s turn:".format(number, seat),
+    'action':     lambda name, card: "\tAction taken: {0}  \t{1}".format(name, _card(card)),
+    'knock':      lambda seat, ruling: "\tplayer {0} knocks: {1}".format(seat, ruling),
+    'knock-gin':  lambda seat, ruling: "\tplayer {0} knocks gin: {1}".format(seat, ruling),
+    'state':      _format_state,
+    'score':      _format_score,
+    'game-over':  lambda: "Game over",
+    'match-over': lambda p1_score, p2_score: "--MATCH COMPLETE-- Final scores: player 1: {0}, player 2: {1}".format(
+        p1_score, p2_score),
+}
+
+
+def format_event(event):
+    return EVENT_FORMATS[event[0]](*event[1:])
+
+
+# the tracer interface: told of every event of the matches it's attached to
+class GameTracer(object):
+    def emit(self, event):
+        pass
+
+
+# keeps every event, unformatted
+class RecordingTracer(GameTracer):
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+    # the recorded events with the given name
+    def named(self, name):
+        return [event for event in self.events if event[0] == name]
+
+
+# formats each event as it arrives and writes it to a logger
+class LogTracer(GameTracer):
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger if logger is not None else logging.getLogger('gin.trace')
+        self.level = level
+
+    def emit(self, event):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, format_event(event))
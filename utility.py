@@ -1,36 +1,164 @@
 from operator import itemgetter
 import gc
+import timeit
 
-# configure application-wide logging
+# application-wide logging. importing us configures nothing: our records go to the 'gin' logger, which drops them
+# until an entry point calls setup_logging(). see there.
 import logging
+import logging.handlers
+import threading
+import atexit
 
-logging.basicConfig(filename='debug.log.txt', level=logging.DEBUG)
+logger = logging.getLogger('gin')
+logger.addHandler(logging.NullHandler())
 
 enable_logging_debug = False
 enable_logging_info = False
 enable_logging_warn = True
 
 
-# wrapper that respects toggling debug on/off
-def log_debug(msg):
+# wrapper that respects toggling debug on/off. with args, msg is a format string filled in only if we log it.
+def log_debug(msg, *args):
     if enable_logging_debug:
-        logging.debug(msg)
+        logger.debug(msg.format(*args) if args else msg)
 
 
-def log_info(msg):
+def log_info(msg, *args):
     if enable_logging_info:
-        logging.info(msg)
+        logger.info(msg.format(*args) if args else msg)
 
 
-def log_warn(msg):
+def log_warn(msg, *args):
     if enable_logging_warn:
-        logging.warn(msg)
+        logger.warning(msg.format(*args) if args else msg)
+
+
+# python 3 has these in logging.handlers. on python 2 we bring our own, with the same interface.
+try:
+    from logging.handlers import QueueHandler, QueueListener
+except ImportError:
+    # puts records on a queue rather than handling them, ready to be pickled across to another process
+    class QueueHandler(logging.Handler):
+        def __init__(self, queue):
+            logging.Handler.__init__(self)
+            self.queue = queue
+
+        def prepare(self, record):
+            # format now, so the record carries its message and nothing that might not pickle
+            self.format(record)
+            record.msg = record.message
+            record.args = None
+            record.exc_info = None
+            return record
+
+        def emit(self, record):
+            try:
+                self.queue.put_nowait(self.prepare(record))
+            except Exception:
+                self.handleError(record)
+
+    # takes records off a queue on a thread of its own, and hands them to the handlers
+    class QueueListener(object):
+        _sentinel = None
+
+        def __init__(self, queue, *handlers):
+            self.queue = queue
+            self.handlers = handlers
+            self._thread = None
+
+        def start(self):
+            self._thread = threading.Thread(target=self._monitor)
+            self._thread.daemon = True
+            self._thread.start()
+
+        def handle(self, record):
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+        def _monitor(self):
+            while True:
+                record = self.queue.get()
+                if record is self._sentinel:
+                    break
+                self.handle(record)
+
+        def enqueue_sentinel(self):
+            self.queue.put_nowait(self._sentinel)
+
+        def stop(self):
+            self.enqueue_sentinel()
+            self._thread.join()
+            self._thread = None
+
+
+# the queue and listener set up by setup_logging(), if it has been called
+_log_queue = None
+_log_listener = None
+
+
+# route every record through a queue to a listener thread that writes filename, so code logging from a hot loop
+# only ever pays for a queue put. call once, from the entry point. the queue is a multiprocessing one, so worker
+# processes can send their records to us too: see log_queue() and setup_worker_logging().
+def setup_logging(filename='debug.log.txt', level=logging.DEBUG):
+    global _log_queue, _log_listener
+    if _log_listener is not None:
+        return _log_listener
+
+    import multiprocessing
+    _log_queue = multiprocessing.Queue(-1)
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    _log_listener = QueueListener(_log_queue, file_handler)
+    _log_listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(_log_queue))
+    root.setLevel(level)
+    atexit.register(stop_logging)
+    return _log_listener
+
+
+# write out whatever is still queued, and stop the listener
+def stop_logging():
+    global _log_queue, _log_listener
+    if _log_listener is None:
+        return
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler) and handler.queue is _log_queue:
+            root.removeHandler(handler)
+    _log_listener.stop()
+    for handler in _log_listener.handlers:
+        handler.close()
+    _log_queue = _log_listener = None
+
+
+# the queue worker processes should log to, or None if logging isn't set up
+def log_queue():
+    return _log_queue
+
+
+# a worker process' logging: everything goes back to the parent over queue. suits Pool(initializer=...).
+def setup_worker_logging(queue, level=logging.DEBUG):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if queue is not None:
+        root.addHandler(QueueHandler(queue))
+        root.setLevel(level)
 
 
 def indent_print(indent_level, str):
     print ''.join('\t' for x in range(0, indent_level)) + str
 
 
+# time a callable, returning the best per-call time in microseconds
+def time_call(func, number=1000, repeat=3):
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return best / number * 1e6
+
+
 # flatten arbitrarily nested lists
 # borrowed from http://stackoverflow.com/questions/10823877
 def flatten(items, seqtypes=(list, tuple)):